@@ -0,0 +1,153 @@
+"""Benchmark dos métodos de formação de grupos.
+
+Gera turmas sintéticas (variando o número de alunos, de habilidades e a distribuição
+das notas), roda cada método de `cesb.agrupamento.METODOS` e grava um relatório JSON
+com tempo, memória de pico e métricas de qualidade dos grupos.
+
+Uso (a partir da raiz do projeto):
+
+    python benchmarks/benchmark_grupos.py
+    python benchmarks/benchmark_grupos.py --repeticoes 5 --saida relatorio.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cesb import agrupamento  # noqa: E402
+
+SAIDA_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "relatorio_grupos.json")
+
+# Cenários: (alunos, habilidades, distribuição das notas)
+CENARIOS = [
+    (20, 10, "uniforme"),
+    (40, 18, "uniforme"),
+    (40, 22, "baixa"),
+    (45, 22, "bimodal"),
+    (120, 22, "uniforme"),
+    (300, 25, "bimodal"),
+]
+
+# Probabilidade de cada nível (0, 1, 2) em cada distribuição
+DISTRIBUICOES = {
+    "uniforme": [1 / 3, 1 / 3, 1 / 3],
+    "baixa": [0.6, 0.3, 0.1],
+}
+
+
+def turma_sintetica(num_alunos, num_habilidades, distribuicao, rng):
+    """DataFrame no formato dos arquivos do CAED (Aluno, Turma, H01...) com notas sorteadas."""
+    if distribuicao == "bimodal":
+        # Metade da turma com notas baixas e metade com notas altas
+        forte = rng.random(num_alunos) < 0.5
+        probabilidades = np.where(forte[:, None], [[0.1, 0.3, 0.6]], [[0.6, 0.3, 0.1]])
+        sorteio = rng.random((num_alunos, num_habilidades))[:, :, None]
+        notas = (sorteio > np.cumsum(probabilidades, axis=1)[:, None, :]).sum(axis=2)
+    else:
+        notas = rng.choice(3, size=(num_alunos, num_habilidades), p=DISTRIBUICOES[distribuicao])
+    habilidades = [f"H{k:02d}" for k in range(1, num_habilidades + 1)]
+    df = pd.DataFrame(notas, columns=habilidades)
+    df.insert(0, "Turma", "SINT")
+    df.insert(0, "Aluno", [f"ALUNO {k:03d}" for k in range(num_alunos)])
+    return df, habilidades
+
+
+def metricas(grupos, habilidades):
+    """Métricas de qualidade de uma solução."""
+    estatisticas = agrupamento.estatisticas_grupos(grupos, habilidades)
+    media_geral_grupos = np.nanmean(estatisticas.medias, axis=1)
+    return {
+        "num_grupos": estatisticas.num_grupos,
+        "tamanho_min": int(estatisticas.tamanhos.min()),
+        "tamanho_max": int(estatisticas.tamanhos.max()),
+        "dispersao_entre_grupos": estatisticas.dispersao_grupos(),
+        "amplitude_medias": float(media_geral_grupos.max() - media_geral_grupos.min()),
+        "dispersao_interna": estatisticas.dispersao_interna(),
+        "mistura_niveis": estatisticas.mistura_niveis(),
+    }
+
+
+def medir(metodo, df, habilidades, max_por_grupo, repeticoes):
+    """Tempo (mediana e mínimo, em ms), memória de pico (KiB) e métricas da primeira execução."""
+    tempos = []
+    for semente in range(repeticoes):
+        inicio = time.perf_counter()
+        grupos = metodo(df, habilidades, max_por_grupo, semente=semente)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        if semente == 0:
+            primeira = grupos
+
+    tracemalloc.start()
+    metodo(df, habilidades, max_por_grupo, semente=0)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "tempo_ms_mediana": float(np.median(tempos)),
+        "tempo_ms_min": float(np.min(tempos)),
+        "memoria_pico_kib": pico / 1024,
+        **metricas(primeira, habilidades),
+    }
+
+
+def executar(repeticoes, max_por_grupo, semente):
+    rng = np.random.default_rng(semente)
+    resultados = []
+    for num_alunos, num_habilidades, distribuicao in CENARIOS:
+        df, habilidades = turma_sintetica(num_alunos, num_habilidades, distribuicao, rng)
+        for nome, metodo in agrupamento.METODOS.items():
+            resultado = medir(metodo, df, habilidades, max_por_grupo, repeticoes)
+            resultados.append({
+                "metodo": nome,
+                "alunos": num_alunos,
+                "habilidades": num_habilidades,
+                "distribuicao": distribuicao,
+                **resultado,
+            })
+            print(
+                f"{nome:<12} {num_alunos:>4} alunos × {num_habilidades:>2} hab. ({distribuicao:<8}) "
+                f"{resultado['tempo_ms_mediana']:8.2f} ms  dispersão {resultado['dispersao_entre_grupos']:.3f}"
+            )
+    return resultados
+
+
+def inteiro_positivo(texto):
+    """Tipo do argparse para opções que precisam ser ≥ 1."""
+    valor = int(texto)
+    if valor < 1:
+        raise argparse.ArgumentTypeError(f"deve ser pelo menos 1 (recebido {valor})")
+    return valor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos métodos de formação de grupos.")
+    parser.add_argument("--repeticoes", type=inteiro_positivo, default=3, help="execuções por cenário e método (default: 3)")
+    parser.add_argument("--max-por-grupo", type=inteiro_positivo, default=4, help="tamanho máximo dos grupos (default: 4)")
+    parser.add_argument("--semente", type=int, default=2025, help="semente das turmas sintéticas (default: 2025)")
+    parser.add_argument("--saida", default=SAIDA_PADRAO, help="arquivo JSON do relatório")
+    args = parser.parse_args()
+
+    relatorio = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "parametros": {"repeticoes": args.repeticoes, "max_por_grupo": args.max_por_grupo, "semente": args.semente},
+        "resultados": executar(args.repeticoes, args.max_por_grupo, args.semente),
+    }
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"📄 Relatório salvo em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
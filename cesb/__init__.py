@@ -0,0 +1 @@
+"""Módulos compartilhados do CESB Analytics (acesso a dados, análises e grupos)."""
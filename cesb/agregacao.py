@@ -0,0 +1,127 @@
+"""Agregação vetorizada dos níveis de domínio (turma × habilidade × nível).
+
+Todas as contagens exibidas nos painéis saem de uma única passada de `np.bincount`
+sobre a matriz de habilidades: tabelas, gráficos de pizza e mapas de calor são apenas
+somas e divisões sobre o resultado, sem máscaras booleanas por habilidade.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class ContagemNiveis:
+    """Quantidade de alunos em cada nível, por turma e habilidade."""
+    turmas: tuple
+    codigos: tuple
+    contagem: np.ndarray          # turmas × habilidades × níveis
+    alunos_por_turma: np.ndarray  # turmas
+
+    @property
+    def n_niveis(self):
+        return self.contagem.shape[2]
+
+    def _selecao(self, turmas):
+        if not turmas:
+            return np.ones(len(self.turmas), dtype=bool)
+        return np.isin(np.array(self.turmas, dtype=object), list(turmas))
+
+    def total_alunos(self, turmas=None):
+        """Número de alunos das turmas informadas (todas, se vazio)."""
+        return int(self.alunos_por_turma[self._selecao(turmas)].sum())
+
+    def por_habilidade(self, turmas=None):
+        """Contagem habilidades × níveis somando as turmas informadas."""
+        return self.contagem[self._selecao(turmas)].sum(axis=0)
+
+    def percentuais(self, turmas=None):
+        """Percentual de alunos em cada nível (habilidades × níveis); 0 quando não há alunos."""
+        total = self.total_alunos(turmas)
+        if total == 0:
+            return np.zeros(self.contagem.shape[1:], dtype=float)
+        return self.por_habilidade(turmas) * (100.0 / total)
+
+    def percentuais_por_turma(self):
+        """Percentual de alunos em cada nível para cada turma (turmas × habilidades × níveis)."""
+        alunos = np.maximum(self.alunos_por_turma, 1)[:, None, None]
+        return self.contagem * (100.0 / alunos)
+
+    def pontuacao_media_por_turma(self):
+        """Média dos níveis por turma (considerando todas as habilidades)."""
+        niveis = np.arange(self.n_niveis)
+        soma = (self.contagem * niveis).sum(axis=(1, 2))
+        celulas = self.contagem.sum(axis=(1, 2))
+        return np.divide(soma, celulas, out=np.zeros(len(self.turmas)), where=celulas > 0)
+
+    def tabela(self, rotulos_niveis, turmas=None):
+        """DataFrame com uma linha por habilidade, a contagem e o percentual (texto) de cada nível."""
+        return tabela_niveis(self.codigos, self.por_habilidade(turmas), self.percentuais(turmas), rotulos_niveis)
+
+
+@dataclass(frozen=True)
+class ResumoNiveis:
+    """Agregados de uma seleção de turmas, prontos para tabelas, gráficos e mapas de calor."""
+    contagem: ContagemNiveis
+    turmas: tuple                 # filtro aplicado; vazio = todas as turmas
+    total_alunos: int
+    por_habilidade: np.ndarray    # habilidades × níveis
+    percentuais: np.ndarray       # habilidades × níveis
+    percentuais_por_turma: np.ndarray
+    pontuacao_media_por_turma: np.ndarray
+
+    @property
+    def codigos(self):
+        return self.contagem.codigos
+
+    def tabela(self, rotulos_niveis):
+        """DataFrame com uma linha por habilidade, a contagem e o percentual (texto) de cada nível."""
+        return tabela_niveis(self.codigos, self.por_habilidade, self.percentuais, rotulos_niveis)
+
+
+def tabela_niveis(codigos, contagem, percentual, rotulos_niveis):
+    """Monta a tabela por habilidade a partir das matrizes (habilidades × níveis) de contagem e percentual."""
+    df = pd.DataFrame({"Habilidade": list(codigos)})
+    for k, rotulo in enumerate(rotulos_niveis):
+        df[rotulo] = contagem[:, k]
+    for k, rotulo in enumerate(rotulos_niveis):
+        df[f"% {rotulo}"] = [f"{p:.1f}%" for p in percentual[:, k]]
+    return df
+
+
+def resumir(contagem, turmas=()):
+    """Calcula os agregados de `contagem` restritos às turmas informadas (todas, se vazio)."""
+    turmas = tuple(turmas)
+    return ResumoNiveis(
+        contagem=contagem,
+        turmas=turmas,
+        total_alunos=contagem.total_alunos(turmas),
+        por_habilidade=contagem.por_habilidade(turmas),
+        percentuais=contagem.percentuais(turmas),
+        percentuais_por_turma=contagem.percentuais_por_turma(),
+        pontuacao_media_por_turma=contagem.pontuacao_media_por_turma(),
+    )
+
+
+def contar_niveis(matriz, codigos, nivel_maximo):
+    """Conta, em uma única passada, os alunos de cada (turma, habilidade, nível).
+
+    Valores acima de `nivel_maximo` contam no nível máximo; células sem resultado
+    (negativas) são ignoradas.
+    """
+    valores = matriz.valores[:, matriz.colunas(codigos)]
+    turma = np.asarray(matriz.turmas.codes, dtype=np.intp)
+    n_turmas, n_hab, n_niveis = len(matriz.turmas.categories), len(codigos), nivel_maximo + 1
+
+    validos = (valores >= 0) & (turma[:, None] >= 0)
+    niveis = np.minimum(valores, nivel_maximo).astype(np.intp)
+    indice = (turma[:, None] * n_hab + np.arange(n_hab)) * n_niveis + niveis
+    contagem = np.bincount(indice[validos], minlength=n_turmas * n_hab * n_niveis)
+
+    alunos_por_turma = np.bincount(turma[turma >= 0], minlength=n_turmas)
+    return ContagemNiveis(
+        turmas=tuple(matriz.turmas.categories),
+        codigos=tuple(codigos),
+        contagem=contagem.reshape(n_turmas, n_hab, n_niveis),
+        alunos_por_turma=alunos_por_turma,
+    )
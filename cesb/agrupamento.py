@@ -0,0 +1,624 @@
+"""Formação de grupos de trabalho a partir das habilidades dos alunos.
+
+Três métodos estão disponíveis:
+
+* `formar_grupos_por_niveis`: heurística original, que separa os alunos em três faixas
+  pela média e distribui em rodízio;
+* `formar_grupos_equilibrados`: busca local que troca alunos entre grupos enquanto a
+  variância das médias dos grupos (por habilidade) diminuir. Os tamanhos dos grupos
+  não mudam com as trocas, então a restrição de tamanho máximo é sempre respeitada;
+* `formar_grupos_homogeneos`: k-means sobre os vetores de habilidades, com capacidade
+  por grupo, para reunir alunos com dificuldades parecidas (retomada dirigida).
+
+`estatisticas_grupos` calcula médias, pontos fortes e de atenção de todos os grupos de
+uma vez; `dispersao_grupos` mede a qualidade de qualquer solução (quanto menor, mais parecidos
+são os grupos entre si), permitindo comparar os métodos. `GruposEditaveis` permite mover,
+incluir ou retirar um aluno sem refazer o agrupamento.
+
+As restrições do professor (`Restricoes`: pares a separar ou juntar e número fixo de
+grupos) valem para todos os métodos: o equilibrado as considera na própria busca e os
+demais passam por uma busca de correção ao final.
+
+Toda a aleatoriedade vem de `np.random.default_rng(semente)`: a mesma turma com a mesma
+semente gera sempre os mesmos grupos.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Limite de trocas da busca local (na prática converge bem antes)
+MAX_TROCAS = 500
+
+# Limite de iterações do k-means e tolerância de deslocamento dos centróides
+MAX_ITERACOES_KMEANS = 100
+TOLERANCIA_KMEANS = 1e-6
+
+# Custo de cada par de alunos fora da regra (por habilidade), bem maior que qualquer ganho de equilíbrio
+PESO_RESTRICAO = 100.0
+
+# Médias que separam as faixas Não Domina | Domina | Domina Plenamente
+LIMITES_FAIXAS = (0.8, 1.6)
+
+# Médias de grupo que indicam ponto forte (≥) e ponto de atenção (<)
+LIMITE_PONTO_FORTE = 1.5
+LIMITE_PONTO_ATENCAO = 0.8
+
+
+@dataclass(frozen=True)
+class Restricoes:
+    """Restrições definidas pelo professor; os pares são de nomes de alunos."""
+    separar: tuple = ()
+    juntar: tuple = ()
+    num_grupos: int = 0  # 0: número de grupos definido pelo tamanho máximo
+
+    @property
+    def tem_pares(self):
+        return bool(self.separar or self.juntar)
+
+
+def calcular_num_grupos(num_alunos, max_por_grupo, restricoes=None):
+    """Número de grupos: o fixado nas restrições ou o mínimo que respeita o tamanho máximo."""
+    if restricoes is not None and restricoes.num_grupos:
+        return max(1, min(restricoes.num_grupos, num_alunos))
+    return (num_alunos + max_por_grupo - 1) // max_por_grupo
+
+
+def pares_por_posicao(alunos_df, pares):
+    """Converte pares de nomes em pares de posições; pares com alunos fora do recorte são ignorados."""
+    posicoes = {}
+    for posicao, nome in enumerate(alunos_df['Aluno']):
+        posicoes.setdefault(nome, posicao)
+    return tuple(
+        (posicoes[a], posicoes[b])
+        for a, b in pares
+        if a in posicoes and b in posicoes and posicoes[a] != posicoes[b]
+    )
+
+
+def pares_violados(grupos, restricoes):
+    """Pares (nomes) que ficaram fora da regra: (pares a separar juntos, pares a juntar separados)."""
+    if restricoes is None:
+        return [], []
+    grupo_de = {aluno['Aluno']: numero for numero, grupo in enumerate(grupos) for aluno in grupo}
+    presentes = [(a, b) for a, b in restricoes.separar if a in grupo_de and b in grupo_de]
+    separar = [(a, b) for a, b in presentes if grupo_de[a] == grupo_de[b]]
+    presentes = [(a, b) for a, b in restricoes.juntar if a in grupo_de and b in grupo_de]
+    juntar = [(a, b) for a, b in presentes if grupo_de[a] != grupo_de[b]]
+    return separar, juntar
+
+
+def _corrigir_restricoes(alunos_df, habilidades, rotulos, num_grupos, restricoes):
+    """Busca de correção: troca alunos apenas para cumprir os pares, sem olhar o equilíbrio."""
+    if restricoes is None or not restricoes.tem_pares:
+        return rotulos
+    return equilibrar(
+        matriz_pontuacoes(alunos_df, habilidades), num_grupos, rotulos,
+        separar=pares_por_posicao(alunos_df, restricoes.separar),
+        juntar=pares_por_posicao(alunos_df, restricoes.juntar),
+        peso_equilibrio=0.0
+    )
+
+
+def formar_grupos_por_niveis(alunos_df, habilidades_selecionadas, max_por_grupo, semente=None, restricoes=None):
+    """
+    Forma grupos heterogêneos garantindo um equilíbrio entre diferentes níveis de domínio.
+    Níveis baseados na média de pontuação das habilidades selecionadas.
+    """
+    if alunos_df.empty or not habilidades_selecionadas:
+        return []
+
+    num_grupos = calcular_num_grupos(len(alunos_df), max_por_grupo, restricoes)
+    medias = medias_alunos(submatriz(alunos_df, habilidades_selecionadas))
+    rotulos = rotulos_por_niveis(medias, num_grupos, np.random.default_rng(semente))
+    rotulos = _corrigir_restricoes(alunos_df, habilidades_selecionadas, rotulos, num_grupos, restricoes)
+    return grupos_por_rotulos(alunos_df, rotulos, num_grupos)
+
+
+def rotulos_por_niveis(medias, num_grupos, rng=None):
+    """Separa os alunos em faixas pela média, embaralha cada faixa e distribui em rodízio.
+
+    Faixas: Domina Plenamente (≥ 1.6), Domina (≥ 0.8) e Não Domina; a distribuição
+    começa pela faixa mais alta. Retorna o grupo de cada aluno.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    faixas = np.digitize(medias, LIMITES_FAIXAS)
+    ordem = [
+        rng.permutation(np.flatnonzero(faixas == faixa))
+        for faixa in range(len(LIMITES_FAIXAS), -1, -1)
+    ]
+    ordem = np.concatenate(ordem)
+
+    rotulos = np.empty(len(medias), dtype=np.intp)
+    rotulos[ordem] = np.arange(len(ordem)) % num_grupos
+    return rotulos
+
+
+@dataclass(frozen=True)
+class EstatisticasGrupos:
+    """Estatísticas de todos os grupos de uma turma, calculadas de uma vez a partir dos rótulos.
+
+    `medias` e `desvios` são matrizes grupos × habilidades (NaN onde o grupo não tem notas
+    na habilidade); `faixas` conta os alunos de cada grupo por faixa de média.
+    """
+    habilidades: tuple
+    tamanhos: np.ndarray
+    medias: np.ndarray
+    desvios: np.ndarray
+    faixas: np.ndarray
+
+    @property
+    def num_grupos(self):
+        return len(self.tamanhos)
+
+    @property
+    def fortes(self):
+        """Máscara grupos × habilidades dos pontos fortes (média ≥ 1.5)."""
+        return self.medias >= LIMITE_PONTO_FORTE
+
+    @property
+    def atencao(self):
+        """Máscara grupos × habilidades dos pontos de atenção (média < 0.8)."""
+        return self.medias < LIMITE_PONTO_ATENCAO
+
+    def pontos_fortes(self, grupo):
+        """Habilidades fortes do grupo (índice a partir de 0)."""
+        return [self.habilidades[k] for k in np.flatnonzero(self.fortes[grupo])]
+
+    def pontos_atencao(self, grupo):
+        """Habilidades que pedem atenção no grupo (índice a partir de 0)."""
+        return [self.habilidades[k] for k in np.flatnonzero(self.atencao[grupo])]
+
+    def tabela(self):
+        """Médias como DataFrame grupos × habilidades, com os grupos numerados a partir de 1."""
+        return pd.DataFrame(self.medias, index=range(1, self.num_grupos + 1), columns=list(self.habilidades))
+
+    def dispersao_grupos(self):
+        """Média, entre as habilidades, do desvio-padrão das médias dos grupos (menor é melhor)."""
+        if self.num_grupos < 2:
+            return 0.0
+        return float(np.nanmean(_desvio_colunas(self.medias)))
+
+    def dispersao_interna(self):
+        """Média do desvio-padrão das habilidades dentro de cada grupo (menor é melhor)."""
+        por_grupo = medias_alunos(self.desvios)[self.tamanhos > 0]
+        return float(por_grupo.mean()) if len(por_grupo) else 0.0
+
+    def mistura_niveis(self):
+        """Fração de grupos com alunos de pelo menos duas faixas de média."""
+        if not self.num_grupos:
+            return 0.0
+        return float(((self.faixas > 0).sum(axis=1) >= 2).mean())
+
+
+def _desvio_colunas(matriz):
+    """Desvio-padrão populacional de cada coluna ignorando NaN (NaN se a coluna estiver vazia)."""
+    presentes = ~np.isnan(matriz)
+    quantidade = presentes.sum(axis=0)
+    media = np.divide(np.where(presentes, matriz, 0.0).sum(axis=0), quantidade,
+                      out=np.full(matriz.shape[1], np.nan), where=quantidade > 0)
+    quadrados = np.where(presentes, (matriz - media) ** 2, 0.0).sum(axis=0)
+    return np.sqrt(np.divide(quadrados, quantidade, out=np.full(matriz.shape[1], np.nan), where=quantidade > 0))
+
+
+def _acumular(valores, rotulos, num_grupos):
+    """Tamanhos, somas, somas dos quadrados, contagens de notas e alunos por faixa de cada grupo.
+
+    Cada grandeza sai de um único `np.add.at`; células NaN são ignoradas.
+    """
+    rotulos = np.asarray(rotulos, dtype=np.intp)
+    presentes = ~np.isnan(valores)
+    limpos = np.where(presentes, valores, 0.0)
+    forma = (num_grupos, valores.shape[1])
+    somas, quadrados, contagem = np.zeros(forma), np.zeros(forma), np.zeros(forma)
+    np.add.at(somas, rotulos, limpos)
+    np.add.at(quadrados, rotulos, limpos ** 2)
+    np.add.at(contagem, rotulos, presentes)
+    faixas = np.zeros((num_grupos, len(LIMITES_FAIXAS) + 1), dtype=np.intp)
+    np.add.at(faixas, (rotulos, np.digitize(medias_alunos(valores), LIMITES_FAIXAS)), 1)
+    return np.bincount(rotulos, minlength=num_grupos), somas, quadrados, contagem, faixas
+
+
+def _montar_estatisticas(habilidades, tamanhos, somas, quadrados, contagem, faixas):
+    """Médias e desvios a partir dos acumulados de cada grupo."""
+    vazio = np.full(somas.shape, np.nan)
+    medias = np.divide(somas, contagem, out=vazio.copy(), where=contagem > 0)
+    variancias = np.divide(quadrados, contagem, out=vazio, where=contagem > 0) - medias ** 2
+    return EstatisticasGrupos(
+        habilidades=tuple(habilidades),
+        tamanhos=tamanhos.copy(),
+        medias=medias,
+        desvios=np.sqrt(np.maximum(variancias, 0.0)),
+        faixas=faixas.copy(),
+    )
+
+
+def estatisticas_por_rotulos(valores, rotulos, num_grupos, habilidades):
+    """Estatísticas dos grupos a partir da matriz alunos × habilidades e do grupo de cada aluno."""
+    return _montar_estatisticas(habilidades, *_acumular(valores, rotulos, num_grupos))
+
+
+def estatisticas_grupos(grupos, habilidades_cols):
+    """Estatísticas a partir da lista de grupos (listas de registros) usada pela interface."""
+    habilidades_cols = list(habilidades_cols)
+    registros = [aluno for grupo in grupos for aluno in grupo]
+    rotulos = np.repeat(np.arange(len(grupos)), [len(grupo) for grupo in grupos])
+    valores = submatriz(pd.DataFrame(registros, columns=habilidades_cols), habilidades_cols)
+    return estatisticas_por_rotulos(valores, rotulos, len(grupos), habilidades_cols)
+
+
+def matriz_medias_grupos(grupos, habilidades_cols):
+    """Médias por habilidade de todos os grupos de uma vez (DataFrame grupos × habilidades, grupos a partir de 1)."""
+    return estatisticas_grupos(grupos, habilidades_cols).tabela()
+
+
+def dispersao_interna(grupos, habilidades_cols):
+    """Coesão dos grupos homogêneos: média do desvio-padrão das habilidades dentro de cada grupo (menor é melhor)."""
+    return estatisticas_grupos(grupos, habilidades_cols).dispersao_interna()
+
+
+def dispersao_grupos(grupos, habilidades_cols):
+    """Qualidade da solução: média, entre as habilidades, do desvio-padrão das médias dos grupos (menor é melhor)."""
+    return estatisticas_grupos(grupos, habilidades_cols).dispersao_grupos()
+
+
+class GruposEditaveis:
+    """Grupos de uma turma que aceitam ajustes pontuais sem refazer o agrupamento.
+
+    Mover, incluir ou retirar um aluno altera apenas os acumulados (somas, contagens,
+    faixas) dos grupos envolvidos; as estatísticas e a dispersão são remontadas a partir
+    deles em O(grupos) por habilidade. Cada operação devolve o conjunto de grupos
+    alterados (índices a partir de 0), para que a interface redesenhe só esses cards.
+    """
+
+    def __init__(self, grupos, habilidades, coluna_aluno='Aluno'):
+        self.habilidades = tuple(habilidades)
+        self.coluna_aluno = coluna_aluno
+        self.grupos = [list(grupo) for grupo in grupos]
+        registros = [aluno for grupo in self.grupos for aluno in grupo]
+        rotulos = np.repeat(np.arange(len(self.grupos)), [len(grupo) for grupo in self.grupos])
+        valores = submatriz(pd.DataFrame(registros, columns=list(self.habilidades)), self.habilidades)
+        self._tamanhos, self._somas, self._quadrados, self._contagem, self._faixas = \
+            _acumular(valores, rotulos, len(self.grupos))
+
+    @property
+    def num_grupos(self):
+        return len(self.grupos)
+
+    def alunos(self):
+        """Nomes de todos os alunos que estão em algum grupo."""
+        return [aluno[self.coluna_aluno] for grupo in self.grupos for aluno in grupo]
+
+    def localizar(self, nome):
+        """Grupo (a partir de 0) e posição do aluno no grupo; `KeyError` se ele não estiver em nenhum."""
+        for numero, grupo in enumerate(self.grupos):
+            for posicao, aluno in enumerate(grupo):
+                if aluno[self.coluna_aluno] == nome:
+                    return numero, posicao
+        raise KeyError(nome)
+
+    def _notas(self, registro):
+        return np.array([pd.to_numeric(registro.get(h), errors='coerce') for h in self.habilidades], dtype=float)
+
+    def _atualizar(self, grupo, registro, sinal):
+        """Soma (+1) ou subtrai (-1) o aluno dos acumulados de um único grupo."""
+        notas = self._notas(registro)
+        presentes = ~np.isnan(notas)
+        limpas = np.where(presentes, notas, 0.0)
+        self._tamanhos[grupo] += sinal
+        self._somas[grupo] += sinal * limpas
+        self._quadrados[grupo] += sinal * limpas ** 2
+        self._contagem[grupo] += sinal * presentes
+        self._faixas[grupo, np.digitize(medias_alunos(notas[None, :])[0], LIMITES_FAIXAS)] += sinal
+
+    def estatisticas(self):
+        """Estatísticas atuais de todos os grupos, sem recalcular a partir dos alunos."""
+        return _montar_estatisticas(self.habilidades, self._tamanhos, self._somas,
+                                    self._quadrados, self._contagem, self._faixas)
+
+    def dispersao_grupos(self):
+        return self.estatisticas().dispersao_grupos()
+
+    def mover(self, nome, destino):
+        """Passa o aluno para o grupo `destino`; devolve os grupos alterados."""
+        origem, posicao = self.localizar(nome)
+        if origem == destino:
+            return set()
+        registro = self.grupos[origem].pop(posicao)
+        self._atualizar(origem, registro, -1)
+        self.grupos[destino].append(registro)
+        self._atualizar(destino, registro, +1)
+        return {origem, destino}
+
+    def remover(self, nome):
+        """Retira o aluno (transferido ou ausente); os demais permanecem onde estão."""
+        origem, posicao = self.localizar(nome)
+        self._atualizar(origem, self.grupos[origem].pop(posicao), -1)
+        return {origem}
+
+    def melhor_grupo(self, registro, homogeneo=False):
+        """Grupo indicado para um novo aluno, entre os que têm menos integrantes.
+
+        No modo homogêneo, o de média mais próxima do perfil do aluno; nos demais, o que
+        deixa a dispersão entre os grupos menor.
+        """
+        candidatos = np.flatnonzero(self._tamanhos == self._tamanhos.min())
+        notas = self._notas(registro)
+        presentes = ~np.isnan(notas)
+        medias = self.estatisticas().medias
+        if homogeneo:
+            distancias = np.nansum((medias[candidatos] - notas) ** 2, axis=1)
+            return int(candidatos[np.argmin(distancias)])
+
+        dispersoes = []
+        for grupo in candidatos:
+            contagem = self._contagem[grupo] + presentes
+            soma = self._somas[grupo] + np.where(presentes, notas, 0.0)
+            simuladas = medias.copy()
+            simuladas[grupo] = np.divide(soma, contagem, out=np.full(len(soma), np.nan), where=contagem > 0)
+            dispersoes.append(np.nanmean(_desvio_colunas(simuladas)) if self.num_grupos > 1 else 0.0)
+        return int(candidatos[np.argmin(dispersoes)])
+
+    def adicionar(self, registro, destino=None, homogeneo=False):
+        """Inclui um aluno (por exemplo, recém-chegado) no grupo `destino` ou no mais indicado."""
+        if destino is None:
+            destino = self.melhor_grupo(registro, homogeneo)
+        self.grupos[destino].append(registro)
+        self._atualizar(destino, registro, +1)
+        return {destino}
+
+
+def submatriz(alunos_df, habilidades):
+    """Submatriz (alunos × habilidades) em float; células não numéricas viram NaN."""
+    colunas = alunos_df[list(habilidades)]
+    return colunas.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+
+
+def medias_alunos(valores):
+    """Média de cada aluno ignorando células ausentes (0 para quem não tem nenhuma)."""
+    presentes = ~np.isnan(valores)
+    quantidade = presentes.sum(axis=1)
+    soma = np.where(presentes, valores, 0.0).sum(axis=1)
+    return np.divide(soma, quantidade, out=np.zeros(len(valores)), where=quantidade > 0)
+
+
+def matriz_pontuacoes(alunos_df, habilidades):
+    """Submatriz (alunos × habilidades) em float; células ausentes recebem a média da habilidade."""
+    valores = submatriz(alunos_df, habilidades)
+    ausentes = np.isnan(valores)
+    if ausentes.any():
+        presentes = (~ausentes).sum(axis=0)
+        medias = np.divide(np.where(ausentes, 0.0, valores).sum(axis=0), presentes,
+                           out=np.zeros(valores.shape[1]), where=presentes > 0)
+        valores = np.where(ausentes, medias, valores)
+    return valores
+
+
+def _rotulos_iniciais(valores, num_grupos, rng=None):
+    """Distribuição em "serpentina" pela média do aluno: grupos de tamanhos iguais (±1) e já misturados.
+
+    Com `rng`, alunos de mesma média são sorteados entre si, variando a solução a cada semente.
+    """
+    embaralhados = rng.permutation(len(valores)) if rng is not None else np.arange(len(valores))
+    ordem = embaralhados[np.argsort(-valores[embaralhados].mean(axis=1), kind="stable")]
+    posicao = np.arange(len(ordem))
+    rodada, resto = np.divmod(posicao, num_grupos)
+    grupo = np.where(rodada % 2 == 0, resto, num_grupos - 1 - resto)
+    rotulos = np.empty(len(ordem), dtype=np.intp)
+    rotulos[ordem] = grupo
+    return rotulos
+
+
+def _matriz_pares(n, pares):
+    """Matriz simétrica (alunos × alunos) com 1 nos pares informados."""
+    matriz = np.zeros((n, n))
+    for i, j in pares:
+        matriz[i, j] = matriz[j, i] = 1.0
+    return matriz
+
+
+def violacoes(rotulos, separar=(), juntar=()):
+    """Quantidade de pares a separar que estão juntos mais pares a juntar que estão separados."""
+    return sum(rotulos[i] == rotulos[j] for i, j in separar) + sum(rotulos[i] != rotulos[j] for i, j in juntar)
+
+
+def equilibrar(valores, num_grupos, rotulos=None, max_trocas=MAX_TROCAS, rng=None,
+               separar=(), juntar=(), peso_equilibrio=1.0):
+    """Busca local por trocas de pares que minimiza a variância das médias dos grupos.
+
+    A cada passo o ganho de todas as trocas possíveis é avaliado de uma vez (matriz
+    alunos × alunos) e a melhor troca é aplicada, até nenhuma troca melhorar a solução.
+    Uma troca só altera os dois grupos envolvidos: apenas as médias, projeções e
+    contagens de pares desses grupos são atualizadas a cada passo.
+
+    `separar` e `juntar` são pares de posições (i, j); cada par violado custa
+    `PESO_RESTRICAO` por habilidade, o que faz as restrições prevalecerem sobre o
+    equilíbrio. Com `peso_equilibrio=0` a busca apenas corrige as restrições de uma
+    solução pronta. Retorna o vetor de rótulos (grupo de cada aluno).
+    """
+    n, num_habilidades = valores.shape
+    if rotulos is None:
+        rotulos = _rotulos_iniciais(valores, num_grupos, rng)
+    rotulos = np.array(rotulos, dtype=np.intp)
+    if num_grupos < 2 or n < 2:
+        return rotulos
+
+    indices = np.arange(n)
+    tamanhos = np.bincount(rotulos, minlength=num_grupos).astype(float)
+    somas = np.zeros((num_grupos, num_habilidades))
+    np.add.at(somas, rotulos, valores)
+    media_geral = valores.mean(axis=0)
+    desvio = somas / np.maximum(tamanhos, 1)[:, None] - media_geral  # grupos × habilidades
+    projecao = desvio @ valores.T                                      # grupos × alunos: desvio[g]·x_j
+
+    # |x_i - x_j|²: não muda durante a busca
+    normas = (valores ** 2).sum(axis=1)
+    quadrados = np.maximum(normas[:, None] + normas[None, :] - 2 * valores @ valores.T, 0.0)
+
+    # Contagem de parceiros de cada aluno em cada grupo (alunos × grupos), para separar e juntar
+    tem_pares = bool(separar or juntar)
+    if tem_pares:
+        peso = PESO_RESTRICAO * num_habilidades
+        pares_separar, pares_juntar = _matriz_pares(n, separar), _matriz_pares(n, juntar)
+        pertence = np.eye(num_grupos)[rotulos]
+        com_separar, com_juntar = pares_separar @ pertence, pares_juntar @ pertence
+
+    def variacao_pares(contagem, pares):
+        # Parceiros de i no grupo de j (e vice-versa) depois da troca, menos os atuais
+        no_outro = contagem[:, rotulos]
+        no_proprio = contagem[indices, rotulos]
+        return no_outro - no_proprio[:, None] + no_outro.T - no_proprio[None, :] - 2 * pares
+
+    for _ in range(max_trocas):
+        inv = 1.0 / tamanhos[rotulos]  # 1 / tamanho do grupo de cada aluno
+        proprio = projecao[rotulos]     # linha i: desvio do grupo de i projetado em cada x_j
+        proj = proprio - proprio[indices, indices][:, None]  # desvio[grupo de i]·(x_j - x_i)
+        # Variação de Σ(média - média geral)² nos dois grupos envolvidos na troca i ↔ j
+        ganho = peso_equilibrio * (
+            2 * (inv[:, None] * proj + inv[None, :] * proj.T)
+            + quadrados * (inv[:, None] ** 2 + inv[None, :] ** 2)
+        )
+        if tem_pares:
+            ganho += peso * (variacao_pares(com_separar, pares_separar) - variacao_pares(com_juntar, pares_juntar))
+        ganho[rotulos[:, None] == rotulos[None, :]] = np.inf
+
+        i, j = np.unravel_index(np.argmin(ganho), ganho.shape)
+        if ganho[i, j] >= -1e-9:
+            break
+        a, b = rotulos[i], rotulos[j]
+        diferenca = valores[j] - valores[i]
+        somas[a] += diferenca
+        somas[b] -= diferenca
+        rotulos[i], rotulos[j] = b, a
+
+        # Atualiza somente os dois grupos afetados
+        afetados = [a, b]
+        desvio[afetados] = somas[afetados] / tamanhos[afetados][:, None] - media_geral
+        projecao[afetados] = desvio[afetados] @ valores.T
+        if tem_pares:
+            for contagem, pares in ((com_separar, pares_separar), (com_juntar, pares_juntar)):
+                contagem[:, a] += pares[:, j] - pares[:, i]
+                contagem[:, b] += pares[:, i] - pares[:, j]
+
+    return rotulos
+
+
+def grupos_por_rotulos(alunos_df, rotulos, num_grupos):
+    """Converte o vetor de rótulos na lista de grupos (listas de registros) usada pela interface."""
+    registros = alunos_df.to_dict('records')
+    grupos = [[] for _ in range(num_grupos)]
+    for registro, rotulo in zip(registros, rotulos):
+        grupos[rotulo].append(registro)
+    return grupos
+
+
+def formar_grupos_equilibrados(alunos_df, habilidades_selecionadas, max_por_grupo, semente=None, restricoes=None):
+    """Forma grupos heterogêneos com médias por habilidade o mais próximas possível entre si."""
+    if alunos_df.empty or not habilidades_selecionadas:
+        return []
+    num_grupos = calcular_num_grupos(len(alunos_df), max_por_grupo, restricoes)
+    valores = matriz_pontuacoes(alunos_df, habilidades_selecionadas)
+    pares = {}
+    if restricoes is not None:
+        pares = dict(
+            separar=pares_por_posicao(alunos_df, restricoes.separar),
+            juntar=pares_por_posicao(alunos_df, restricoes.juntar)
+        )
+    rotulos = equilibrar(valores, num_grupos, rng=np.random.default_rng(semente), **pares)
+    return grupos_por_rotulos(alunos_df, rotulos, num_grupos)
+
+
+def _distancias(valores, centroides):
+    """Distâncias quadráticas (alunos × centróides) em uma única operação matricial."""
+    quadrados = (valores ** 2).sum(axis=1)[:, None] - 2 * valores @ centroides.T + (centroides ** 2).sum(axis=1)[None, :]
+    return np.maximum(quadrados, 0.0)
+
+
+def _kmeans_mais_mais(valores, num_grupos, rng):
+    """Centróides iniciais pelo k-means++: cada novo centro é sorteado com peso na distância aos já escolhidos."""
+    centroides = [valores[rng.integers(len(valores))]]
+    menor = _distancias(valores, np.array(centroides))[:, 0]
+    for _ in range(1, num_grupos):
+        total = menor.sum()
+        indice = rng.choice(len(valores), p=menor / total) if total > 0 else rng.integers(len(valores))
+        centroides.append(valores[indice])
+        menor = np.minimum(menor, _distancias(valores, valores[indice][None, :])[:, 0])
+    return np.array(centroides, dtype=float)
+
+
+def _atribuir_com_capacidade(distancias, capacidade):
+    """Atribui cada aluno ao centróide mais próximo que ainda tenha vaga.
+
+    Alunos com maior "arrependimento" (diferença entre a 2ª e a 1ª opção) escolhem primeiro.
+    """
+    n, num_grupos = distancias.shape
+    preferencias = np.argsort(distancias, axis=1)
+    ordenadas = np.take_along_axis(distancias, preferencias, axis=1)
+    arrependimento = ordenadas[:, 1] - ordenadas[:, 0] if num_grupos > 1 else np.zeros(n)
+
+    vagas = np.full(num_grupos, capacidade)
+    rotulos = np.empty(n, dtype=np.intp)
+    for aluno in np.argsort(-arrependimento, kind="stable"):
+        for grupo in preferencias[aluno]:
+            if vagas[grupo] > 0:
+                rotulos[aluno] = grupo
+                vagas[grupo] -= 1
+                break
+    return rotulos
+
+
+def agrupar_kmeans(valores, num_grupos, capacidade, rng=None, max_iteracoes=MAX_ITERACOES_KMEANS, tolerancia=TOLERANCIA_KMEANS):
+    """K-means com inicialização k-means++ e no máximo `capacidade` alunos por grupo.
+
+    Para quando as atribuições se repetem ou os centróides se deslocam menos que `tolerancia`.
+    Retorna o vetor de rótulos.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    num_grupos = min(num_grupos, len(valores))
+    centroides = _kmeans_mais_mais(valores, num_grupos, rng)
+    rotulos = None
+    for _ in range(max_iteracoes):
+        novos = _atribuir_com_capacidade(_distancias(valores, centroides), capacidade)
+        if rotulos is not None and np.array_equal(novos, rotulos):
+            break
+        rotulos = novos
+
+        somas = np.zeros_like(centroides)
+        np.add.at(somas, rotulos, valores)
+        tamanhos = np.bincount(rotulos, minlength=num_grupos)[:, None]
+        novos_centroides = np.where(tamanhos > 0, somas / np.maximum(tamanhos, 1), centroides)
+        deslocamento = np.abs(novos_centroides - centroides).max()
+        centroides = novos_centroides
+        if deslocamento < tolerancia:
+            break
+    return rotulos
+
+
+def formar_grupos_homogeneos(alunos_df, habilidades_selecionadas, max_por_grupo, semente=None, restricoes=None):
+    """Forma grupos de alunos com perfis de habilidades parecidos (k-means com tamanho máximo).
+
+    Os grupos são devolvidos da menor para a maior média, de modo que o Grupo 1 reúne
+    os alunos que mais precisam de retomada.
+    """
+    if alunos_df.empty or not habilidades_selecionadas:
+        return []
+    num_grupos = calcular_num_grupos(len(alunos_df), max_por_grupo, restricoes)
+    capacidade = (len(alunos_df) + num_grupos - 1) // num_grupos
+    valores = matriz_pontuacoes(alunos_df, habilidades_selecionadas)
+    rotulos = agrupar_kmeans(valores, num_grupos, capacidade, np.random.default_rng(semente))
+    rotulos = _corrigir_restricoes(alunos_df, habilidades_selecionadas, rotulos, num_grupos, restricoes)
+
+    # Renumera os grupos pela média geral (crescente)
+    medias = np.bincount(rotulos, weights=valores.mean(axis=1), minlength=num_grupos) \
+        / np.maximum(np.bincount(rotulos, minlength=num_grupos), 1)
+    nova_ordem = np.empty(num_grupos, dtype=np.intp)
+    nova_ordem[np.argsort(medias, kind="stable")] = np.arange(num_grupos)
+    return grupos_por_rotulos(alunos_df, nova_ordem[rotulos], num_grupos)
+
+
+# Métodos de formação, pelo nome usado na interface e no processamento em lote
+METODOS = {
+    "equilibrado": formar_grupos_equilibrados,
+    "rodizio": formar_grupos_por_niveis,
+    "homogeneo": formar_grupos_homogeneos,
+}
@@ -0,0 +1,91 @@
+"""Registro declarativo das avaliações do CAED.
+
+Cada avaliação (edição, série, disciplina) é descrita em `avaliacoes.json`: arquivo de
+origem, códigos das habilidades, nível máximo de domínio, padrão do nome das colunas,
+separador e decimal. O registro é montado uma única vez por processo e as páginas
+consultam as avaliações por chave em O(1). Para incluir uma nova edição basta
+acrescentar uma entrada no JSON e o respectivo CSV na pasta de dados.
+"""
+import functools
+import json
+import os
+import unicodedata
+from dataclasses import dataclass
+
+# Arquivo com a descrição de todas as avaliações conhecidas
+ARQUIVO_REGISTRO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "avaliacoes.json")
+
+
+def normalizar_disciplina(disciplina):
+    """"Matemática", "Matematica" e "matematica" viram a mesma chave: "matematica"."""
+    sem_acento = unicodedata.normalize('NFKD', disciplina).encode('ascii', 'ignore').decode('ascii')
+    return sem_acento.strip().lower()
+
+
+@dataclass(frozen=True)
+class Avaliacao:
+    """Descrição de uma avaliação do CAED e do formato do seu arquivo."""
+    edicao: int
+    serie: int
+    disciplina: str
+    nome_disciplina: str
+    arquivo: str
+    habilidades: tuple
+    nivel_maximo: int
+    padrao_coluna: str
+    sep: str = ';'
+    decimal: str = '.'
+
+    @property
+    def chave(self):
+        return (self.edicao, self.serie, self.disciplina)
+
+    @property
+    def rotulo(self):
+        """Rótulo curto usado nas telas, por exemplo "CAED1_Matemática"."""
+        return f"CAED{self.edicao}_{self.nome_disciplina}"
+
+    @functools.cached_property
+    def colunas(self):
+        """Mapa código da habilidade -> nome da coluna no CSV ("H01" -> "H 01")."""
+        return {cod: self.padrao_coluna.format(numero=int(cod[1:])) for cod in self.habilidades}
+
+
+@functools.lru_cache(maxsize=None)
+def _registro():
+    with open(ARQUIVO_REGISTRO, encoding='utf-8') as f:
+        entradas = json.load(f)
+
+    por_chave, por_arquivo = {}, {}
+    for entrada in entradas:
+        entrada = dict(entrada, habilidades=tuple(entrada['habilidades']),
+                       disciplina=normalizar_disciplina(entrada['disciplina']))
+        avaliacao = Avaliacao(**entrada)
+        por_chave[avaliacao.chave] = avaliacao
+        por_arquivo[avaliacao.arquivo] = avaliacao
+    return por_chave, por_arquivo
+
+
+def obter(edicao, serie, disciplina):
+    """Avaliação da edição/série/disciplina informadas, ou None se não estiver registrada."""
+    return _registro()[0].get((int(edicao), int(serie), normalizar_disciplina(disciplina)))
+
+
+def por_arquivo(nome_arquivo):
+    """Avaliação correspondente ao nome do arquivo CSV, ou None se não estiver registrada."""
+    return _registro()[1].get(nome_arquivo)
+
+
+def listar(serie=None):
+    """Avaliações registradas (na ordem do JSON), opcionalmente filtradas pela série."""
+    return [a for a in _registro()[0].values() if serie is None or a.serie == int(serie)]
+
+
+def edicoes(serie):
+    """Edições disponíveis para a série, em ordem crescente."""
+    return sorted({a.edicao for a in listar(serie)})
+
+
+def disciplinas(serie):
+    """Disciplinas disponíveis para a série como {chave: nome de exibição}, na ordem do registro."""
+    return {a.disciplina: a.nome_disciplina for a in listar(serie)}
@@ -0,0 +1,153 @@
+"""Cache dos agregados dos painéis, compartilhado por todas as sessões do servidor.
+
+Os agregados das páginas do 3º e do 9º ano dependem apenas da avaliação e do filtro de
+turmas. Eles ficam em um único cache por processo (LRU com limite de memória): quando
+vários professores abrem a mesma visão, apenas o primeiro paga o cálculo e os demais
+esperam por ele em vez de repeti-lo. As seleções padrão (todas as turmas) são
+pré-calculadas quando o cache é criado.
+"""
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cesb import agregacao, avaliacoes, dados
+
+# Limites do cache: número de entradas e memória aproximada ocupada pelos agregados
+MAX_ENTRADAS = 256
+LIMITE_MEMORIA = 64 * 1024 * 1024
+
+# Campos que apontam para outra entrada do cache: já contados nela, não entram no tamanho de novo
+CAMPOS_COMPARTILHADOS = {agregacao.ResumoNiveis: ('contagem',)}
+
+
+def tamanho_aproximado(objeto):
+    """Estimativa em bytes da memória ocupada por arrays, DataFrames e dataclasses."""
+    if isinstance(objeto, np.ndarray):
+        return objeto.nbytes
+    if isinstance(objeto, pd.DataFrame):
+        return int(objeto.memory_usage(deep=True).sum())
+    if is_dataclass(objeto):
+        compartilhados = CAMPOS_COMPARTILHADOS.get(type(objeto), ())
+        return sum(
+            tamanho_aproximado(getattr(objeto, campo.name))
+            for campo in fields(objeto) if campo.name not in compartilhados
+        )
+    if isinstance(objeto, (tuple, list)):
+        return sys.getsizeof(objeto) + sum(tamanho_aproximado(item) for item in objeto)
+    return sys.getsizeof(objeto)
+
+
+class CacheLRU:
+    """Cache LRU seguro entre threads, limitado por número de entradas e por memória."""
+
+    def __init__(self, max_entradas=MAX_ENTRADAS, limite_memoria=LIMITE_MEMORIA):
+        self.max_entradas = max_entradas
+        self.limite_memoria = limite_memoria
+        self._entradas = OrderedDict()  # chave -> (valor, tamanho)
+        self._travas = {}
+        self._trava = threading.Lock()
+        self.memoria = 0
+        self.acertos = 0
+        self.faltas = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _buscar(self, chave):
+        with self._trava:
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return True, self._entradas[chave][0]
+            return False, None
+
+    def obter(self, chave, calcular):
+        """Valor da chave; na falta, `calcular()` é executado uma única vez mesmo com acessos simultâneos."""
+        encontrado, valor = self._buscar(chave)
+        if encontrado:
+            return valor
+
+        with self._trava:
+            trava_chave = self._travas.setdefault(chave, threading.Lock())
+        with trava_chave:
+            # Outra sessão pode ter calculado o valor enquanto esperávamos
+            encontrado, valor = self._buscar(chave)
+            if encontrado:
+                return valor
+            valor = calcular()
+            self._guardar(chave, valor)
+        with self._trava:
+            self._travas.pop(chave, None)
+        return valor
+
+    def _guardar(self, chave, valor):
+        tamanho = tamanho_aproximado(valor)
+        with self._trava:
+            self.faltas += 1
+            self._entradas[chave] = (valor, tamanho)
+            self.memoria += tamanho
+            # Remove as entradas usadas há mais tempo até respeitar os limites (a nova sempre fica)
+            while len(self._entradas) > 1 and (
+                len(self._entradas) > self.max_entradas or self.memoria > self.limite_memoria
+            ):
+                _, (_, tamanho_removido) = self._entradas.popitem(last=False)
+                self.memoria -= tamanho_removido
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+            self.memoria = 0
+
+
+def _normalizar_turmas(contagem, turmas):
+    """Filtro canônico: turmas ordenadas, e vazio quando todas estão selecionadas."""
+    turmas = tuple(sorted(set(turmas or ())))
+    if set(turmas) == set(contagem.turmas):
+        return ()
+    return turmas
+
+
+def _contagem(cache, avaliacao):
+    assinatura = dados.assinatura_arquivo(avaliacao.arquivo)
+    return cache.obter(
+        ("contagem", avaliacao.arquivo, *assinatura),
+        lambda: agregacao.contar_niveis(
+            dados.carregar_matriz_caed(avaliacao.arquivo), avaliacao.habilidades, avaliacao.nivel_maximo
+        ),
+    ), assinatura
+
+
+def _resumo(cache, avaliacao, turmas):
+    contagem, assinatura = _contagem(cache, avaliacao)
+    turmas = _normalizar_turmas(contagem, turmas)
+    return cache.obter(
+        ("resumo", avaliacao.arquivo, *assinatura, turmas),
+        lambda: agregacao.resumir(contagem, turmas),
+    )
+
+
+def aquecer(cache, lista_avaliacoes=None):
+    """Pré-calcula a seleção padrão (todas as turmas) das avaliações informadas (todas, se None)."""
+    for avaliacao in lista_avaliacoes if lista_avaliacoes is not None else avaliacoes.listar():
+        try:
+            _resumo(cache, avaliacao, ())
+        except FileNotFoundError:
+            continue
+
+
+@st.cache_resource(show_spinner=False)
+def cache_processo():
+    """Instância única do cache para o processo, criada já com as seleções padrão calculadas."""
+    cache = CacheLRU()
+    aquecer(cache)
+    return cache
+
+
+def resumo(avaliacao, turmas=()):
+    """Agregados (`agregacao.ResumoNiveis`) da avaliação para o filtro de turmas informado."""
+    return _resumo(cache_processo(), avaliacao, turmas)
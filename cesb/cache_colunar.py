@@ -0,0 +1,133 @@
+"""Cache colunar (Arrow IPC) dos arquivos CSV de avaliações.
+
+Na primeira leitura cada CSV é convertido para um arquivo Arrow tipado, gravado em
+`.cache_colunar/` junto com um `.schema.json` que guarda o esquema e a assinatura
+(mtime e tamanho) do CSV de origem. Nas leituras seguintes o arquivo Arrow é aberto
+por memory-map e o CSV só é relido quando a assinatura muda.
+
+Para gerar o cache de todos os arquivos de uma vez (por exemplo, no deploy):
+
+    python -m cesb.cache_colunar
+"""
+import json
+import os
+
+from cesb.leitura import ler_csv_texto
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # pyarrow é opcional: sem ele os CSVs são sempre lidos em texto
+    pa = None
+
+# Pasta onde ficam os arquivos .arrow e .schema.json
+DIRETORIO_CACHE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache_colunar")
+
+# Versão do formato gravado; mudar este valor invalida todo o cache existente
+VERSAO_FORMATO = 1
+
+
+def _caminhos_cache(caminho_csv):
+    base = os.path.join(DIRETORIO_CACHE, os.path.basename(caminho_csv))
+    return base + ".arrow", base + ".schema.json"
+
+
+def _ler_metadados(caminho_schema):
+    try:
+        with open(caminho_schema, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _assinatura_valida(metadados, assinatura, sep, decimal):
+    return (
+        metadados is not None
+        and metadados.get('versao') == VERSAO_FORMATO
+        and metadados.get('mtime_ns') == assinatura[0]
+        and metadados.get('tamanho') == assinatura[1]
+        and metadados.get('sep') == sep
+        and metadados.get('decimal') == decimal
+    )
+
+
+def _gravar(tabela, caminho_arrow, caminho_schema, metadados):
+    """Grava o Arrow e o esquema de forma atômica (arquivo temporário + os.replace)."""
+    os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+    tmp_arrow = f"{caminho_arrow}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_arrow, 'wb') as destino:
+        with pa.ipc.new_file(destino, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+    os.replace(tmp_arrow, caminho_arrow)
+
+    tmp_schema = f"{caminho_schema}.{os.getpid()}.tmp"
+    with open(tmp_schema, 'w', encoding='utf-8') as f:
+        json.dump(metadados, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_schema, caminho_schema)
+
+
+def ingerir(caminho_csv, assinatura, sep=';', decimal='.'):
+    """Lê o CSV em texto, grava a versão colunar e devolve o DataFrame lido."""
+    df = ler_csv_texto(caminho_csv, sep=sep, decimal=decimal)
+    if pa is None:
+        return df
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    metadados = {
+        'versao': VERSAO_FORMATO,
+        'fonte': os.path.basename(caminho_csv),
+        'mtime_ns': assinatura[0],
+        'tamanho': assinatura[1],
+        'sep': sep,
+        'decimal': decimal,
+        'linhas': tabela.num_rows,
+        'colunas': {campo.name: str(campo.type) for campo in tabela.schema},
+    }
+    caminho_arrow, caminho_schema = _caminhos_cache(caminho_csv)
+    try:
+        _gravar(tabela, caminho_arrow, caminho_schema, metadados)
+    except OSError:
+        # Sem permissão de escrita: segue apenas com o parse em texto
+        pass
+    return df
+
+
+def carregar(caminho_csv, assinatura, sep=';', decimal='.'):
+    """Devolve o DataFrame do CSV a partir do cache colunar, reingerindo se o CSV mudou."""
+    if pa is None:
+        return ler_csv_texto(caminho_csv, sep=sep, decimal=decimal)
+
+    caminho_arrow, caminho_schema = _caminhos_cache(caminho_csv)
+    if _assinatura_valida(_ler_metadados(caminho_schema), assinatura, sep, decimal):
+        try:
+            with pa.memory_map(caminho_arrow, 'r') as fonte:
+                tabela = pa.ipc.open_file(fonte).read_all()
+            return tabela.to_pandas()
+        except (OSError, pa.ArrowInvalid):
+            pass
+    return ingerir(caminho_csv, assinatura, sep=sep, decimal=decimal)
+
+
+def main():
+    """Gera o cache colunar de todos os CSVs conhecidos da pasta de dados."""
+    from cesb import avaliacoes, dados
+
+    # Mesmo separador e decimal usados na leitura (`dados.carregar_caed`), para a assinatura bater
+    registradas = {avaliacao.arquivo: avaliacao for avaliacao in avaliacoes.listar()}
+    for nome, avaliacao in registradas.items():
+        if not os.path.exists(dados.caminho_arquivo(nome)):
+            print(f"⚠️ {nome} não encontrado")
+            continue
+        ingerir(dados.caminho_arquivo(nome), dados.assinatura_arquivo(nome), sep=avaliacao.sep, decimal=avaliacao.decimal)
+        print(f"✅ {nome}")
+    for nome in dados.listar_arquivos('CAED*.csv'):
+        if nome not in registradas:
+            ingerir(dados.caminho_arquivo(nome), dados.assinatura_arquivo(nome), sep=';')
+            print(f"✅ {nome}")
+    for nome in dados.listar_arquivos('*_*ED.csv'):
+        ingerir(dados.caminho_arquivo(nome), dados.assinatura_arquivo(nome), sep=';', decimal=',')
+        print(f"✅ {nome}")
+
+
+if __name__ == "__main__":
+    main()
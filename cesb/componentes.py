@@ -0,0 +1,93 @@
+"""Componentes de interface compartilhados pelas páginas.
+
+As listas de alunos são montadas com máscaras vetorizadas e exibidas em uma única tabela
+paginada no servidor: o navegador recebe uma mensagem por página da lista, e não uma
+por aluno.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Quantidade de linhas enviadas ao navegador por página das listas de alunos
+TAMANHO_PAGINA = 50
+
+
+def habilidades_no_nivel(alunos, codigos, valor, nivel_maximo):
+    """Alunos com pelo menos uma habilidade no nível `valor`.
+
+    Valores acima de `nivel_maximo` contam no nível máximo, como nos agregados das páginas.
+    Retorna um DataFrame com Aluno, Turma, Habilidades (códigos separados por vírgula)
+    e Quantidade, calculado com uma máscara booleana (alunos × habilidades).
+    """
+    codigos = list(codigos)
+    mascara = np.minimum(alunos[codigos].to_numpy(), nivel_maximo) == valor
+    quantidade = mascara.sum(axis=1)
+    selecionados = quantidade > 0
+
+    # Produto da máscara pelos rótulos "H01, ": concatena os códigos marcados de cada linha
+    rotulos = np.array([f"{codigo}, " for codigo in codigos], dtype=object)
+    juntos = mascara[selecionados].astype(object).dot(rotulos) if selecionados.any() else np.array([], dtype=object)
+
+    return pd.DataFrame({
+        "Aluno": alunos["Aluno"].to_numpy()[selecionados],
+        "Turma": np.asarray(alunos["Turma"], dtype=object)[selecionados],
+        "Habilidades": pd.Series(juntos, dtype=object).str.removesuffix(", ").to_numpy(),
+        "Quantidade": quantidade[selecionados],
+    })
+
+
+def selecionar_aluno(alunos, rotulo="Selecione um aluno:"):
+    """Caixa de seleção dos alunos em ordem alfabética; retorna (aluno, turma) do escolhido.
+
+    Nomes que se repetem em turmas diferentes aparecem com a turma entre parênteses.
+    """
+    repetidos = set(alunos["Aluno"][alunos["Aluno"].duplicated()])
+    nomes = alunos["Aluno"].to_numpy(dtype=object)
+    turmas = np.asarray(alunos["Turma"], dtype=object)
+
+    def rotulo_aluno(posicao):
+        nome = nomes[posicao]
+        return f"{nome} ({turmas[posicao]})" if nome in repetidos else nome
+
+    ordem = sorted(range(len(nomes)), key=lambda posicao: (nomes[posicao], turmas[posicao]))
+    posicao = st.selectbox(rotulo, ordem, format_func=rotulo_aluno)
+    if posicao is None:
+        return None, None
+    return nomes[posicao], turmas[posicao]
+
+
+def tabela_paginada(df, chave, tamanho_pagina=TAMANHO_PAGINA, **kwargs):
+    """Exibe `df` em um único `st.dataframe`, enviando apenas a página selecionada."""
+    total = len(df)
+    paginas = max(1, math.ceil(total / tamanho_pagina))
+    pagina = 1
+    if paginas > 1:
+        chave_pagina = f"pagina_{chave}"
+        # Com outro filtro a lista pode ter encolhido: volta para a primeira página
+        if st.session_state.get(chave_pagina, 1) > paginas:
+            st.session_state[chave_pagina] = 1
+        pagina = st.number_input(
+            f"Página (de {paginas})",
+            min_value=1,
+            max_value=paginas,
+            step=1,
+            key=chave_pagina
+        )
+    inicio = (pagina - 1) * tamanho_pagina
+    fim = min(inicio + tamanho_pagina, total)
+    kwargs.setdefault("hide_index", True)
+    kwargs.setdefault("use_container_width", True)
+    st.dataframe(df.iloc[inicio:fim], **kwargs)
+    if paginas > 1:
+        st.caption(f"Mostrando {inicio + 1}–{fim} de {total} alunos")
+
+
+def lista_alunos(alunos, chave, tamanho_pagina=TAMANHO_PAGINA):
+    """Lista de alunos (nome e turma), na ordem do arquivo, em uma tabela paginada."""
+    tabela = pd.DataFrame({
+        "Aluno": alunos["Aluno"].to_numpy(),
+        "Turma": np.asarray(alunos["Turma"], dtype=object),
+    })
+    tabela_paginada(tabela, chave, tamanho_pagina)
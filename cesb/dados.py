@@ -0,0 +1,195 @@
+"""Camada única de acesso aos arquivos CSV usados pelas páginas do CESB Analytics.
+
+Cada arquivo é lido uma única vez por processo e o resultado é compartilhado entre
+todas as sessões. A chave do cache inclui a data de modificação e o tamanho do
+arquivo, então qualquer edição no CSV é percebida na próxima leitura. Em processos
+novos a leitura parte do cache colunar em disco (ver `cesb.cache_colunar`).
+"""
+import glob
+import os
+
+import pandas as pd
+import streamlit as st
+
+from cesb import avaliacoes, cache_colunar, leitura, longitudinal
+from cesb.indice_alunos import indexar_alunos
+from cesb.matriz import montar_matriz
+
+# Pasta onde ficam os arquivos CSV das avaliações (CAED e Prova Paraná)
+DIRETORIO_DADOS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+
+# Turmas da Prova Paraná mantidas montadas em memória ao mesmo tempo (as menos usadas saem primeiro)
+MAX_TURMAS_EM_MEMORIA = 8
+
+
+def caminho_arquivo(nome_arquivo):
+    """Retorna o caminho completo de um arquivo da pasta de dados."""
+    return os.path.join(DIRETORIO_DADOS, nome_arquivo)
+
+
+def listar_arquivos(padrao="*.csv"):
+    """Lista (ordenados) os nomes dos arquivos da pasta de dados que seguem o padrão."""
+    return sorted(os.path.basename(c) for c in glob.glob(os.path.join(DIRETORIO_DADOS, padrao)))
+
+
+def assinatura_arquivo(nome_arquivo):
+    """Retorna (mtime_ns, tamanho) do arquivo; levanta FileNotFoundError se não existir."""
+    info = os.stat(caminho_arquivo(nome_arquivo))
+    return info.st_mtime_ns, info.st_size
+
+
+def assinaturas(nomes_arquivos):
+    """Assinatura de um conjunto de arquivos, útil como chave de caches derivados."""
+    return tuple((nome, *assinatura_arquivo(nome)) for nome in nomes_arquivos)
+
+
+@st.cache_data(show_spinner=False)
+def _ler_csv(caminho, mtime_ns, tamanho, sep, decimal):
+    """Lê o CSV pelo cache colunar; o texto só é reprocessado quando o arquivo muda."""
+    return cache_colunar.carregar(caminho, (mtime_ns, tamanho), sep=sep, decimal=decimal)
+
+
+def carregar_csv(nome_arquivo, sep=';', decimal='.'):
+    """Carrega um CSV da pasta de dados usando o cache compartilhado entre sessões."""
+    mtime_ns, tamanho = assinatura_arquivo(nome_arquivo)
+    return _ler_csv(caminho_arquivo(nome_arquivo), mtime_ns, tamanho, sep, decimal)
+
+
+def carregar_caed(nome_arquivo):
+    """Carrega um arquivo de resultados do CAED (Aluno, Turma, H01...), já com os textos limpos."""
+    avaliacao = avaliacoes.por_arquivo(nome_arquivo)
+    if avaliacao is not None:
+        df = carregar_csv(nome_arquivo, sep=avaliacao.sep, decimal=avaliacao.decimal)
+    else:
+        df = carregar_csv(nome_arquivo, sep=';')
+    for col in ('Aluno', 'Turma'):
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip()
+    return df
+
+
+@st.cache_resource(show_spinner=False)
+def _montar_matriz_caed(nome_arquivo, mtime_ns, tamanho):
+    """Matriz compacta do arquivo; a mesma instância (somente leitura) é compartilhada entre sessões."""
+    avaliacao = avaliacoes.por_arquivo(nome_arquivo)
+    colunas = avaliacao.colunas if avaliacao is not None else None
+    return montar_matriz(carregar_caed(nome_arquivo), colunas_habilidades=colunas)
+
+
+def carregar_matriz_caed(nome_arquivo):
+    """Carrega um arquivo do CAED no modo compacto (`MatrizHabilidades` com níveis em int8)."""
+    mtime_ns, tamanho = assinatura_arquivo(nome_arquivo)
+    return _montar_matriz_caed(nome_arquivo, mtime_ns, tamanho)
+
+
+@st.cache_resource(show_spinner=False)
+def _indexar_alunos_caed(nome_arquivo, mtime_ns, tamanho):
+    """Índice dos alunos do arquivo, compartilhado entre sessões como a matriz."""
+    avaliacao = avaliacoes.por_arquivo(nome_arquivo)
+    matriz = _montar_matriz_caed(nome_arquivo, mtime_ns, tamanho)
+    return indexar_alunos(matriz, avaliacao.habilidades, avaliacao.nivel_maximo)
+
+
+def carregar_indice_alunos(nome_arquivo):
+    """Índice (nome → linha, bitsets por nível) dos alunos de um arquivo do CAED registrado."""
+    mtime_ns, tamanho = assinatura_arquivo(nome_arquivo)
+    return _indexar_alunos_caed(nome_arquivo, mtime_ns, tamanho)
+
+
+def arquivos_prova_parana(turma=None, edicoes=None):
+    """Arquivos da Prova Paraná (<turma>_<edição>ED.csv) de todas as turmas ou de uma só, opcionalmente só de algumas edições."""
+    padrao = f"{turma}_*ED.csv" if turma else "*_*ED.csv"
+    arquivos = []
+    for nome in listar_arquivos(padrao):
+        identificacao = longitudinal.identificar_arquivo(nome)
+        if identificacao and (edicoes is None or identificacao[1] in edicoes):
+            arquivos.append(nome)
+    return arquivos
+
+
+def ler_prova_parana(nome_arquivo):
+    """Lê um arquivo da Prova Paraná direto do cache colunar, com as colunas numéricas convertidas.
+
+    Não guarda nada em memória (quem compartilha o resultado é `_carregar_prova_parana`).
+    Retorna (DataFrame, células que não eram números).
+    """
+    df = cache_colunar.carregar(caminho_arquivo(nome_arquivo), assinatura_arquivo(nome_arquivo), sep=';', decimal=',')
+    return leitura.converter_numeros(df, longitudinal.tipos_numericos(df))
+
+
+@st.cache_data(show_spinner=False)
+def _carregar_prova_parana(nome_arquivo, mtime_ns, tamanho):
+    """Arquivo convertido e células inválidas, compartilhados entre sessões."""
+    return ler_prova_parana(nome_arquivo)
+
+
+def _prova_parana_em_cache(nome_arquivo):
+    """(DataFrame, células inválidas) do arquivo, pelo cache compartilhado (preenchido no pré-aquecimento)."""
+    return _carregar_prova_parana(nome_arquivo, *assinatura_arquivo(nome_arquivo))
+
+
+def carregar_prova_parana(nome_arquivo):
+    """Carrega um arquivo da Prova Paraná (nomeAluno, cgm, percentuais por disciplina) já em tipos numéricos."""
+    return _prova_parana_em_cache(nome_arquivo)[0]
+
+
+def celulas_invalidas_prova_parana(nome_arquivo):
+    """Células do arquivo que não puderam ser lidas como número (`leitura.CelulaInvalida`)."""
+    return _prova_parana_em_cache(nome_arquivo)[1]
+
+
+@st.cache_data(show_spinner=False)
+def _resumir_prova_parana(assinaturas_arquivos):
+    """Comparativo entre edições montado a partir de parciais por arquivo."""
+    parciais = [
+        longitudinal.resumir_arquivo(*longitudinal.identificar_arquivo(nome), carregar_prova_parana(nome))
+        for nome, *_ in assinaturas_arquivos
+    ]
+    return longitudinal.combinar_resumos(pd.concat(parciais, ignore_index=True))
+
+
+def carregar_resumo_prova_parana():
+    """Média, alunos e variação por turma × edição × disciplina de todas as turmas da Prova Paraná."""
+    return _resumir_prova_parana(assinaturas(arquivos_prova_parana()))
+
+
+@st.cache_resource(show_spinner=False, max_entries=MAX_TURMAS_EM_MEMORIA)
+def _montar_turma_prova_parana(turma, assinaturas_arquivos):
+    """Base longitudinal de uma turma (Prova Paraná e CAED) e células inválidas por arquivo da Prova Paraná.
+
+    As turmas menos usadas saem da memória.
+    """
+    provas, caed, invalidas = [], [], {}
+    for nome, *_ in assinaturas_arquivos:
+        identificacao = longitudinal.identificar_arquivo(nome)
+        if identificacao is not None:
+            df, invalidas[nome] = _prova_parana_em_cache(nome)
+            provas.append((*identificacao, df))
+        else:
+            caed.append((avaliacoes.por_arquivo(nome), carregar_indice_alunos(nome)))
+    return longitudinal.montar_base(provas, caed, turmas=[turma]), invalidas
+
+
+def carregar_turma_prova_parana(turma):
+    """Detalhe de uma única turma, montado sob demanda: (base longitudinal, {arquivo: células inválidas}).
+
+    A base junta, pelo CGM (ou nome), as edições da Prova Paraná e as avaliações do CAED da turma.
+    """
+    arquivos = arquivos_prova_parana(turma) + [a.arquivo for a in avaliacoes.listar(longitudinal.serie_da_turma(turma))]
+    return _montar_turma_prova_parana(turma, assinaturas(arquivos))
+
+
+@st.cache_data(show_spinner=False)
+def _calcular_evolucao(assinaturas_arquivos, inicial, final):
+    """Tabela de evolução entre duas edições; lê só os arquivos delas e guarda só a tabela (uma linha por aluno)."""
+    provas = [
+        (*longitudinal.identificar_arquivo(nome), carregar_prova_parana(nome))
+        for nome, *_ in assinaturas_arquivos
+    ]
+    return longitudinal.evolucao(longitudinal.tabela_prova_parana(provas), inicial, final)
+
+
+def carregar_evolucao_prova_parana(inicial=1, final=2):
+    """Variação de cada aluno da escola entre duas edições da Prova Paraná (ver `longitudinal.evolucao`)."""
+    arquivos = arquivos_prova_parana(edicoes=(inicial, final))
+    return _calcular_evolucao(assinaturas(arquivos), inicial, final)
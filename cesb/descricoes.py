@@ -0,0 +1,55 @@
+"""Descrições das habilidades do CAED, em uma única fonte.
+
+As descrições ficam em `habilidades.csv`, com a chave (edição, série, disciplina,
+código). O arquivo só é lido na primeira consulta e a tabela fica em memória para
+todo o processo. `descrever` faz a busca de uma lista inteira de códigos de uma vez,
+para montar tabelas e opções de seleção sem uma chamada por habilidade.
+"""
+import functools
+import os
+
+import pandas as pd
+
+# Arquivo com as descrições de todas as habilidades
+ARQUIVO_DESCRICOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "habilidades.csv")
+
+# Texto usado quando uma habilidade não tem descrição cadastrada
+SEM_DESCRICAO = "Descrição não disponível"
+
+
+@functools.lru_cache(maxsize=None)
+def _tabela():
+    tabela = pd.read_csv(ARQUIVO_DESCRICOES, sep=';', encoding='utf-8',
+                         dtype={'edicao': int, 'serie': int, 'disciplina': str, 'codigo': str, 'descricao': str})
+    return tabela.set_index(['edicao', 'serie', 'disciplina', 'codigo'])['descricao'].sort_index()
+
+
+@functools.lru_cache(maxsize=None)
+def _por_avaliacao(edicao, serie, disciplina):
+    tabela = _tabela()
+    try:
+        return tabela.loc[(edicao, serie, disciplina)]
+    except KeyError:
+        return pd.Series(dtype=object, name='descricao')
+
+
+def da_avaliacao(avaliacao):
+    """Series código -> descrição com todas as habilidades da avaliação."""
+    return _por_avaliacao(*avaliacao.chave)
+
+
+def descricao(avaliacao, codigo, padrao=SEM_DESCRICAO):
+    """Descrição de uma única habilidade ("H01") da avaliação."""
+    return da_avaliacao(avaliacao).get(codigo, padrao)
+
+
+def descrever(avaliacao, codigos, padrao=SEM_DESCRICAO):
+    """Descrições de vários códigos de uma vez (mesma ordem de `codigos`), como Series."""
+    codigos = pd.Index(codigos)
+    return da_avaliacao(avaliacao).reindex(codigos).fillna(padrao)
+
+
+def rotulos(avaliacao, codigos, padrao="N/A"):
+    """Rótulos "H01 - descrição" para listas de seleção, montados em uma única operação."""
+    codigos = pd.Index(codigos)
+    return pd.Series(codigos, index=codigos) + " - " + descrever(avaliacao, codigos, padrao)
@@ -0,0 +1,82 @@
+"""Índice pré-calculado dos alunos para a análise individual.
+
+Cada aluno é localizado por nome e turma em um dicionário ((nome, turma) → linha da matriz) e, para cada
+nível de domínio, as habilidades do aluno ficam guardadas em um bitset (`np.packbits`).
+Montar o painel de um aluno passa a ser uma consulta direta, sem filtrar o DataFrame
+inteiro nem percorrer as habilidades a cada troca de aluno.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class PerfilAluno:
+    """Situação de um aluno: níveis por habilidade e habilidades agrupadas por nível."""
+    aluno: str
+    turma: str
+    valores: tuple
+    por_nivel: tuple
+    pontuacao_total: int
+
+
+@dataclass(frozen=True)
+class IndiceAlunos:
+    """Posição de cada aluno na matriz e bitsets (nível × aluno × bytes) das habilidades."""
+    codigos: tuple
+    posicoes: dict
+    turmas: np.ndarray
+    valores: np.ndarray
+    bits: np.ndarray
+    pontuacoes: np.ndarray
+
+    def __contains__(self, aluno_turma):
+        return aluno_turma in self.posicoes
+
+    @property
+    def n_niveis(self):
+        return self.bits.shape[0]
+
+    def habilidades_no_nivel(self, aluno, turma, nivel):
+        """Códigos das habilidades em que o aluno está no nível informado."""
+        linha = self.posicoes[(aluno, turma)]
+        marcados = np.unpackbits(self.bits[nivel, linha], count=len(self.codigos)).astype(bool)
+        return tuple(np.asarray(self.codigos, dtype=object)[marcados])
+
+    def perfil(self, aluno, turma):
+        """Perfil completo do aluno da turma; levanta KeyError se ele não estiver no índice."""
+        linha = self.posicoes[(aluno, turma)]
+        return PerfilAluno(
+            aluno=aluno,
+            turma=turma,
+            valores=tuple(self.valores[linha].tolist()),
+            por_nivel=tuple(self.habilidades_no_nivel(aluno, turma, k) for k in range(self.n_niveis)),
+            pontuacao_total=int(self.pontuacoes[linha]),
+        )
+
+
+def indexar_alunos(matriz, codigos, nivel_maximo):
+    """Monta o índice dos alunos da matriz para as habilidades informadas.
+
+    Valores acima de `nivel_maximo` contam no nível máximo; células sem resultado não
+    entram em nenhum nível. Alunos com o mesmo nome em turmas diferentes têm entradas
+    separadas; um nome repetido na mesma turma aponta para a primeira ocorrência.
+    """
+    codigos = tuple(codigos)
+    valores = np.minimum(matriz.valores[:, matriz.colunas(codigos)], nivel_maximo)
+    valores.setflags(write=False)
+
+    turmas = np.asarray(matriz.turmas, dtype=object)
+    posicoes = {}
+    for linha, chave in enumerate(zip(matriz.alunos, turmas)):
+        posicoes.setdefault(chave, linha)
+
+    bits = np.stack([np.packbits(valores == k, axis=1) for k in range(nivel_maximo + 1)])
+    return IndiceAlunos(
+        codigos=codigos,
+        posicoes=posicoes,
+        turmas=turmas,
+        valores=valores,
+        bits=bits,
+        pontuacoes=np.where(valores > 0, valores, 0).sum(axis=1),
+    )
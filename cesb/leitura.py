@@ -0,0 +1,62 @@
+"""Leitura dos arquivos CSV em texto (parse bruto, sem cache) e conversão das colunas numéricas."""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class CelulaInvalida:
+    """Célula que não pôde ser convertida para número; `linha` é a linha do arquivo (o cabeçalho é a linha 1)."""
+    linha: int
+    coluna: str
+    valor: str
+
+
+def ler_csv_texto(caminho, sep=';', decimal='.'):
+    """Faz o parse do CSV tentando UTF-8 e, se falhar, Latin-1. Limpa os nomes das colunas."""
+    try:
+        df = pd.read_csv(caminho, sep=sep, decimal=decimal, encoding='utf-8')
+    except UnicodeDecodeError:
+        df = pd.read_csv(caminho, sep=sep, decimal=decimal, encoding='latin-1')
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def converter_numeros(df, tipos):
+    """Converte as colunas numéricas aceitando vírgula ou ponto decimal, inclusive misturados na mesma coluna.
+
+    `tipos` mapeia coluna → tipo final (por exemplo 'float64' ou 'Int64'); colunas ausentes
+    são ignoradas. Colunas que já chegaram numéricas só recebem o tipo final; as de texto
+    são convertidas todas juntas, em uma única passada sobre o bloco de células.
+    Em colunas inteiras, números com parte fracionária (por exemplo, "7.5" no CGM) também são
+    inválidos. Retorna (DataFrame convertido, lista de `CelulaInvalida`); células inválidas viram NaN.
+    """
+    tipos = {col: tipo for col, tipo in tipos.items() if col in df.columns}
+    texto = [col for col in tipos if not pd.api.types.is_numeric_dtype(df[col])]
+    convertido = df.copy()
+    invalidas = []
+
+    if texto:
+        num_linhas = len(df)
+        # Bloco linhas × colunas achatado coluna a coluna: posição = coluna * num_linhas + linha
+        celulas = pd.Series(df[texto].to_numpy(dtype=object).ravel(order='F'), dtype='string').str.strip()
+        numeros = pd.to_numeric(celulas.str.replace(',', '.', regex=False), errors='coerce')
+        ruins = (numeros.isna() & celulas.fillna('').ne('')).to_numpy()
+        for posicao in np.flatnonzero(ruins):
+            coluna, linha = divmod(int(posicao), num_linhas)
+            invalidas.append(CelulaInvalida(linha=linha + 2, coluna=texto[coluna], valor=str(celulas.iat[posicao])))
+
+        bloco = numeros.to_numpy(dtype=float, na_value=np.nan).reshape((num_linhas, len(texto)), order='F')
+        for k, col in enumerate(texto):
+            convertido[col] = bloco[:, k]
+
+    for col, tipo in tipos.items():
+        if pd.api.types.is_integer_dtype(tipo) and not pd.api.types.is_integer_dtype(convertido[col]):
+            valores = convertido[col].to_numpy(dtype=float, na_value=np.nan)
+            fracionarios = ~np.isnan(valores) & ~(np.isfinite(valores) & (valores == np.round(valores)))
+            for linha in np.flatnonzero(fracionarios):
+                invalidas.append(CelulaInvalida(linha=int(linha) + 2, coluna=col, valor=str(df[col].iat[linha]).strip()))
+            convertido[col] = np.where(fracionarios, np.nan, valores)
+        convertido[col] = convertido[col].astype(tipo)
+    return convertido, invalidas
@@ -0,0 +1,274 @@
+"""Base longitudinal dos alunos: todas as edições e avaliações de cada aluno em um único registro.
+
+A chave do aluno é o CGM. Quem não tem CGM (os arquivos do CAED não trazem a coluna) é
+ligado pelo nome normalizado ao CGM encontrado na Prova Paraná; sem correspondência, o
+próprio nome normalizado vira a chave. As junções entre edições e avaliações são feitas
+por dicionário e índice (hash), sem comparar colunas inteiras de nomes a cada consulta.
+"""
+import re
+import unicodedata
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Arquivos da Prova Paraná: <turma>_<edição>ED.csv (por exemplo, 9A_1ED.csv)
+PADRAO_PROVA_PARANA = re.compile(r"^(?P<turma>[^_]+)_(?P<edicao>\d+)ED\.csv$")
+
+# Colunas dos arquivos da Prova Paraná que não são disciplinas
+COLUNA_ALUNO = 'nomeAluno'
+COLUNA_CGM = 'cgm'
+COLUNAS_IDENTIFICACAO = (COLUNA_ALUNO, COLUNA_CGM, 'percAcertosAluno', 'percAcertosGeral', 'presenca')
+
+
+def normalizar_nome(nome):
+    """Nome em maiúsculas, sem acentos e com espaços simples, para comparar grafias diferentes."""
+    sem_acentos = unicodedata.normalize('NFKD', str(nome)).encode('ascii', 'ignore').decode('ascii')
+    return " ".join(sem_acentos.upper().split())
+
+
+def chave_cgm(cgm):
+    return f"cgm:{int(cgm)}"
+
+
+def identificar_arquivo(nome_arquivo):
+    """(turma, edição) de um arquivo da Prova Paraná, ou None se o nome não seguir o padrão."""
+    encontrado = PADRAO_PROVA_PARANA.match(nome_arquivo)
+    if encontrado is None:
+        return None
+    return encontrado['turma'], int(encontrado['edicao'])
+
+
+def serie_da_turma(turma):
+    """Série pelo número no início do nome da turma ('9A' → 9); None se não houver."""
+    encontrado = re.match(r'\d+', str(turma))
+    return int(encontrado.group()) if encontrado else None
+
+
+def disciplinas(df):
+    """Colunas de disciplina (percentual de acertos) de um arquivo da Prova Paraná."""
+    return [col for col in df.columns if col not in COLUNAS_IDENTIFICACAO]
+
+
+def tipos_numericos(df):
+    """Tipo final de cada coluna numérica de um arquivo da Prova Paraná (para `leitura.converter_numeros`)."""
+    tipos = {COLUNA_CGM: 'Int64', 'presenca': 'Int64', 'percAcertosAluno': 'float64', 'percAcertosGeral': 'float64'}
+    tipos.update(dict.fromkeys(disciplinas(df), 'float64'))
+    return tipos
+
+
+@dataclass(frozen=True)
+class RegistroAluno:
+    """Tudo o que se sabe de um aluno: Prova Paraná por edição e CAED por avaliação."""
+    chave: str
+    nome: str
+    cgm: object
+    prova_parana: pd.DataFrame
+    caed: pd.DataFrame
+
+
+@dataclass(frozen=True)
+class BaseLongitudinal:
+    """Alunos (índice: chave), Prova Paraná (índice: chave, edição) e CAED (índice: chave, arquivo)."""
+    alunos: pd.DataFrame
+    prova_parana: pd.DataFrame
+    caed: pd.DataFrame
+    por_nome: dict
+
+    def nome(self, chave):
+        return self.alunos.at[chave, 'nome']
+
+    def alunos_em_comum(self, turma, edicoes):
+        """Chaves dos alunos da turma presentes em todas as edições informadas."""
+        linhas = self.prova_parana[self.prova_parana['turma'] == turma]
+        linhas = linhas[linhas.index.get_level_values('edicao').isin(edicoes)]
+        presencas = linhas.groupby(level='chave').size()
+        return list(presencas.index[presencas == len(set(edicoes))])
+
+    def registro(self, chave):
+        """Registro completo do aluno; levanta KeyError se a chave não existir."""
+        aluno = self.alunos.loc[chave]
+        return RegistroAluno(
+            chave=chave,
+            nome=aluno['nome'],
+            cgm=aluno['cgm'],
+            prova_parana=_linhas_da_chave(self.prova_parana, chave),
+            caed=_linhas_da_chave(self.caed, chave),
+        )
+
+
+def _linhas_da_chave(tabela, chave):
+    """Linhas de uma tabela indexada por (chave, ...) sem o primeiro nível; vazio se não houver."""
+    if chave not in tabela.index.get_level_values(0):
+        return tabela.iloc[:0].droplevel(0)
+    return tabela.xs(chave, level=0)
+
+
+def resumir_arquivo(turma, edicao, df):
+    """Soma dos percentuais e número de alunos por disciplina de um arquivo (parcial de `combinar_resumos`).
+
+    Na média da turma, disciplina sem resultado conta como 0% de acertos.
+    """
+    colunas = disciplinas(df)
+    return pd.DataFrame({
+        'serie': serie_da_turma(turma),
+        'turma': turma,
+        'disciplina': colunas,
+        'edicao': edicao,
+        'soma': df[colunas].fillna(0.0).sum().to_numpy(),
+        'alunos': len(df),
+    })
+
+
+def combinar_resumos(parciais):
+    """Junta as parciais (soma e alunos por série, turma, disciplina e edição) no comparativo entre edições.
+
+    Vale para qualquer número de edições. Ficam só as disciplinas presentes em todas as
+    edições da turma, para que a comparação seja sempre entre as mesmas provas.
+    """
+    resumo = (parciais.groupby(['serie', 'turma', 'disciplina', 'edicao'], observed=True)[['soma', 'alunos']]
+              .sum().reset_index())
+    resumo['media'] = resumo['soma'] / resumo['alunos']
+    edicoes_turma = resumo.groupby('turma', observed=True)['edicao'].transform('nunique')
+    edicoes_disciplina = resumo.groupby(['turma', 'disciplina'], observed=True)['edicao'].transform('size')
+    resumo = resumo[edicoes_disciplina == edicoes_turma].reset_index(drop=True)
+    resumo['variacao'] = resumo.groupby(['turma', 'disciplina'], observed=True)['media'].diff()
+    return resumo[['serie', 'turma', 'disciplina', 'edicao', 'media', 'alunos', 'variacao']]
+
+
+def _tabela_prova(turma, edicao, df):
+    """Arquivo (já convertido por `leitura.converter_numeros`) com a chave do aluno, turma e edição."""
+    tabela = df.copy()
+    tabela['nome_normalizado'] = tabela[COLUNA_ALUNO].map(normalizar_nome)
+    tabela['turma'] = turma
+    tabela['edicao'] = edicao
+    return tabela
+
+
+def _empilhar_provas(provas):
+    """Arquivos da Prova Paraná empilhados com a chave do aluno; retorna (tabela, nome normalizado → chave)."""
+    tabelas = [_tabela_prova(turma, edicao, df) for turma, edicao, df in provas]
+    provas_df = pd.concat(tabelas, ignore_index=True) if tabelas else pd.DataFrame(
+        columns=[*COLUNAS_IDENTIFICACAO, 'nome_normalizado', 'turma', 'edicao'])
+
+    # Nome normalizado → chave do CGM (primeira ocorrência), usado por quem não tem CGM
+    por_nome = {}
+    for nome, cgm in zip(provas_df['nome_normalizado'], provas_df['cgm']):
+        if not pd.isna(cgm):
+            por_nome.setdefault(nome, chave_cgm(cgm))
+    provas_df['chave'] = [
+        chave_cgm(cgm) if not pd.isna(cgm) else por_nome.get(nome, f"nome:{nome}")
+        for cgm, nome in zip(provas_df['cgm'], provas_df['nome_normalizado'])
+    ]
+    return provas_df, por_nome
+
+
+def _indexar_provas(provas_df):
+    return (provas_df.drop(columns=['nome_normalizado'])
+            .drop_duplicates(['chave', 'edicao'])
+            .set_index(['chave', 'edicao']).sort_index())
+
+
+def tabela_prova_parana(provas):
+    """Só a Prova Paraná dos arquivos informados, indexada por (chave, edição), sem montar a base toda."""
+    return _indexar_provas(_empilhar_provas(provas)[0])
+
+
+def montar_base(provas, caed=(), turmas=None):
+    """Monta a base longitudinal.
+
+    `provas`: (turma, edição, DataFrame) de cada arquivo da Prova Paraná;
+    `caed`: (Avaliacao, IndiceAlunos) de cada avaliação do CAED;
+    `turmas`: se informado, só os alunos do CAED dessas turmas entram na base.
+    """
+    provas_df, por_nome = _empilhar_provas(provas)
+
+    def resolver(nomes_normalizados):
+        return [por_nome.get(nome, f"nome:{nome}") for nome in nomes_normalizados]
+
+    linhas_caed = []
+    for avaliacao, indice in caed:
+        nomes = [aluno for aluno, _ in indice.posicoes]
+        posicoes = np.fromiter(indice.posicoes.values(), dtype=np.intp, count=len(nomes))
+        if turmas is not None:
+            da_turma = np.isin(indice.turmas[posicoes], list(turmas))
+            nomes, posicoes = [nome for nome, manter in zip(nomes, da_turma) if manter], posicoes[da_turma]
+        pontos = indice.pontuacoes[posicoes]
+        linhas_caed.append(pd.DataFrame({
+            'chave': resolver(map(normalizar_nome, nomes)),
+            'arquivo': avaliacao.arquivo,
+            'nome': nomes,
+            'edicao': avaliacao.edicao,
+            'serie': avaliacao.serie,
+            'disciplina': avaliacao.disciplina,
+            'turma': indice.turmas[posicoes],
+            'pontuacao': pontos,
+            'percentual': 100.0 * pontos / (len(indice.codigos) * avaliacao.nivel_maximo),
+        }))
+    caed_df = pd.concat(linhas_caed, ignore_index=True) if linhas_caed else pd.DataFrame(
+        columns=['chave', 'arquivo', 'nome', 'edicao', 'serie', 'disciplina', 'turma', 'pontuacao', 'percentual'])
+
+    # Um registro por aluno: nome e turma da edição mais recente da Prova Paraná ou, na falta, do CAED
+    alunos = pd.concat([
+        caed_df[['chave', 'nome', 'turma']].assign(cgm=pd.NA, ordem=-1),
+        provas_df[['chave', COLUNA_ALUNO, 'turma', 'cgm', 'edicao']].rename(
+            columns={COLUNA_ALUNO: 'nome', 'edicao': 'ordem'}),
+    ], ignore_index=True)
+    alunos = (alunos.sort_values('ordem', kind='stable')
+              .groupby('chave', sort=True)[['nome', 'cgm', 'turma']].last())
+
+    prova_parana = _indexar_provas(provas_df)
+    caed_df = (caed_df.drop_duplicates(['chave', 'arquivo'])
+               .set_index(['chave', 'arquivo']).sort_index())
+    return BaseLongitudinal(alunos=alunos, prova_parana=prova_parana, caed=caed_df, por_nome=por_nome)
+
+
+def evolucao(prova_parana, inicial=1, final=2):
+    """Variação de cada aluno entre duas edições da Prova Paraná (final − inicial).
+
+    `prova_parana` é indexada por (chave, edição), como `BaseLongitudinal.prova_parana` ou
+    `tabela_prova_parana`. Junta as duas edições pela chave do aluno e calcula, de uma vez, a
+    variação do percentual geral (`percAcertosAluno`) e de cada disciplina; disciplinas que o
+    aluno não fez em alguma das edições ficam NaN. Retorna um DataFrame indexado pela chave com nome,
+    turma e série (da edição final), geral inicial e final, variação e uma coluna por disciplina.
+    """
+    colunas = ['percAcertosAluno', *(col for col in prova_parana.columns if col not in (*COLUNAS_IDENTIFICACAO, 'turma'))]
+    antes = prova_parana.xs(inicial, level='edicao')
+    depois = prova_parana.xs(final, level='edicao')
+    chaves = antes.index.intersection(depois.index)
+    variacoes = depois.loc[chaves, colunas] - antes.loc[chaves, colunas]
+
+    tabela = pd.DataFrame({
+        'nome': depois.loc[chaves, COLUNA_ALUNO],
+        'turma': depois.loc[chaves, 'turma'],
+        'serie': depois.loc[chaves, 'turma'].map(serie_da_turma).astype('Int64'),
+        'inicial': antes.loc[chaves, 'percAcertosAluno'],
+        'final': depois.loc[chaves, 'percAcertosAluno'],
+        'variacao': variacoes['percAcertosAluno'],
+    })
+    por_disciplina = variacoes.drop(columns='percAcertosAluno').dropna(axis=1, how='all')
+    return pd.concat([tabela, por_disciplina], axis=1)
+
+
+def _menores(valores, posicoes, k):
+    """As `k` posições de menor valor (NaN excluídos), em ordem crescente, sem ordenar o conjunto todo."""
+    posicoes = posicoes[~np.isnan(valores[posicoes])]
+    if len(posicoes) > k:
+        posicoes = posicoes[np.argpartition(valores[posicoes], k - 1)[:k]]
+    return posicoes[np.argsort(valores[posicoes], kind='stable')]
+
+
+def maiores_variacoes(tabela, k=10, coluna='variacao', quedas=True, por=None):
+    """Os `k` alunos com maiores quedas (ou avanços) em `coluna`, na escola toda ou em cada grupo de `por`.
+
+    A seleção usa `np.argpartition` (linear) e só os `k` escolhidos de cada grupo são ordenados.
+    """
+    valores = tabela[coluna].to_numpy(dtype=float, na_value=np.nan)
+    if not quedas:
+        valores = -valores
+    if por is None:
+        grupos = [np.arange(len(tabela))]
+    else:
+        grupos = [np.asarray(posicoes) for _, posicoes in sorted(tabela.groupby(por, observed=True).indices.items())]
+    selecionados = [_menores(valores, posicoes, k) for posicoes in grupos]
+    return tabela.iloc[np.concatenate(selecionados) if selecionados else []]
@@ -0,0 +1,85 @@
+"""Geração de grupos para a escola inteira, em paralelo.
+
+Cada turma de cada arquivo vira uma tarefa independente, resolvida em um pool de
+processos (um por núcleo). Os resultados são devolvidos à medida que cada turma termina,
+para que a interface possa exibi-los sem esperar as demais, e podem ser reunidos em uma
+única tabela para exportação.
+
+O módulo não importa o Streamlit: os processos do pool carregam apenas o necessário
+para formar os grupos.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import pandas as pd
+
+from cesb import agrupamento
+
+
+@dataclass(frozen=True)
+class TarefaTurma:
+    """Uma turma a ser agrupada: os dados já vêm recortados (Aluno + habilidades)."""
+    arquivo: str
+    avaliacao: str
+    turma: str
+    alunos: pd.DataFrame
+    habilidades: tuple
+    max_por_grupo: int
+    metodo: str
+    semente: int = 0
+    restricoes: agrupamento.Restricoes = None
+
+
+@dataclass(frozen=True)
+class ResultadoTurma:
+    """Grupos formados para uma turma, em formato de tabela (uma linha por aluno)."""
+    tarefa: TarefaTurma
+    atribuicoes: pd.DataFrame
+    num_grupos: int
+    dispersao: float
+
+
+def resolver_turma(tarefa):
+    """Forma os grupos de uma turma (executado dentro do processo do pool)."""
+    grupos = agrupamento.METODOS[tarefa.metodo](
+        tarefa.alunos, list(tarefa.habilidades), tarefa.max_por_grupo,
+        semente=tarefa.semente, restricoes=tarefa.restricoes
+    )
+    linhas = [
+        (tarefa.arquivo, tarefa.avaliacao, tarefa.turma, numero, aluno['Aluno'])
+        for numero, grupo in enumerate(grupos, 1)
+        for aluno in grupo
+    ]
+    atribuicoes = pd.DataFrame(linhas, columns=["Arquivo", "Avaliação", "Turma", "Grupo", "Aluno"])
+    return ResultadoTurma(
+        tarefa=tarefa,
+        atribuicoes=atribuicoes,
+        num_grupos=len(grupos),
+        dispersao=agrupamento.dispersao_grupos(grupos, list(tarefa.habilidades)),
+    )
+
+
+def resolver_em_paralelo(tarefas, max_processos=None):
+    """Resolve as tarefas em um pool de processos, devolvendo cada resultado assim que fica pronto.
+
+    Usa o método "spawn" para não duplicar as threads do servidor nos processos filhos.
+    """
+    tarefas = list(tarefas)
+    if not tarefas:
+        return
+    max_processos = min(max_processos or os.cpu_count() or 1, len(tarefas))
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_processos, mp_context=contexto) as executor:
+        futuros = [executor.submit(resolver_turma, tarefa) for tarefa in tarefas]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+
+
+def exportar(resultados):
+    """Reúne as atribuições de todas as turmas em uma única tabela, ordenada por arquivo, turma e grupo."""
+    if not resultados:
+        return pd.DataFrame(columns=["Arquivo", "Avaliação", "Turma", "Grupo", "Aluno"])
+    tabela = pd.concat([resultado.atribuicoes for resultado in resultados], ignore_index=True)
+    return tabela.sort_values(["Arquivo", "Turma", "Grupo", "Aluno"], kind="stable", ignore_index=True)
@@ -0,0 +1,82 @@
+"""Representação compacta dos resultados do CAED (matriz de habilidades em int8).
+
+Os níveis de domínio vão de 0 a 3, então cada célula cabe em um `int8`. A turma é
+guardada como `Categorical` e os nomes dos alunos ficam em um índice separado, com as
+strings internadas. A matriz (alunos × habilidades) permite que as agregações das
+páginas sejam feitas com uma única operação vetorizada do NumPy.
+"""
+import re
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Valor usado na matriz para células sem resultado
+SEM_RESULTADO = -1
+
+# Aceita os dois formatos de coluna dos arquivos do CAED: "H 01" e "H01"
+_PADRAO_HABILIDADE = re.compile(r"^H\s*(\d+)$")
+
+
+def codigo_habilidade(coluna):
+    """Converte o nome da coluna ("H 01", "H01", "H1") para o código padrão "H01"; None se não for habilidade."""
+    encontrado = _PADRAO_HABILIDADE.match(coluna.strip())
+    if not encontrado:
+        return None
+    return f"H{int(encontrado.group(1)):02d}"
+
+
+@dataclass(frozen=True)
+class MatrizHabilidades:
+    """Resultados de uma avaliação: uma linha por aluno, uma coluna por habilidade."""
+    alunos: pd.Index
+    turmas: pd.Categorical
+    codigos: tuple
+    valores: np.ndarray
+
+    def __len__(self):
+        return len(self.alunos)
+
+    def colunas(self, codigos):
+        """Posições das habilidades pedidas dentro de `valores`."""
+        posicao = {cod: i for i, cod in enumerate(self.codigos)}
+        return np.array([posicao[cod] for cod in codigos], dtype=np.intp)
+
+    def mascara_turmas(self, turmas):
+        """Máscara booleana dos alunos que pertencem às turmas informadas."""
+        return np.asarray(self.turmas.isin(list(turmas)))
+
+    def para_dataframe(self, codigos=None):
+        """DataFrame no formato usado pelas páginas: Aluno, Turma e uma coluna int8 por habilidade."""
+        codigos = list(self.codigos if codigos is None else codigos)
+        df = pd.DataFrame(self.valores[:, self.colunas(codigos)], columns=codigos)
+        df.insert(0, 'Turma', self.turmas)
+        df.insert(0, 'Aluno', self.alunos)
+        return df
+
+
+def montar_matriz(df, coluna_aluno='Aluno', coluna_turma='Turma', colunas_habilidades=None):
+    """Constrói a `MatrizHabilidades` a partir do DataFrame lido do CSV do CAED.
+
+    `colunas_habilidades` ({código: coluna}) vem do registro de avaliações; sem ele as
+    colunas de habilidade são reconhecidas pelo nome.
+    """
+    if colunas_habilidades is not None:
+        colunas_hab = dict(colunas_habilidades)
+    else:
+        colunas_hab = {}
+        for col in df.columns:
+            codigo = codigo_habilidade(col)
+            if codigo is not None:
+                colunas_hab[codigo] = col
+    codigos = tuple(sorted(colunas_hab))
+
+    bloco = df[[colunas_hab[cod] for cod in codigos]].apply(pd.to_numeric, errors='coerce')
+    valores = bloco.fillna(SEM_RESULTADO).to_numpy(dtype=np.int8)
+    valores.flags.writeable = False
+
+    nomes = df[coluna_aluno].astype(str).str.strip()
+    alunos = pd.Index([sys.intern(nome) for nome in nomes], dtype=object, name=coluna_aluno)
+    turmas = pd.Categorical(df[coluna_turma].astype(str).str.strip())
+    return MatrizHabilidades(alunos=alunos, turmas=turmas, codigos=codigos, valores=valores)
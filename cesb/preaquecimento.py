@@ -0,0 +1,85 @@
+"""Pré-aquecimento dos caches de dados em segundo plano.
+
+Chamado pela página principal: enquanto o usuário lê a tela inicial, um pool de threads
+carrega e indexa todos os arquivos conhecidos (resultados do CAED e da Prova Paraná) e
+calcula os agregados padrão. O primeiro clique em qualquer painel já encontra os caches
+preenchidos. A rotina é iniciada uma única vez por processo.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import streamlit as st
+
+from cesb import avaliacoes, cache_agregados, dados
+
+# Threads usadas no pré-aquecimento (a leitura dos CSVs libera o GIL em boa parte do tempo)
+MAX_THREADS = 4
+
+_log = logging.getLogger(__name__)
+
+
+@dataclass
+class Preaquecimento:
+    """Tarefas submetidas ao pool e erros encontrados (arquivo → mensagem)."""
+    tarefas: list = field(default_factory=list)
+    erros: dict = field(default_factory=dict)
+
+    @property
+    def concluido(self):
+        return all(tarefa.done() for tarefa in self.tarefas)
+
+
+def _aquecer_caed(nome_arquivo):
+    dados.carregar_matriz_caed(nome_arquivo)
+    dados.carregar_indice_alunos(nome_arquivo)
+
+
+def _executar(estado, nome_arquivo, funcao):
+    try:
+        funcao(nome_arquivo)
+    except Exception as e:  # o pré-aquecimento nunca deve derrubar o app
+        estado.erros[nome_arquivo] = str(e)
+        _log.warning("Falha ao pré-aquecer '%s': %s", nome_arquivo, e)
+
+
+def _aquecer_agregados(estado):
+    try:
+        cache_agregados.cache_processo()
+    except Exception as e:
+        estado.erros["agregados"] = str(e)
+        _log.warning("Falha ao pré-calcular os agregados: %s", e)
+
+
+@st.cache_resource(show_spinner=False)
+def iniciar():
+    """Dispara o pré-aquecimento sem bloquear a página; chamadas seguintes reutilizam o mesmo estado."""
+    estado = Preaquecimento()
+    executor = ThreadPoolExecutor(max_workers=MAX_THREADS, thread_name_prefix="preaquecimento")
+
+    tarefas_caed = [
+        executor.submit(_executar, estado, avaliacao.arquivo, _aquecer_caed)
+        for avaliacao in avaliacoes.listar()
+    ]
+    estado.tarefas.extend(tarefas_caed)
+    estado.tarefas.extend(
+        executor.submit(_executar, estado, nome, dados.carregar_prova_parana)
+        for nome in dados.listar_arquivos('*_*ED.csv')
+    )
+    # Resumo e evolução padrão (1ª → 2ª edição) da página da Prova Paraná; leem os arquivos pelo mesmo cache
+    estado.tarefas.append(
+        executor.submit(_executar, estado, "resumo da Prova Paraná", lambda _: dados.carregar_resumo_prova_parana())
+    )
+    estado.tarefas.append(
+        executor.submit(_executar, estado, "evolução da Prova Paraná", lambda _: dados.carregar_evolucao_prova_parana())
+    )
+
+    # Os agregados dependem das matrizes: são calculados depois que elas estiverem prontas
+    def agregados_apos_caed():
+        for tarefa in tarefas_caed:
+            tarefa.result()
+        _aquecer_agregados(estado)
+
+    estado.tarefas.append(executor.submit(agregados_apos_caed))
+    executor.shutdown(wait=False)
+    return estado
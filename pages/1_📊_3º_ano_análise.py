@@ -2,7 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import os
+
+from cesb import avaliacoes, cache_agregados, componentes, dados, descricoes
 
 # Configuração da página
 st.set_page_config(page_title="📊 Recomposição de Aprendizagem", layout="wide")
@@ -10,117 +11,20 @@ st.set_page_config(page_title="📊 Recomposição de Aprendizagem", layout="wid
 # Título do aplicativo
 st.title("Recomposição de Aprendizagem")
 
-# Dicionários com descrições das habilidades por avaliação e disciplina
-DESCRICOES_HABILIDADES = {
-    "CAED1_Matemática": {
-        "H01": "Utilizar informações apresentadas em tabelas ou gráficos na resolução de problemas.",
-        "H02": "Utilizar o princípio multiplicativo de contagem na resolução de problema.",
-        "H03": "Utilizar probabilidade na resolução de problema.",
-        "H04": "Utilizar proporcionalidade entre duas grandezas na resolução de problema.",
-        "H05": "Corresponder pontos do plano a pares ordenados em um sistema de coordenadas cartesianas.",
-        "H06": "Utilizar o cálculo de volumes/capacidade de prismas retos e de cilindros na resolução de problema.",
-        "H07": "Utilizar perímetro de figuras bidimensionais na resolução de problema.",
-        "H08": "Utilizar relações métricas de um triângulo retângulo na resolução de problema.",
-        "H09": "Analisar regiões de crescimento/decrescimento, domínios de validade ou zeros de funções reais representadas graficamente.",
-        "H10": "Utilizar função polinomial de 1º grau na resolução de problemas.",
-        "H11": "Reconhecer a representação algébrica de uma função polinomial de 2º grau a partir dos dados apresentados em uma tabela.",
-        "H12": "Utilizar a medida da área total e/ou lateral de um sólido na resolução de problema.",
-        "H13": "Utilizar função exponencial na resolução de problemas.",
-        "H14": "Utilizar função polinomial de 2º grau na resolução de problemas.",
-        "H15": "Utilizar propriedades de progressões aritméticas ou geométricas na resolução de problemas.",
-        "H16": "Utilizar equação polinomial de 2º grau na resolução de problema.",
-        "H17": "Reconhecer a representação gráfica das funções trigonométricas (seno, cosseno e tangente).",
-        "H18": "Resolver problemas que envolvam razões trigonométricas no triângulo retângulo.",
-    },
-    "CAED2_Matemática": {
-        "H01": "Corresponder figuras tridimensionais às suas planificações.",
-        "H02": "Utilizar informações apresentadas em tabelas ou gráficos na resolução de problemas",
-        "H03": "Utilizar o principío multiplicativo de contagem na resolução de problema.",
-        "H04": "Utilizar probabilidade na resolução de problema.",
-        "H05": "Utilizar proporcionalidade entre duas grandezas na resolução de problema.",
-        "H06": "Corresponder pontos do plano a pares ordenados em um sistema de coordenadas cartesianas.",
-        "H07": "Utilizar o cálculo de volumes/capacidade de prismas retos e de cilindros na resolução de problema.",
-        "H08": "Utilizar perímetro de figuras bidimensionais na resolução de problema.",
-        "H09": "Utilizar porcentagem na resolução de problemas.",
-        "H10": "Utilizar relações métricas de um triângulo retângulo na resolução de problema.",
-        "H11": "Analisar regiões de crescimento/decrescimento, domínios de validade ou zeros de funções reais representadas graficamente.",
-        "H12": "Corresponder a representação algébrica e gráfica de uma função polinomial de 1º grau.",
-        "H13": "Utilizar função polinomial de 1º grau na resolução de problemas.",
-        "H14": "Utilizar a medida da área total e/ou lateral de um sólido na resolução de problema.",
-        "H15": "Utilizar função exponencial na resolução de problemas.",
-        "H16": "Utilizar função polinomial de 2º grau na resolução de problemas.",
-        "H17": "Utilizar propriedades de progressões aritméticas ou geométricas na resolução de problemas.",
-        "H18": "Identificar a representação algébrica ou gráfica de uma função exponencial.",
-        "H19": "Utilizar equação polinomial de 2º grau na resolução de problema.",
-        "H20": "Relacionar as raízes de um polinômio com sua decomposição em fatores do 1º grau.",
-        "H21": "Reconhecer a representação gráfica das funções trigonométricas (seno, cosseno e tangente).",
-        "H22": "Resolver problemas que envolvam razões trigonométricas no triângulo retângulo."
-    },
-    "CAED1_Português": {
-        "H01": "Reconhecer formas de tratar uma informação na comparação de textos que tratam do mesmo tema.",
-        "H02": "Localizar informação explícita.",
-        "H03": "Inferir informações em textos.",
-        "H04": "Reconhecer efeito de humor ou de ironia em um texto.",
-        "H05": "Distinguir ideias centrais de secundárias ou tópicos and subtópicos em um dado gênero textual.",
-        "H06": "Identificar a tese de um texto.",
-        "H07": "Reconhecer posições distintas relativas ao mesmo fato ou mesmo tema.",
-        "H08": "Reconhecer as relações entre partes de um texto, identificando os recursos coesivos que contribuem para a sua continuidade.",
-        "H09": "Distinguir um fato da opinião.",
-        "H10": "Reconhecer o sentido das relações lógico-discursivas em um texto.",
-        "H11": "Reconhecer o efeito de sentido decorrente da escolha de uma determinada palavra ou expressão.",
-        "H12": "Estabelecer relação entre a tese e os argumentos oferecidos para sustentá-la.",
-        "H13": "Estabelecer relação causa/consequência entre partes e elementos do texto.",
-        "H14": "Reconhecer o efeito de sentido decorrente da exploração de recursos ortográficos e/ou morfossintáticos.",
-        "H15": "Identificar as marcas linguísticas que evidenciam o locutor e o interlocutor de um texto.",
-    },
-    "CAED2_Português": {
-        "H01": "Reconhecer formas de tratar uma informação na comparação de textos que tratam do mesmo tema.",
-        "H02": "Localizar informação explícita.",
-        "H03": "Inferir informações em textos.",
-        "H04": "Reconhecer efeito de humor ou de ironia em um texto.",
-        "H05": "Distinguir ideias centrais de secundárias ou tópicos and subtópicos em um dado gênero textual.",
-        "H06": "Identificar a tese de um texto.",
-        "H07": "Reconhecer posições distintas relativas ao mesmo fato ou mesmo tema.",
-        "H08": "Reconhecer as relações entre partes de um texto, identificando os recursos coesivos que contribuem para a sua continuidade.",
-        "H09": "Distinguir um fato da opinião.",
-        "H10": "Reconhecer o sentido das relações lógico-discursivas em um texto.",
-        "H11": "Reconhecer o efeito de sentido decorrente da escolha de uma determinada palavra ou expressão.",
-        "H12": "Estabelecer relação entre a tese e os argumentos oferecidos para sustentá-la.",
-        "H13": "Estabelecer relação causa/consequência entre partes e elementos do texto.",
-        "H14": "Reconhecer o efeito de sentido decorrente da exploração de recursos ortográficos e/ou morfossintáticos.",
-        "H15": "Identificar as marcas linguísticas que evidenciam o locutor e o interlocutor de um texto.",
-    }
-}
-
-# Mapeamento de arquivos CSV
-ARQUIVOS_CSV = {
-    "CAED1_Matemática": "CAED1_3_matematica.csv",
-    "CAED2_Matemática": "CAED2_3_matematica.csv",
-    "CAED1_Português": "CAED1_3_portugues.csv",
-    "CAED2_Português": "CAED2_3_portugues.csv"
-}
-
 # Função para carregar dados
-def carregar_dados(avaliacao_disciplina):
+def carregar_dados(avaliacao_info):
     """Carrega o arquivo CSV correspondente à avaliação e disciplina selecionadas"""
     try:
-        nome_arquivo = ARQUIVOS_CSV.get(avaliacao_disciplina)
-        if not nome_arquivo:
+        if avaliacao_info is None:
             st.error("Avaliação e disciplina não reconhecidas.")
             return None
         
-        # Tenta encontrar o arquivo na mesma pasta do script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        csv_path = os.path.join(script_dir, nome_arquivo)
-        
-        if os.path.exists(csv_path):
-            df = pd.read_csv(csv_path, sep=';', encoding='utf-8')
-            return df
-        else:
-            st.error(f"Arquivo '{nome_arquivo}' não encontrado na pasta do script.")
-            st.info(f"Certifique-se de que o arquivo '{nome_arquivo}' está na mesma pasta que este script.")
-            return None
+        return dados.carregar_matriz_caed(avaliacao_info.arquivo)
             
+    except FileNotFoundError:
+        st.error(f"Arquivo '{avaliacao_info.arquivo}' não encontrado na pasta de dados.")
+        st.info(f"Certifique-se de que o arquivo '{avaliacao_info.arquivo}' está na pasta 'pages'.")
+        return None
     except Exception as e:
         st.error(f"Erro ao carregar o arquivo: {e}")
         return None
@@ -134,69 +38,50 @@ def get_nivel_descricao(valor):
     else:
         return "✅ Domina Plenamente"
 
-# Função para obter descrição da habilidade
-def get_descricao_habilidade(codigo, avaliacao_disciplina):
-    return DESCRICOES_HABILIDADES.get(avaliacao_disciplina, {}).get(codigo, "Descrição não disponível")
-
 # Função segura para calcular porcentagem (evita divisão por zero)
 def calcular_porcentagem(parte, total):
     if total == 0:
         return 0.0
     return (parte / total) * 100
 
-# Sidebar para seleção de avaliação e disciplina
+# Sidebar para seleção de avaliação e disciplina (opções vindas do registro de avaliações)
 st.sidebar.header("🎯 Seleção de Dados")
 avaliacao = st.sidebar.selectbox(
     "Selecione a avaliação:",
-    [1, 2]
+    avaliacoes.edicoes(3)
 )
 
+disciplinas_disponiveis = avaliacoes.disciplinas(3)
 disciplina = st.sidebar.selectbox(
     "Selecione a disciplina:",
-    ["Matemática", "Português"]
+    list(disciplinas_disponiveis.values())
 )
 
-# Converter o número da avaliação para o formato CAED
+# Localizar a avaliação no registro (edição, série, disciplina)
+avaliacao_info = avaliacoes.obter(avaliacao, 3, disciplina)
 avaliacao_str = f"CAED{avaliacao}"
-avaliacao_disciplina = f"{avaliacao_str}_{disciplina}"
 
-# Carregar dados automaticamente
-df = carregar_dados(avaliacao_disciplina)
+# Carregar dados automaticamente (matriz compacta: níveis em int8, turma categórica)
+matriz = carregar_dados(avaliacao_info)
 
-if df is not None:
+if matriz is not None:
     try:
-        # Limpar nomes das colunas
-        df.columns = df.columns.str.strip()
+        # Habilidades avaliadas, conforme o registro da avaliação
+        habilidades = list(avaliacao_info.habilidades)
         
-        # Determinar o número máximo de habilidades com base na seleção
-        if avaliacao_disciplina == "CAED1_Matemática":
-            max_hab = 18
-        elif avaliacao_disciplina == "CAED2_Matemática":
-            max_hab = 22
-        else:  # Português (CAED1 ou CAED2)
-            max_hab = 15
-        
-        # Filtrar apenas as colunas de habilidades
-        if avaliacao_disciplina in ["CAED1_Matemática", "CAED2_Matemática"]:
-            habilidades_cols = [col for col in df.columns if col.startswith('H ') and int(col.split()[1]) <= max_hab]
-            # Renomear colunas para formato mais amigável
-            nome_habilidades = {col: f'H{int(col.split()[1]):02d}' for col in habilidades_cols}
-        else:  # Português
-            habilidades_cols = [col for col in df.columns if col.startswith('H') and col[1:].isdigit() and int(col[1:]) <= max_hab]
-            # Renomear colunas para formato mais amigável
-            nome_habilidades = {col: f'H{int(col[1:]):02d}' for col in habilidades_cols}
+        # Dados dos alunos com habilidades
+        alunos_habilidades = matriz.para_dataframe(habilidades)
         
-        df_renomeado = df.rename(columns=nome_habilidades)
+        # Índice dos alunos (nome → linha, habilidades por nível) para a análise individual
+        indice_alunos = dados.carregar_indice_alunos(avaliacao_info.arquivo)
         
-        # Dados dos alunos com habilidades
-        alunos_habilidades = df_renomeado[['Aluno', 'Turma'] + list(nome_habilidades.values())]
         
         # Sidebar com informações
         st.sidebar.header("Colégio Estadual São Braz")
         st.sidebar.write("Recomposição da Aprendizagem")
         st.sidebar.header("📊 Informações Gerais")
         st.sidebar.write(f"**Total de Alunos:** {len(alunos_habilidades)}")
-        st.sidebar.write(f"**Total de Habilidades:** {len(nome_habilidades)}")
+        st.sidebar.write(f"**Total de Habilidades:** {len(habilidades)}")
         
         # Filtro por turma no sidebar
         st.sidebar.header("🎯 Filtros")
@@ -217,6 +102,9 @@ if df is not None:
             alunos_filtrados = alunos_habilidades
             st.sidebar.write("**Mostrando todas as turmas**")
         
+        # Agregados da avaliação para o filtro de turmas (cache compartilhado entre as sessões)
+        resumo = cache_agregados.resumo(avaliacao_info, turma_selecionada)
+        
         # Menu principal
         st.sidebar.header("🔧 Navegação")
         tipo_analise = st.sidebar.radio(
@@ -232,50 +120,35 @@ if df is not None:
                 st.warning("Nenhum aluno encontrado com os filtros aplicados.")
             else:
                 # Selecionar aluno apenas da turma filtrada
-                alunos_disponiveis = sorted(alunos_filtrados['Aluno'].tolist())
-                aluno_selecionado = st.selectbox(
-                    "Selecione um aluno:",
-                    alunos_disponiveis
-                )
+                aluno_selecionado, turma_aluno = componentes.selecionar_aluno(alunos_filtrados)
                 
-                # Dados do aluno selecionado
-                aluno_data = alunos_filtrados[alunos_filtrados['Aluno'] == aluno_selecionado].iloc[0]
+                # Perfil do aluno selecionado (nome e turma), consultado no índice pré-calculado
+                perfil = indice_alunos.perfil(aluno_selecionado, turma_aluno)
+                nao_domina, domina, domina_plenamente = perfil.por_nivel
                 
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
                     st.subheader("❌ Não Domina")
-                    nao_domina = []
-                    for hab in nome_habilidades.values():
-                        if aluno_data[hab] == 0:
-                            nao_domina.append(hab)
                     if nao_domina:
-                        for hab in sorted(nao_domina):
-                            st.write(f"• **{hab}**: {get_descricao_habilidade(hab, avaliacao_disciplina)}")
+                        for hab in nao_domina:
+                            st.write(f"• **{hab}**: {descricoes.descricao(avaliacao_info, hab)}")
                     else:
                         st.success("🎉 Domina todas as habilidades!")
                 
                 with col2:
                     st.subheader("⚠️ Domina")
-                    domina = []
-                    for hab in nome_habilidades.values():
-                        if aluno_data[hab] == 1:
-                            domina.append(hab)
                     if domina:
-                        for hab in sorted(domina):
-                            st.write(f"• **{hab}**: {get_descricao_habilidade(hab, avaliacao_disciplina)}")
+                        for hab in domina:
+                            st.write(f"• **{hab}**: {descricoes.descricao(avaliacao_info, hab)}")
                     else:
                         st.write("Nenhuma habilidade neste nível")
                 
                 with col3:
                     st.subheader("✅ Domina Plenamente")
-                    domina_plenamente = []
-                    for hab in nome_habilidades.values():
-                        if aluno_data[hab] == 2:
-                            domina_plenamente.append(hab)
                     if domina_plenamente:
-                        for hab in sorted(domina_plenamente):
-                            st.write(f"• **{hab}**: {get_descricao_habilidade(hab, avaliacao_disciplina)}")
+                        for hab in domina_plenamente:
+                            st.write(f"• **{hab}**: {descricoes.descricao(avaliacao_info, hab)}")
                     else:
                         st.write("Nenhuma habilidade neste nível")
                 
@@ -284,13 +157,13 @@ if df is not None:
                 col_stats1, col_stats2, col_stats3, col_stats4 = st.columns(4)
                 
                 with col_stats1:
-                    st.metric("Não Domina", f"{len(nao_domina)}", f"{calcular_porcentagem(len(nao_domina), len(nome_habilidades)):.1f}%")
+                    st.metric("Não Domina", f"{len(nao_domina)}", f"{calcular_porcentagem(len(nao_domina), len(habilidades)):.1f}%")
                 with col_stats2:
-                    st.metric("Domina", f"{len(domina)}", f"{calcular_porcentagem(len(domina), len(nome_habilidades)):.1f}%")
+                    st.metric("Domina", f"{len(domina)}", f"{calcular_porcentagem(len(domina), len(habilidades)):.1f}%")
                 with col_stats3:
-                    st.metric("Domina Plenamente", f"{len(domina_plenamente)}", f"{calcular_porcentagem(len(domina_plenamente), len(nome_habilidades)):.1f}%")
+                    st.metric("Domina Plenamente", f"{len(domina_plenamente)}", f"{calcular_porcentagem(len(domina_plenamente), len(habilidades)):.1f}%")
                 with col_stats4:
-                    st.metric("Total Habilidades", len(nome_habilidades))
+                    st.metric("Total Habilidades", len(habilidades))
         
         elif tipo_analise == "Ver Grupos por Habilidade":
             st.header("👥 Grupos por Habilidade")
@@ -302,48 +175,48 @@ if df is not None:
                 # Selecionar habilidade para análise
                 habilidade_selecionada = st.selectbox(
                     "Selecione uma habilidade:",
-                    sorted(nome_habilidades.values())
+                    sorted(habilidades)
                 )
                 
                 # Descrição da habilidade
-                st.info(f"**Descrição:** {get_descricao_habilidade(habilidade_selecionada, avaliacao_disciplina)}")
+                st.info(f"**Descrição:** {descricoes.descricao(avaliacao_info, habilidade_selecionada)}")
                 
                 # Filtrar alunos por nível de domínio na habilidade selecionada
-                nao_domina = alunos_filtrados[alunos_filtrados[habilidade_selecionada] == 0]
-                domina = alunos_filtrados[alunos_filtrados[habilidade_selecionada] == 1]
-                domina_plenamente = alunos_filtrados[alunos_filtrados[habilidade_selecionada] == 2]
+                # (acima do nível máximo conta no máximo, como no gráfico de distribuição)
+                niveis_habilidade = alunos_filtrados[habilidade_selecionada].clip(upper=avaliacao_info.nivel_maximo)
+                nao_domina = alunos_filtrados[niveis_habilidade == 0]
+                domina = alunos_filtrados[niveis_habilidade == 1]
+                domina_plenamente = alunos_filtrados[niveis_habilidade == 2]
                 
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
                     st.subheader(f"❌ Não Domina ({len(nao_domina)})")
                     if not nao_domina.empty:
-                        for _, aluno in nao_domina.iterrows():
-                            st.write(f"• {aluno['Aluno']} - Turma {aluno['Turma']}")
+                        componentes.lista_alunos(nao_domina, chave=f"nao_domina_{habilidade_selecionada}")
                     else:
                         st.success("🎉 Todos dominam esta habilidade!")
                 
                 with col2:
                     st.subheader(f"⚠️ Domina ({len(domina)})")
                     if not domina.empty:
-                        for _, aluno in domina.iterrows():
-                            st.write(f"• {aluno['Aluno']} - Turma {aluno['Turma']}")
+                        componentes.lista_alunos(domina, chave=f"domina_{habilidade_selecionada}")
                     else:
                         st.write("Nenhum aluno neste nível")
                 
                 with col3:
                     st.subheader(f"✅ Domina Plenamente ({len(domina_plenamente)})")
                     if not domina_plenamente.empty:
-                        for _, aluno in domina_plenamente.iterrows():
-                            st.write(f"• {aluno['Aluno']} - Turma {aluno['Turma']}")
+                        componentes.lista_alunos(domina_plenamente, chave=f"domina_plenamente_{habilidade_selecionada}")
                     else:
                         st.write("Nenhum aluno neste nível")
                 
                 # Gráfico de distribuição
                 st.subheader("📊 Distribuição por Nível de Domínio")
+                contagem_habilidade = resumo.por_habilidade[resumo.codigos.index(habilidade_selecionada)]
                 fig = px.pie(
                     names=["Não Domina", "Domina", "Domina Plenamente"],
-                    values=[len(nao_domina), len(domina), len(domina_plenamente)],
+                    values=contagem_habilidade.tolist(),
                     color=["Não Domina", "Domina", "Domina Plenamente"],
                     color_discrete_map={
                         "Não Domina": "red",
@@ -363,26 +236,11 @@ if df is not None:
                 # Tabela com contagem de alunos por nível para cada habilidade
                 st.subheader("📈 Estatísticas por Habilidade")
                 
-                # Calcular estatísticas para cada habilidade
-                stats_data = []
-                for hab in sorted(nome_habilidades.values()):
-                    total = len(alunos_filtrados)
-                    nao_domina_count = len(alunos_filtrados[alunos_filtrados[hab] == 0])
-                    domina_count = len(alunos_filtrados[alunos_filtrados[hab] == 1])
-                    domina_plenamente_count = len(alunos_filtrados[alunos_filtrados[hab] == 2])
-                    
-                    stats_data.append({
-                        "Habilidade": hab,
-                        "Descrição": get_descricao_habilidade(hab, avaliacao_disciplina),
-                        "Não Domina": nao_domina_count,
-                        "Domina": domina_count,
-                        "Domina Plenamente": domina_plenamente_count,
-                        "% Não Domina": f"{calcular_porcentagem(nao_domina_count, total):.1f}%",
-                        "% Domina": f"{calcular_porcentagem(domina_count, total):.1f}%",
-                        "% Domina Plenamente": f"{calcular_porcentagem(domina_plenamente_count, total):.1f}%"
-                    })
+                # Estatísticas de todas as habilidades a partir da contagem agregada
+                stats_df = resumo.tabela(["Não Domina", "Domina", "Domina Plenamente"])
                 
-                stats_df = pd.DataFrame(stats_data)
+                # Descrições de todas as habilidades em uma única busca
+                stats_df.insert(1, "Descrição", descricoes.descrever(avaliacao_info, stats_df["Habilidade"]).to_numpy())
                 
                 # Mostrar tabela com estatísticas
                 st.dataframe(
@@ -431,30 +289,22 @@ if df is not None:
                     total_alunos = len(alunos_filtrados)
                     st.metric("Total de Alunos", total_alunos)
                 
+                # Totais por nível somando todas as habilidades: a média por aluno é o total dividido pelos alunos
+                total_nao_domina, total_domina, total_domina_plenamente = resumo.por_habilidade.sum(axis=0)
+                
                 with col2:
-                    # Calcular média de habilidades dominadas plenamente por aluno
-                    habilidades_dominadas = alunos_filtrados[list(nome_habilidades.values())].apply(
-                        lambda row: sum(row == 2), axis=1
-                    )
-                    media_dominadas = habilidades_dominadas.mean()
+                    # Média de habilidades dominadas plenamente por aluno
+                    media_dominadas = total_domina_plenamente / total_alunos
                     st.metric("Média de Habilidades Dominadas Plenamente", f"{media_dominadas:.1f}")
                 
                 with col3:
-                    # Calcular média de habilidades não dominadas por aluno
-                    habilidades_nao_dominadas = alunos_filtrados[list(nome_habilidades.values())].apply(
-                        lambda row: sum(row == 0), axis=1
-                    )
-                    media_nao_dominadas = habilidades_nao_dominadas.mean()
+                    # Média de habilidades não dominadas por aluno
+                    media_nao_dominadas = total_nao_domina / total_alunos
                     st.metric("Média de Habilidades Não Dominadas", f"{media_nao_dominadas:.1f}")
                 
                 # Distribuição geral de domínio
                 st.subheader("📈 Distribuição Geral de Domínio")
                 
-                total_habilidades = len(nome_habilidades) * total_alunos
-                total_nao_domina = (alunos_filtrados[list(nome_habilidades.values())] == 0).sum().sum()
-                total_domina = (alunos_filtrados[list(nome_habilidades.values())] == 1).sum().sum()
-                total_domina_plenamente = (alunos_filtrados[list(nome_habilidades.values())] == 2).sum().sum()
-                
                 fig = px.pie(
                     names=["Não Domina", "Domina", "Domina Plenamente"],
                     values=[total_nao_domina, total_domina, total_domina_plenamente],
@@ -471,17 +321,13 @@ if df is not None:
                 # Mapa de calor das habilidades
                 st.subheader("🌡️ Mapa de Calor das Habilidades")
                 
-                # Calcular a porcentagem de alunos que não dominam cada habilidade
-                heatmap_data = []
-                for hab in sorted(nome_habilidades.values()):
-                    nao_domina_count = len(alunos_filtrados[alunos_filtrados[hab] == 0])
-                    porcentagem_nao_domina = calcular_porcentagem(nao_domina_count, total_alunos)
-                    heatmap_data.append(porcentagem_nao_domina)
+                # Porcentagem de alunos que não dominam cada habilidade
+                heatmap_data = resumo.percentuais[:, 0]
                 
                 # Criar o heatmap
                 fig = go.Figure(data=go.Heatmap(
                     z=[heatmap_data],
-                    x=sorted(nome_habilidades.values()),
+                    x=list(resumo.codigos),
                     y=["% Não Domina"],
                     colorscale='reds',
                     hoverongaps=False,
@@ -500,7 +346,7 @@ if df is not None:
         st.sidebar.header("ℹ️ Informações")
         st.sidebar.write(f"Avaliação: {avaliacao_str}")
         st.sidebar.write(f"Disciplina: {disciplina}")
-        st.sidebar.write(f"Habilidades: {len(nome_habilidades)}")
+        st.sidebar.write(f"Habilidades: {len(habilidades)}")
         
     except Exception as e:
         st.error(f"Erro ao processar os dados: {e}")
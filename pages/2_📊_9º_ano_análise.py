@@ -2,8 +2,8 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import os
-from PIL import Image
+
+from cesb import avaliacoes, cache_agregados, componentes, dados, descricoes
 
 # Configuração da página
 st.set_page_config(page_title="📊 Recomposição de Aprendizagem", layout="wide")
@@ -11,139 +11,67 @@ st.set_page_config(page_title="📊 Recomposição de Aprendizagem", layout="wid
 # Título do aplicativo
 st.title("Recomposição de Aprendizagem")
 
-# Dicionários com descrições das habilidades por disciplina
-DESCRICOES_HABILIDADES = {
-    "Portugues": {
-        "H01": "Identificar a finalidade de textos de diferentes gêneros.",
-        "H02": "Localizar informação explícita.",
-        "H03": "Inferir informações em textos.",
-        "H04": "Reconhecer efeito de humor ou de ironia em um texto.",
-        "H05": "Distinguir ideias centrais de secundárias ou tópicos e subtópicos em um dado gênero textual.",
-        "H06": "Reconhecer os elementos que compõem uma narrativa e o conflito gerador.",
-        "H07": "Identificar a tese de um texto.",
-        "H08": "Reconhecer posições distintas relativas ao mesmo fato ou mesmo tema.",
-        "H09": "Reconhecer as relações entre partes de um texto, identificando os recursos coesivos que contribuem para a sua continuidade.",
-        "H10": "Distinguir um fato da opinião.",
-        "H11": "Reconhecer o sentido das relações lógico-discursivas em um texto.",
-        "H12": "Reconhecer o efeito de sentido decorrente da escolha de uma determinada palavra ou expressão.",
-        "H13": "Estabelecer relação entre a tese e os argumentos oferecidos para sustentá-la.",
-        "H14": "Reconhecer o efeito de sentido decorrente da exploração de recursos ortográficos e/ou morfossintáticos.",
-        "H15": "Identificar as marcas linguísticas que evidenciam o locutor e o interlocutor de um texto.",
-    },
-    "Matematica": {
-        "H01": "Corresponder figuras tridimensionais às suas planificações.",
-        "H02": "Utilizar informações apresentadas em tabelas ou gráficos na resolução de problemas.",
-        "H03": "Utilizar área de figuras bidimensionais na resolução de problema.",
-        "H04": "Identificar frações equivalentes.",
-        "H05": "Utilizar conversão entre unidades de medida, na resolução de problema.",
-        "H06": "Utilizar o princípio multiplicativo de contagem na resolução de problema.",
-        "H07": "Utilizar proporcionalidade entre duas grandezas na resolução de problema.",
-        "H08": "Classificar quadriláteros por meio de suas propriedades.",
-        "H09": "Classificar triângulos por meio de suas propriedades.",
-        "H10": "Corresponder diferentes representações de um número racional.",
-        "H11": "Utilizar o cálculo de volumes/capacidade de prismas retos e de cilindros na resolução de problema.",
-        "H12": "Utilizar perímetro de figuras bidimensionais na resolução de problema.",
-        "H13": "Utilizar porcentagem na resolução de problemas.",
-        "H14": "Identificar a expressão algébrica that expressa uma regularidade observada em sequência de números ou figuras (padrões).",
-        "H15": "Executar cálculos com números reais.",
-        "H16": "Utilizar o cálculo do valor numérico de expressões algébricas na resolução de problemas.",
-        "H17": "Utilizar relações métricas de um triângulo retângulo na resolução de problema.",
-        "H18": "Utilizar equação polinomial de 2º grau na resolução de problema.",
-        "H19": "Utilizar números racionais, envolvendo diferentes significados das operações, na resolução de problemas.",
-        "H20": "Identificar uma equação ou inequação do 1º grau que expressa um problema."
-    }
-}
-
 # Função para carregar dados
-def carregar_dados(disciplina, prova):
+def carregar_dados(avaliacao_info):
     """Carrega o arquivo CSV correspondente à disciplina e prova selecionadas"""
+    if avaliacao_info is None:
+        st.error("Prova e disciplina não reconhecidas.")
+        return None
     try:
-        # Construir o nome do arquivo
-        nome_arquivo = f"CAED{prova}_9_{disciplina.lower()}.csv"
-        
-        # Tenta encontrar o arquivo na mesma pasta
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        csv_path = os.path.join(script_dir, nome_arquivo)
-        
-        if os.path.exists(csv_path):
-            df = pd.read_csv(csv_path, sep=';', encoding='utf-8')
-            return df
-        else:
-            st.error(f"Arquivo '{nome_arquivo}' não encontrado na pasta do script.")
-            st.info(f"Certifique-se de que o arquivo '{nome_arquivo}' está na mesma pasta que este script.")
-            return None
-                
+        return dados.carregar_matriz_caed(avaliacao_info.arquivo)
+    except FileNotFoundError:
+        st.error(f"Arquivo '{avaliacao_info.arquivo}' não encontrado na pasta de dados.")
+        st.info(f"Certifique-se de que o arquivo '{avaliacao_info.arquivo}' está na pasta 'pages'.")
+        return None
     except Exception as e:
         st.error(f"Erro ao carregar o arquivo: {e}")
         return None
 
-# Função para obter descrição do nível
-def get_nivel_descricao(valor, disciplina):
-    if disciplina == "Portugues":
-        if valor == 0:
-            return "❌ Não Domina"
-        elif valor == 1:
-            return "⚠️ Domina"
-        elif valor == 2:
-            return "✅ Domina Plenamente"
-        else:  # valor == 3
-            return "🏆 Completamente Dominado"
-    else:  # Matematica
-        if valor == 0:
-            return "❌ Não Domina"
-        elif valor == 1:
-            return "⚠️ Domina"
-        else:
-            return "✅ Domina Plenamente"
+# Descrição de cada nível de domínio (o nível máximo depende da avaliação)
+NIVEIS = ["❌ Não Domina", "⚠️ Domina", "✅ Domina Plenamente", "🏆 Completamente Dominado"]
 
-# Função para obter descrição da habilidade
-def get_descricao_habilidade(codigo, disciplina):
-    return DESCRICOES_HABILIDADES[disciplina].get(codigo, "Descrição não disponível")
-
-# Função para obter pontuação máxima
-def get_pontuacao_maxima(disciplina):
-    return 3 if disciplina == "Portugues" else 2
+# Função para obter descrição do nível
+def get_nivel_descricao(valor, nivel_maximo):
+    return NIVEIS[min(valor, nivel_maximo)]
 
-# Sidebar com seleção de disciplina e prova
+# Sidebar com seleção de disciplina e prova (opções vindas do registro de avaliações)
 st.sidebar.header("🔧 Configurações")
 
 prova = st.sidebar.selectbox(
     "Selecione a prova:",
-    [1, 2]
+    avaliacoes.edicoes(9)
 )
 
+nomes_disciplinas = avaliacoes.disciplinas(9)
 disciplina = st.sidebar.selectbox(
     "Selecione a disciplina:",
-    ["Portugues", "Matematica"]
+    list(nomes_disciplinas),
+    format_func=nomes_disciplinas.get
 )
 
-# Carregar dados automaticamente
-df = carregar_dados(disciplina, prova)
+# Localizar a avaliação no registro e carregar os dados (matriz compacta em int8)
+avaliacao_info = avaliacoes.obter(prova, 9, disciplina)
+matriz = carregar_dados(avaliacao_info)
 
-if df is not None:
+if matriz is not None:
     try:
-        # Limpar nomes das colunas
-        df.columns = df.columns.str.strip()
+        # Habilidades avaliadas e nível máximo de domínio, conforme o registro
+        habilidades = list(avaliacao_info.habilidades)
+        nivel_maximo = avaliacao_info.nivel_maximo
         
-        # Determinar o número máximo de habilidades com base na disciplina
-        max_habilidades = 15 if disciplina == "Portugues" else 20
-        
-        # Filtrar apenas as colunas de H01 a H(max_habilidades)
-        habilidades_cols = [col for col in df.columns if col.startswith('H ') and int(col.split()[1]) <= max_habilidades]
+        # Dados dos alunos com habilidades
+        alunos_habilidades = matriz.para_dataframe(habilidades)
         
-        # Renomear colunas para formato mais amigável
-        nome_habilidades = {col: f'H{int(col.split()[1]):02d}' for col in habilidades_cols}
-        df_renomeado = df.rename(columns=nome_habilidades)
         
-        # Dados dos alunos com habilidades
-        alunos_habilidades = df_renomeado[['Aluno', 'Turma'] + list(nome_habilidades.values())]
+        # Índice dos alunos (nome → linha, habilidades por nível) para a análise individual
+        indice_alunos = dados.carregar_indice_alunos(avaliacao_info.arquivo)
         
         # Sidebar com informações
         st.sidebar.header("Colégio Estadual São Braz")
         st.sidebar.write("Recomposição da Aprendizagem")
         st.sidebar.header("📊 Informações Gerais")
         st.sidebar.write(f"**Total de Alunos:** {len(alunos_habilidades)}")
-        st.sidebar.write(f"**Total de Habilidades:** {len(nome_habilidades)}")
+        st.sidebar.write(f"**Total de Habilidades:** {len(habilidades)}")
         
         # Filtro por turma no sidebar
         st.sidebar.header("🎯 Filtros")
@@ -164,6 +92,9 @@ if df is not None:
             alunos_filtrados = alunos_habilidades
             st.sidebar.write("**Mostrando todas as turmas**")
         
+        # Agregados da avaliação para o filtro de turmas (cache compartilhado entre as sessões)
+        resumo = cache_agregados.resumo(avaliacao_info, turma_selecionada)
+        
         # Menu principal
         st.sidebar.header("🔧 Navegação")
         tipo_analise = st.sidebar.radio(
@@ -175,144 +106,45 @@ if df is not None:
             st.header("🔍 Análise Individual por Aluno")
             
             # Selecionar aluno apenas da turma filtrada
-            alunos_disponiveis = sorted(alunos_filtrados['Aluno'].tolist())
-            aluno_selecionado = st.selectbox(
-                "Selecione um aluno:",
-                alunos_disponiveis
-            )
-            
-            # Dados do aluno selecionado
-            aluno_data = alunos_filtrados[alunos_filtrados['Aluno'] == aluno_selecionado].iloc[0]
-            
-            # Layout das colunas baseado na disciplina
-            if disciplina == "Portugues":
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.subheader("❌ Não Domina")
-                    nao_domina = []
-                    for hab in nome_habilidades.values():
-                        if aluno_data[hab] == 0:
-                            nao_domina.append(hab)
-                    if nao_domina:
-                        for hab in sorted(nao_domina):
-                            st.write(f"• **{hab}**: {get_descricao_habilidade(hab, disciplina)}")
-                    else:
+            aluno_selecionado, turma_aluno = componentes.selecionar_aluno(alunos_filtrados)
+            
+            # Perfil do aluno selecionado (nome e turma), consultado no índice pré-calculado
+            perfil = indice_alunos.perfil(aluno_selecionado, turma_aluno)
+            niveis = NIVEIS[:nivel_maximo + 1]
+            
+            # Uma coluna por nível de domínio (4 em Português, 3 em Matemática)
+            cols = st.columns(len(niveis))
+            for valor, (col, nivel) in enumerate(zip(cols, niveis)):
+                with col:
+                    st.subheader(nivel)
+                    habilidades_nivel = perfil.por_nivel[valor]
+                    if habilidades_nivel:
+                        for hab in habilidades_nivel:
+                            st.write(f"• **{hab}**: {descricoes.descricao(avaliacao_info, hab)}")
+                    elif valor == 0 and nivel_maximo == 3:
                         st.success("🎉 Nenhuma habilidade não dominada!")
-                
-                with col2:
-                    st.subheader("⚠️ Domina")
-                    domina = []
-                    for hab in nome_habilidades.values():
-                        if aluno_data[hab] == 1:
-                            domina.append(hab)
-                    if domina:
-                        for hab in sorted(domina):
-                            st.write(f"• **{hab}**: {get_descricao_habilidade(hab, disciplina)}")
-                    else:
-                        st.write("Nenhuma habilidade neste nível")
-                
-                with col3:
-                    st.subheader("✅ Domina Plenamente")
-                    domina_plenamente = []
-                    for hab in nome_habilidades.values():
-                        if aluno_data[hab] == 2:
-                            domina_plenamente.append(hab)
-                    if domina_plenamente:
-                        for hab in sorted(domina_plenamente):
-                            st.write(f"• **{hab}**: {get_descricao_habilidade(hab, disciplina)}")
-                    else:
-                        st.write("Nenhuma habilidade neste nível")
-                        
-                with col4:
-                    st.subheader("🏆 Completamente Dominado")
-                    completamente_dominado = []
-                    for hab in nome_habilidades.values():
-                        if aluno_data[hab] == 3:
-                            completamente_dominado.append(hab)
-                    if completamente_dominado:
-                        for hab in sorted(completamente_dominado):
-                            st.write(f"• **{hab}**: {get_descricao_habilidade(hab, disciplina)}")
-                    else:
-                        st.write("Nenhuma habilidade neste nível")
-                
-                # Estatísticas do aluno
-                st.subheader("📊 Estatísticas do Aluno")
-                col_stats1, col_stats2, col_stats3, col_stats4, col_stats5 = st.columns(5)
-                
-                with col_stats1:
-                    st.metric("Não Domina", f"{len(nao_domina)}", f"{len(nao_domina)/len(nome_habilidades)*100:.1f}%")
-                with col_stats2:
-                    st.metric("Domina", f"{len(domina)}", f"{len(domina)/len(nome_habilidades)*100:.1f}%")
-                with col_stats3:
-                    st.metric("Domina Plenamente", f"{len(domina_plenamente)}", f"{len(domina_plenamente)/len(nome_habilidades)*100:.1f}%")
-                with col_stats4:
-                    st.metric("Completamente Dominado", f"{len(completamente_dominado)}", f"{len(completamente_dominado)/len(nome_habilidades)*100:.1f}%")
-                with col_stats5:
-                    pontuacao_total = sum([aluno_data[hab] for hab in nome_habilidades.values()])
-                    pontuacao_maxima = len(nome_habilidades) * get_pontuacao_maxima(disciplina)
-                    st.metric("Pontuação Total", f"{pontuacao_total}/{pontuacao_maxima}", f"{pontuacao_total/pontuacao_maxima*100:.1f}%")
-                
-            else:  # Matematica
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.subheader("❌ Não Domina")
-                    nao_domina = []
-                    for hab in nome_habilidades.values():
-                        if aluno_data[hab] == 0:
-                            nao_domina.append(hab)
-                    if nao_domina:
-                        for hab in sorted(nao_domina):
-                            st.write(f"• **{hab}**: {get_descricao_habilidade(hab, disciplina)}")
-                    else:
+                    elif valor == 0:
                         st.success("🎉 Domina todas as habilidades!")
-                
-                with col2:
-                    st.subheader("⚠️ Domina")
-                    domina = []
-                    for hab in nome_habilidades.values():
-                        if aluno_data[hab] == 1:
-                            domina.append(hab)
-                    if domina:
-                        for hab in sorted(domina):
-                            st.write(f"• **{hab}**: {get_descricao_habilidade(hab, disciplina)}")
-                    else:
-                        st.write("Nenhuma habilidade neste nível")
-                
-                with col3:
-                    st.subheader("✅ Domina Plenamente")
-                    domina_plenamente = []
-                    for hab in nome_habilidades.values():
-                        if aluno_data[hab] == 2:
-                            domina_plenamente.append(hab)
-                    if domina_plenamente:
-                        for hab in sorted(domina_plenamente):
-                            st.write(f"• **{hab}**: {get_descricao_habilidade(hab, disciplina)}")
                     else:
                         st.write("Nenhuma habilidade neste nível")
-                
-                # Estatísticas do aluno
-                st.subheader("📊 Estatísticas do Aluno")
-                col_stats1, col_stats2, col_stats3, col_stats4 = st.columns(4)
-                
-                with col_stats1:
-                    st.metric("Não Domina", f"{len(nao_domina)}", f"{len(nao_domina)/len(nome_habilidades)*100:.1f}%")
-                with col_stats2:
-                    st.metric("Domina", f"{len(domina)}", f"{len(domina)/len(nome_habilidades)*100:.1f}%")
-                with col_stats3:
-                    st.metric("Domina Plenamente", f"{len(domina_plenamente)}", f"{len(domina_plenamente)/len(nome_habilidades)*100:.1f}%")
-                with col_stats4:
-                    pontuacao_total = sum([aluno_data[hab] for hab in nome_habilidades.values()])
-                    pontuacao_maxima = len(nome_habilidades) * get_pontuacao_maxima(disciplina)
-                    st.metric("Pontuação Total", f"{pontuacao_total}/{pontuacao_maxima}", f"{pontuacao_total/pontuacao_maxima*100:.1f}%")
+            
+            # Estatísticas do aluno
+            st.subheader("📊 Estatísticas do Aluno")
+            cols_stats = st.columns(len(niveis) + 1)
+            
+            for valor, (col, nivel) in enumerate(zip(cols_stats, niveis)):
+                quantidade = len(perfil.por_nivel[valor])
+                with col:
+                    st.metric(nivel.split(" ", 1)[1], f"{quantidade}", f"{quantidade/len(habilidades)*100:.1f}%")
+            with cols_stats[-1]:
+                pontuacao_maxima = len(habilidades) * nivel_maximo
+                st.metric("Pontuação Total", f"{perfil.pontuacao_total}/{pontuacao_maxima}", f"{perfil.pontuacao_total/pontuacao_maxima*100:.1f}%")
                         
             # Gráfico de Radar Elegante
             st.subheader("📊 Perfil de Habilidades - Radar")
 
             # Dados para o radar
-            habilidades = list(nome_habilidades.values())
-            valores = [aluno_data[hab] for hab in nome_habilidades.values()]
+            valores = list(perfil.valores)
 
             # Cores baseadas nos valores
             cores = []
@@ -343,9 +175,9 @@ if df is not None:
                 polar=dict(
                     radialaxis=dict(
                         visible=True,
-                        range=[0, get_pontuacao_maxima(disciplina)],
-                        tickvals=list(range(get_pontuacao_maxima(disciplina)+1)),
-                        ticktext=[get_nivel_descricao(i, disciplina).split()[-1] for i in range(get_pontuacao_maxima(disciplina)+1)]
+                        range=[0, nivel_maximo],
+                        tickvals=list(range(nivel_maximo+1)),
+                        ticktext=[get_nivel_descricao(i, nivel_maximo).split()[-1] for i in range(nivel_maximo+1)]
                     )
                 ),
                 showlegend=False,
@@ -361,21 +193,23 @@ if df is not None:
             # Selecionar habilidade
             habilidade_selecionada = st.selectbox(
                 "Selecione a habilidade:",
-                sorted(nome_habilidades.values())
+                sorted(habilidades)
             )
             
             # Descrição da habilidade
-            st.info(f"**Descrição:** {get_descricao_habilidade(habilidade_selecionada, disciplina)}")
+            st.info(f"**Descrição:** {descricoes.descricao(avaliacao_info, habilidade_selecionada)}")
             
             # Agrupar alunos por nível de domínio
+            # (acima do nível máximo conta no máximo, como no gráfico de distribuição)
+            niveis_habilidade = alunos_filtrados[habilidade_selecionada].clip(upper=nivel_maximo)
             grupos = {
-                "❌ Não Domina": alunos_filtrados[alunos_filtrados[habilidade_selecionada] == 0],
-                "⚠️ Domina": alunos_filtrados[alunos_filtrados[habilidade_selecionada] == 1],
-                "✅ Domina Plenamente": alunos_filtrados[alunos_filtrados[habilidade_selecionada] == 2]
+                "❌ Não Domina": alunos_filtrados[niveis_habilidade == 0],
+                "⚠️ Domina": alunos_filtrados[niveis_habilidade == 1],
+                "✅ Domina Plenamente": alunos_filtrados[niveis_habilidade == 2]
             }
             
-            if disciplina == "Portugues":
-                grupos["🏆 Completamente Dominado"] = alunos_filtrados[alunos_filtrados[habilidade_selecionada] == 3]
+            if nivel_maximo == 3:
+                grupos["🏆 Completamente Dominado"] = alunos_filtrados[niveis_habilidade == 3]
             
             # Layout com abas para cada grupo
             tabs = st.tabs(list(grupos.keys()))
@@ -385,13 +219,8 @@ if df is not None:
                     st.subheader(f"{nivel} ({len(grupo)} alunos)")
                     
                     if len(grupo) > 0:
-                        # Mostrar alunos em colunas
-                        col_count = 3
-                        cols = st.columns(col_count)
-                        
-                        for idx, (_, aluno) in enumerate(grupo.iterrows()):
-                            with cols[idx % col_count]:
-                                st.write(f"**{aluno['Aluno']}** (Turma {aluno['Turma']})")
+                        # Lista de alunos em uma única tabela paginada
+                        componentes.lista_alunos(grupo, chave=f"grupo_{i}_{habilidade_selecionada}")
                     else:
                         st.info("Nenhum aluno neste grupo")
             
@@ -399,7 +228,8 @@ if df is not None:
             st.subheader("📊 Distribuição por Nível de Domínio")
             
             # Contar alunos por nível
-            contagem_niveis = {nivel: len(grupo) for nivel, grupo in grupos.items()}
+            contagem_habilidade = resumo.por_habilidade[resumo.codigos.index(habilidade_selecionada)]
+            contagem_niveis = dict(zip(grupos.keys(), contagem_habilidade.tolist()))
             
             # Criar gráfico de pizza
             fig = px.pie(
@@ -420,10 +250,8 @@ if df is not None:
         elif tipo_analise == "Visão Geral dos Grupos":
             st.header("📋 Visão Geral dos Grupos")
             
-            # Definir níveis baseado na disciplina
-            niveis = ["❌ Não Domina", "⚠️ Domina", "✅ Domina Plenamente"]
-            if disciplina == "Portugues":
-                niveis.append("🏆 Completamente Dominado")
+            # Definir níveis baseado no nível máximo da avaliação
+            niveis = NIVEIS[:nivel_maximo + 1]
             
             # Selecionar nível
             nivel_selecionado = st.selectbox("Selecione o nível:", niveis)
@@ -438,25 +266,8 @@ if df is not None:
             
             valor_nivel = nivel_para_valor[nivel_selecionado]
             
-            # Encontrar alunos que estão no nível selecionado para pelo menos uma habilidade
-            alunos_no_nivel = []
-            
-            for _, aluno in alunos_filtrados.iterrows():
-                habilidades_no_nivel = []
-                for hab in nome_habilidades.values():
-                    if aluno[hab] == valor_nivel:
-                        habilidades_no_nivel.append(hab)
-                
-                if habilidades_no_nivel:
-                    alunos_no_nivel.append({
-                        "Aluno": aluno["Aluno"],
-                        "Turma": aluno["Turma"],
-                        "Habilidades": ", ".join(sorted(habilidades_no_nivel)),
-                        "Quantidade": len(habilidades_no_nivel)
-                    })
-            
-            # Converter para DataFrame
-            df_nivel = pd.DataFrame(alunos_no_nivel)
+            # Alunos que estão no nível selecionado em pelo menos uma habilidade (máscara vetorizada)
+            df_nivel = componentes.habilidades_no_nivel(alunos_filtrados, habilidades, valor_nivel, nivel_maximo)
             
             if len(df_nivel) > 0:
                 # Ordenar por quantidade (decrescente)
@@ -464,8 +275,9 @@ if df is not None:
                 
                 # Mostrar tabela
                 st.subheader(f"Alunos que {nivel_selecionado.split()[-1]} pelo menos uma habilidade")
-                st.dataframe(
+                componentes.tabela_paginada(
                     df_nivel,
+                    chave=f"nivel_{valor_nivel}",
                     column_config={
                         "Aluno": "Aluno",
                         "Turma": "Turma",
@@ -487,7 +299,9 @@ if df is not None:
                 with col2:
                     st.metric("Média de Habilidades", f"{df_nivel['Quantidade'].mean():.1f}")
                 with col3:
-                    st.metric("Habilidade mais comum", df_nivel['Habilidades'].str.split(', ').explode().mode().iloc[0] if not df_nivel.empty else "N/A")
+                    # Habilidade com mais alunos no nível, direto da contagem agregada
+                    alunos_por_habilidade = resumo.por_habilidade[:, valor_nivel]
+                    st.metric("Habilidade mais comum", resumo.codigos[int(alunos_por_habilidade.argmax())])
                 
                 # Gráfico de distribuição
                 st.subheader("Distribuição por Quantidade de Habilidades")
@@ -513,36 +327,22 @@ if df is not None:
             # Estatísticas por turma
             st.subheader("Estatísticas por Turma")
             
-            # Calcular estatísticas para cada turma
-            estatisticas_turmas = []
-            
-            for turma in turmas_disponiveis:
-                if turma in turma_selecionada:
-                    alunos_turma = alunos_filtrados[alunos_filtrados['Turma'] == turma]
-                    
-                    # Calcular pontuação média por habilidade
-                    pontuacao_media = alunos_turma[nome_habilidades.values()].mean().mean()
-                    
-                    # Calcular percentual de domínio (pontuação > 0)
-                    dominio_geral = (alunos_turma[nome_habilidades.values()] > 0).mean().mean() * 100
-                    
-                    # Calcular percentual de domínio pleno (pontuação máxima)
-                    if disciplina == "Portugues":
-                        dominio_pleno = (alunos_turma[nome_habilidades.values()] == 3).mean().mean() * 100
-                    else:
-                        dominio_pleno = (alunos_turma[nome_habilidades.values()] == 2).mean().mean() * 100
-                    
-                    estatisticas_turmas.append({
-                        "Turma": turma,
-                        "Alunos": len(alunos_turma),
-                        "Pontuação Média": pontuacao_media,
-                        "Domínio Geral (%)": dominio_geral,
-                        "Domínio Pleno (%)": dominio_pleno
-                    })
+            # Estatísticas de todas as turmas a partir da contagem agregada
+            percentuais_turma = resumo.percentuais_por_turma
+            df_estatisticas = pd.DataFrame({
+                "Turma": resumo.contagem.turmas,
+                "Alunos": resumo.contagem.alunos_por_turma,
+                # Pontuação média por habilidade
+                "Pontuação Média": resumo.pontuacao_media_por_turma,
+                # Percentual de domínio (pontuação > 0)
+                "Domínio Geral (%)": 100 - percentuais_turma[:, :, 0].mean(axis=1),
+                # Percentual de domínio pleno (pontuação máxima)
+                "Domínio Pleno (%)": percentuais_turma[:, :, nivel_maximo].mean(axis=1)
+            })
+            df_estatisticas = df_estatisticas[df_estatisticas["Turma"].isin(turma_selecionada)]
             
             # Exibir estatísticas das turmas
-            if estatisticas_turmas:
-                df_estatisticas = pd.DataFrame(estatisticas_turmas)
+            if not df_estatisticas.empty:
                 st.dataframe(
                     df_estatisticas,
                     column_config={
@@ -568,18 +368,14 @@ if df is not None:
             # Habilidades com maior e menor domínio
             st.subheader("Habilidades com Maior e Menor Domínio")
             
-            # Calcular percentual de domínio por habilidade
-            dominio_por_habilidade = []
+            # Calcular percentual de domínio por habilidade (descrições em uma única busca)
+            dominio_por_habilidade = pd.DataFrame({
+                "Habilidade": habilidades,
+                "Domínio (%)": 100 - resumo.percentuais[:, 0],
+                "Descrição": descricoes.descrever(avaliacao_info, habilidades).to_numpy()
+            })
             
-            for hab in nome_habilidades.values():
-                dominio = (alunos_filtrados[hab] > 0).mean() * 100
-                dominio_por_habilidade.append({
-                    "Habilidade": hab,
-                    "Domínio (%)": dominio,
-                    "Descrição": get_descricao_habilidade(hab, disciplina)
-                })
-            
-            df_dominio = pd.DataFrame(dominio_por_habilidade).sort_values("Domínio (%)", ascending=False)
+            df_dominio = dominio_por_habilidade.sort_values("Domínio (%)", ascending=False)
             
             # Mostrar as 5 melhores e 5 piores habilidades
             col1, col2 = st.columns(2)
@@ -619,25 +415,16 @@ if df is not None:
             # Gráfico de calor das habilidades
             st.subheader("Mapa de Calor das Habilidades")
             
-            # Calcular percentual de domínio por turma e habilidade
-            heatmap_data = []
-            
-            for turma in turma_selecionada:
-                alunos_turma = alunos_filtrados[alunos_filtrados['Turma'] == turma]
-                
-                for hab in nome_habilidades.values():
-                    dominio = (alunos_turma[hab] > 0).mean() * 100
-                    heatmap_data.append({
-                        "Turma": turma,
-                        "Habilidade": hab,
-                        "Domínio (%)": dominio
-                    })
-            
-            df_heatmap = pd.DataFrame(heatmap_data)
+            # Percentual de domínio por habilidade e turma
+            df_heatmap = pd.DataFrame(
+                (100 - percentuais_turma[:, :, 0]).T,
+                index=pd.Index(resumo.codigos, name="Habilidade"),
+                columns=pd.Index(resumo.contagem.turmas, name="Turma")
+            )[sorted(turma_selecionada)]
             
             # Criar heatmap
             fig = px.imshow(
-                df_heatmap.pivot(index="Habilidade", columns="Turma", values="Domínio (%)"),
+                df_heatmap,
                 labels=dict(x="Turma", y="Habilidade", color="Domínio (%)"),
                 color_continuous_scale="RdYlGn",
                 range_color=[0, 100],
@@ -648,9 +435,9 @@ if df is not None:
             
         # Adicionar informações sobre a disciplina e prova
         st.sidebar.header("ℹ️ Informações")
-        st.sidebar.write(f"**Disciplina:** {disciplina}")
+        st.sidebar.write(f"**Disciplina:** {nomes_disciplinas[disciplina]}")
         st.sidebar.write(f"**Prova:** CAED {prova}")
-        st.sidebar.write(f"**Habilidades analisadas:** {len(nome_habilidades)}")
+        st.sidebar.write(f"**Habilidades analisadas:** {len(habilidades)}")
         
     except Exception as e:
         st.error(f"Erro ao processar os dados: {e}")
@@ -1,10 +1,10 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import random
-import os
 import plotly.graph_objects as go
 
+from cesb import agrupamento, avaliacoes, dados, descricoes, lote
+
 # --- Configuração da Página e Estilo ---
 st.set_page_config(page_title="Gerador de grupos Recomposição de Aprendizagem- CESB Analytics", layout="wide", initial_sidebar_state="expanded")
 
@@ -38,224 +38,33 @@ st.markdown("Filtre por turma e selecione as habilidades para criar grupos de tr
 st.markdown("---")
 
 
-# --- Dicionários de Habilidades (mantidos como no original) ---
-DESCRICOES_HABILIDADES = {
-    "CAED1_Matemática": {
-        "H01": "Utilizar informações apresentadas em tabelas ou gráficos na resolução de problemas.",
-        "H02": "Utilizar o princípio multiplicativo de contagem na resolução de problema.",
-        "H03": "Utilizar probabilidade na resolução de problema.",
-        "H04": "Utilizar proporcionalidade entre duas grandezas na resolução de problema.",
-        "H05": "Corresponder pontos do plano a pares ordenados em um sistema de coordenadas cartesianas.",
-        "H06": "Utilizar o cálculo de volumes/capacidade de prismas retos e de cilindros na resolução de problema.",
-        "H07": "Utilizar perímetro de figuras bidimensionais na resolução de problema.",
-        "H08": "Utilizar relações métricas de um triângulo retângulo na resolução de problema.",
-        "H09": "Analisar regiões de crescimento/decrescimento, domínios de validade ou zeros de funções reais representadas graficamente.",
-        "H10": "Utilizar função polinomial de 1º grau na resolução de problemas.",
-        "H11": "Reconhecer a representação algébrica de uma função polinomial de 2º grau a partir dos dados apresentados em uma tabela.",
-        "H12": "Utilizar a medida da área total e/ou lateral de um sólido na resolução de problema.",
-        "H13": "Utilizar função exponencial na resolução de problemas.",
-        "H14": "Utilizar função polinomial de 2º grau na resolução de problemas.",
-        "H15": "Utilizar propriedades de progressões aritméticas ou geométricas na resolução de problemas.",
-        "H16": "Utilizar equação polinomial de 2º grau na resolução de problema.",
-        "H17": "Reconhecer a representação gráfica das funções trigonométricas (seno, cosseno e tangente).",
-        "H18": "Resolver problemas que envolvam razões trigonométricas no triângulo retângulo.",
-    },
-    "CAED2_Matemática": {
-        "H01": "Corresponder figuras tridimensionais às suas planificações.",
-        "H02": "Utilizar informações apresentadas em tabelas ou gráficos na resolução de problemas",
-        "H03": "Utilizar o princípio multiplicativo de contagem na resolução de problema.",
-        "H04": "Utilizar probabilidade na resolução de problema.",
-        "H05": "Utilizar proporcionalidade entre duas grandezas na resolução de problema.",
-        "H06": "Corresponder pontos do plano a pares ordenados em um sistema de coordenadas cartesianas.",
-        "H07": "Utilizar o cálculo de volumes/capacidade de prismas retos e de cilindros na resolução de problema.",
-        "H08": "Utilizar perímetro de figuras bidimensionais na resolução de problema.",
-        "H09": "Utilizar porcentagem na resolução de problemas.",
-        "H10": "Utilizar relações métricas de um triângulo retângulo na resolução de problema.",
-        "H11": "Analisar regiões de crescimento/decrescimento, domínios de validade ou zeros de funções reais representadas graficamente.",
-        "H12": "Corresponder a representação algébrica e gráfica de uma função polinomial de 1º grau.",
-        "H13": "Utilizar função polinomial de 1º grau na resolução de problemas.",
-        "H14": "Utilizar a medida da área total e/ou lateral de um sólido na resolução de problema.",
-        "H15": "Utilizar função exponencial na resolução de problemas.",
-        "H16": "Utilizar função polinomial de 2º grau na resolução de problemas.",
-        "H17": "Utilizar propriedades de progressões aritméticas ou geométricas na resolução de problemas.",
-        "H18": "Identificar a representação algébrica ou gráfica de uma função exponencial.",
-        "H19": "Utilizar equação polinomial de 2º grau na resolução de problema.",
-        "H20": "Relacionar as raízes de um polinômio com sua decomposição em fatores do 1º grau.",
-        "H21": "Reconhecer a representação gráfica das funções trigonométricas (seno, cosseno e tangente).",
-        "H22": "Resolver problemas que envolvam razões trigonométricas no triângulo retângulo."
-    },
-    "CAED1_Português": {
-        "H01": "Reconhecer formas de tratar uma informação na comparação de textos que tratam do mesmo tema.",
-        "H02": "Localizar informação explícita.",
-        "H03": "Inferir informações em textos.",
-        "H04": "Reconhecer efeito de humor ou de ironia em um texto.",
-        "H05": "Distinguir ideias centrais de secundárias ou tópicos and subtópicos em um dado gênero textual.",
-        "H06": "Identificar a tese de um texto.",
-        "H07": "Reconhecer posições distintas relativas ao mesmo fato ou mesmo tema.",
-        "H08": "Reconhecer as relações entre partes de um texto, identificando os recursos coesivos que contribuem para a sua continuidade.",
-        "H09": "Distinguir um fato da opinião.",
-        "H10": "Reconhecer o sentido das relações lógico-discursivas em um texto.",
-        "H11": "Reconhecer o efeito de sentido decorrente da escolha de uma determinada palavra ou expressão.",
-        "H12": "Estabelecer relação entre a tese e os argumentos oferecidos para sustentá-la.",
-        "H13": "Estabelecer relação causa/consequência entre partes e elementos do texto.",
-        "H14": "Reconhecer o efeito de sentido decorrente da exploração de recursos ortográficos e/ou morfossintáticos.",
-        "H15": "Identificar as marcas linguísticas que evidenciam o locutor e o interlocutor de um texto.",
-    },
-    "CAED2_Português": {
-        "H01": "Reconhecer formas de tratar uma informação na comparação de textos que tratam do mesmo tema.",
-        "H02": "Localizar informação explícita.",
-        "H03": "Inferir informações em textos.",
-        "H04": "Reconhecer efeito de humor ou de ironia em um texto.",
-        "H05": "Distinguir ideias centrais de secundárias ou tópicos and subtópicos em um dado gênero textual.",
-        "H06": "Identificar a tese de anúncio.",
-        "H07": "Reconhecer posições distintas relativas ao mesmo fato ou mesmo tema.",
-        "H08": "Reconhecer as relações entre partes de um texto, identificando os recursos coesivos que contribuem para a sua continuidade.",
-        "H09": "Distinguir um fato da opinião.",
-        "H10": "Reconhecer o sentido das relações lógico-discursivas em anúncio.",
-        "H11": "Reconhecer o efeito de sentido decorrente da escolha de uma determinada palavra ou expressão.",
-        "H12": "Estabelecer relação entre a tese e os argumentos oferecidos para sustentá-la.",
-        "H13": "Estabelecer relação causa/consequência entre partes e elementos do texto.",
-        "H14": "Reconhecer o efeito de sentido decorrente da exploração de recursos ortográficos e/ou morfossintáticos.",
-        "H15": "Identificar as marcas linguísticas que evidenciam o locutor e o interlocutor de um texto.",
-    },
-    "9_Matematica": {
-        "H01": "Corresponder figuras tridimensionais às suas planificações.",
-        "H02": "Utilizar informações apresentadas em tabelas ou gráficos na resolução de problemas.",
-        "H03": "Utilizar área de figuras bidimensionais na resolução de problema.",
-        "H04": "Identificar frações equivalentes.",
-        "H05": "Utilizar conversão entre unidades de medida, na resolução de problema.",
-        "H06": "Utilizar o princípio multiplicativo de contagem na resolução de problema.",
-        "H07": "Utilizar proporcionalidade entre duas grandezas na resolução de problema.",
-        "H08": "Classificar quadriláteros por meio de suas propriedades.",
-        "H09": "Classificar triângulos por meio de suas propriedades.",
-        "H10": "Corresponder diferentes representações de um número racional.",
-        "H11": "Utilizar o cálculo de volumes/capacidade de prismas retos e de cilindros na resolução de problema.",
-        "H12": "Utilizar perímetro de figuras bidimensionais na resolução de problema.",
-        "H13": "Utilizar porcentagem na resolução de problemas.",
-        "H14": "Identificar a expressão algébrica que expressa uma regularidade observada em sequência de números ou figuras (padrões).",
-        "H15": "Executar cálculos com números reais.",
-        "H16": "Utilizar o cálculo do valor numérico de expressões algébricas na resolução de problemas.",
-        "H17": "Utilizar relações métricas de um triângulo retângulo na resolução de problema.",
-        "H18": "Utilizar equação polinomial de 2º grau na resolução de problema.",
-        "H19": "Utilizar números racionais, envolvendo diferentes significados das operações, na resolução de problemas.",
-        "H20": "Identificar uma equação or inequação do 1º grau que expressa um problema."
-    },
-    "9_Português": {
-        "H01": "Identificar a finalidade de textos de diferentes gêneros.",
-        "H02": "Localizar informação explícita.",
-        "H03": "Inferir informações em textos.",
-        "H04": "Reconhecer efeito de humor ou de ironia em um texto.",
-        "H05": "Distinguir ideias centrais de secundárias ou tópicos e subtópicos em um dado gênero textual.",
-        "H06": "Reconhecer os elementos que compõem uma narrativa e o conflito gerador.",
-        "H07": "Identificar a tese de um texto.",
-        "H08": "Reconhecer posições distintas relativas ao mesmo fato ou mesmo tema.",
-        "H09": "Reconhecer as relações entre partes de um texto, identificando os recursos coesivos que contribuem para a sua continuidade.",
-        "H10": "Distinguir um fato da opinião.",
-        "H11": "Reconhecer o sentido das relações lógico-discursivas em um texto.",
-        "H12": "Reconhecer o efeito de sentido decorrente da escolha de uma determinada palavra or expressão.",
-        "H13": "Estabelecer relação entre a tese e os argumentos oferecidos para sustentá-la.",
-        "H14": "Reconhecer o efeito de sentido decorrente da exploração de recursos ortográficos e/ou morfossintáticos.",
-        "H15": "Identificar as marcas linguísticas que evidenciam o locutor e o interlocutor de um texto.",
-    }
+# Métodos de formação disponíveis (rótulo exibido → nome do método em `agrupamento.METODOS`)
+METODOS_FORMACAO = {
+    "Equilibrado (otimizado)": "equilibrado",
+    "Rodízio por níveis": "rodizio",
+    "Homogêneo (perfis parecidos)": "homogeneo",
 }
 
 
+# Formas de exibir o desempenho dos grupos: uma figura por turma ou um gráfico por grupo
+VISUALIZACOES = ["Mapa de calor da turma", "Gráfico por grupo"]
+
+
 # --- Funções do Aplicativo ---
 
-@st.cache_data
 def carregar_dados(arquivo_selecionado):
-    """Carrega o arquivo CSV selecionado da mesma pasta do script"""
+    """Carrega o arquivo CSV selecionado, com as colunas de habilidade renomeadas para os códigos (H01, H02...)"""
     try:
-        # Tenta usar __file__ que é mais robusto
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        csv_path = os.path.join(script_dir, arquivo_selecionado)
-        
-        if os.path.exists(csv_path):
-            df = pd.read_csv(csv_path, sep=';', encoding='utf-8')
-            df.columns = df.columns.str.strip()
-            return df
-        else:
-            st.error(f"Arquivo '{arquivo_selecionado}' não encontrado na pasta do script.")
-            return None
+        df = dados.carregar_caed(arquivo_selecionado)
+        avaliacao_info = avaliacoes.por_arquivo(arquivo_selecionado)
+        return df.rename(columns={col: cod for cod, col in avaliacao_info.colunas.items()})
+    except FileNotFoundError:
+        st.error(f"Arquivo '{arquivo_selecionado}' não encontrado na pasta de dados.")
+        return None
     except Exception as e:
         st.error(f"Erro ao carregar o arquivo: {e}")
         return None
 
-def get_descricao_habilidade(codigo, arquivo_nome):
-    """Obtém a descrição da habilidade baseada no nome do arquivo"""
-    codigo = codigo.strip().replace(' ', '')
-    
-    if "CAED1_3_matematica" in arquivo_nome:
-        return DESCRICOES_HABILIDADES["CAED1_Matemática"].get(codigo, "N/A")
-    elif "CAED2_3_matematica" in arquivo_nome:
-        return DESCRICOES_HABILIDADES["CAED2_Matemática"].get(codigo, "N/A")
-    elif "CAED1_3_portugues" in arquivo_nome:
-        return DESCRICOES_HABILIDADES["CAED1_Português"].get(codigo, "N/A")
-    elif "CAED2_3_portugues" in arquivo_nome:
-        return DESCRICOES_HABILIDADES["CAED2_Português"].get(codigo, "N/A")
-    elif "9_matematica" in arquivo_nome:
-        return DESCRICOES_HABILIDADES["9_Matematica"].get(codigo, "N/A")
-    elif "9_portugues" in arquivo_nome:
-        return DESCRICOES_HABILIDADES["9_Português"].get(codigo, "N/A")
-    else:
-        return "Descrição não disponível"
-
-def formar_grupos_por_niveis(alunos_df, habilidades_selecionadas, max_por_grupo):
-    """
-    Forma grupos heterogêneos garantindo um equilíbrio entre diferentes níveis de domínio.
-    Níveis baseados na média de pontuação das habilidades selecionadas.
-    """
-    if alunos_df.empty or not habilidades_selecionadas:
-        return []
-
-    alunos_list = alunos_df.to_dict('records')
-    
-    alunos_nivel_0 = []  # Não Domina
-    alunos_nivel_1 = []  # Domina
-    alunos_nivel_2 = []  # Domina Plenamente
-
-    for aluno in alunos_list:
-        pontuacoes = [aluno[hab] for hab in habilidades_selecionadas if hab in aluno and isinstance(aluno[hab], (int, float))]
-        media = np.mean(pontuacoes) if pontuacoes else 0
-        
-        aluno['media_habilidades'] = media
-        
-        if media < 0.8:
-            alunos_nivel_0.append(aluno)
-        elif media < 1.6:
-            alunos_nivel_1.append(aluno)
-        else:
-            alunos_nivel_2.append(aluno)
-
-    random.shuffle(alunos_nivel_0)
-    random.shuffle(alunos_nivel_1)
-    random.shuffle(alunos_nivel_2)
-    
-    num_total_alunos = len(alunos_list)
-    num_grupos = (num_total_alunos + max_por_grupo - 1) // max_por_grupo
-    
-    if num_grupos == 0:
-        return []
-        
-    grupos = [[] for _ in range(num_grupos)]
-    
-    todos_os_alunos_para_distribuir = alunos_nivel_2 + alunos_nivel_1 + alunos_nivel_0
-
-    for i, aluno in enumerate(todos_os_alunos_para_distribuir):
-        grupo_idx = i % num_grupos
-        grupos[grupo_idx].append(aluno)
-
-    return grupos
-
-def calcular_pontuacao_grupo(grupo, habilidades_cols):
-    """Calcula a pontuação média do grupo para cada habilidade"""
-    if not grupo:
-        return {hab: 0 for hab in habilidades_cols}
-        
-    grupo_df = pd.DataFrame(grupo)
-    medias = {hab: grupo_df[hab].mean() for hab in habilidades_cols if hab in grupo_df}
-    return medias
-
 def encontrar_colunas_info(df):
     """Encontra as colunas de aluno e turma no DataFrame"""
     aluno_col, turma_col = None, None
@@ -267,25 +76,257 @@ def encontrar_colunas_info(df):
             turma_col = col
     return aluno_col, turma_col
 
+@st.cache_data(show_spinner=False, max_entries=512)
+def gerar_grupos(arquivo, assinatura, turmas, habilidades, max_por_grupo, metodo, semente, restricoes=None):
+    """Grupos de uma ou mais turmas, memorizados por (arquivo, turmas, habilidades, tamanho, método, semente, restrições).
+
+    `assinatura` (mtime, tamanho) entra na chave para que uma nova versão do arquivo gere novos grupos.
+    """
+    info = avaliacoes.por_arquivo(arquivo)
+    df = dados.carregar_caed(arquivo).rename(columns={col: cod for cod, col in info.colunas.items()})
+    df_turma = df[df['Turma'].isin(turmas)]
+    return agrupamento.METODOS[metodo](df_turma, list(habilidades), max_por_grupo, semente=semente, restricoes=restricoes)
+
+def montar_tarefas_escola(arquivos, arquivo_atual, habilidades_atuais, max_por_grupo, metodo, semente, restricoes=None):
+    """Uma tarefa por turma de cada arquivo; o arquivo aberto usa as habilidades selecionadas, os demais todas."""
+    tarefas = []
+    for arquivo in arquivos:
+        info = avaliacoes.por_arquivo(arquivo)
+        df_arquivo = carregar_dados(arquivo)
+        if df_arquivo is None:
+            continue
+        habilidades = tuple(habilidades_atuais) if arquivo == arquivo_atual else info.habilidades
+        colunas = ['Aluno', *habilidades]
+        for turma, df_turma in df_arquivo.groupby('Turma', sort=True):
+            tarefas.append(lote.TarefaTurma(
+                arquivo=arquivo,
+                avaliacao=f"{info.rotulo} ({info.serie}º ano)",
+                turma=turma,
+                alunos=df_turma[colunas].reset_index(drop=True),
+                habilidades=habilidades,
+                max_por_grupo=max_por_grupo,
+                metodo=metodo,
+                semente=semente,
+                restricoes=restricoes
+            ))
+    return tarefas
+
+def gerar_grupos_escola(tarefas):
+    """Resolve todas as turmas em paralelo, atualizando o progresso a cada turma concluída."""
+    progresso = st.progress(0.0, text="Formando grupos...")
+    resumo = st.empty()
+    resultados, linhas_resumo = [], []
+    for resultado in lote.resolver_em_paralelo(tarefas):
+        resultados.append(resultado)
+        linhas_resumo.append({
+            "Avaliação": resultado.tarefa.avaliacao,
+            "Turma": resultado.tarefa.turma,
+            "Grupos": resultado.num_grupos,
+            "Dispersão": resultado.dispersao
+        })
+        progresso.progress(len(resultados) / len(tarefas), text=f"{len(resultados)} de {len(tarefas)} turmas concluídas")
+        resumo.dataframe(pd.DataFrame(linhas_resumo), hide_index=True, use_container_width=True)
+    progresso.empty()
+    return lote.exportar(resultados)
+
+def editar_restricoes(nomes_alunos):
+    """Editor dos pares de alunos que devem ficar separados ou juntos; devolve as listas de pares válidos."""
+    with st.expander("🔗 Restrições entre alunos (opcional)"):
+        st.caption("Indique pares de alunos que devem ficar em grupos diferentes ou no mesmo grupo.")
+        pares = st.data_editor(
+            pd.DataFrame({"Regra": pd.Series(dtype=str), "Aluno 1": pd.Series(dtype=str), "Aluno 2": pd.Series(dtype=str)}),
+            column_config={
+                "Regra": st.column_config.SelectboxColumn("Regra", options=["Separar", "Juntar"], required=True),
+                "Aluno 1": st.column_config.SelectboxColumn("Aluno 1", options=nomes_alunos, required=True),
+                "Aluno 2": st.column_config.SelectboxColumn("Aluno 2", options=nomes_alunos, required=True)
+            },
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            key="pares_restricoes"
+        )
+    pares = pares.dropna()
+    pares = pares[pares["Aluno 1"] != pares["Aluno 2"]]
+    separar = tuple(zip(*(pares.loc[pares["Regra"] == "Separar", col] for col in ("Aluno 1", "Aluno 2"))))
+    juntar = tuple(zip(*(pares.loc[pares["Regra"] == "Juntar", col] for col in ("Aluno 1", "Aluno 2"))))
+    return separar, juntar
+
+def figura_mapa_grupos(medias_grupos, nivel_maximo):
+    """Mapa de calor grupo × habilidade com as médias de todos os grupos da turma em uma única figura."""
+    fig = go.Figure(data=go.Heatmap(
+        z=medias_grupos.to_numpy(),
+        x=list(medias_grupos.columns),
+        y=[f"Grupo {i}" for i in medias_grupos.index],
+        zmin=0,
+        zmax=max(2, nivel_maximo),
+        colorscale="RdYlGn",
+        texttemplate="%{z:.2f}",
+        colorbar=dict(title="Média")
+    ))
+    fig.update_layout(
+        title_text='<b>Desempenho Médio dos Grupos</b>',
+        xaxis_title="Habilidades",
+        yaxis=dict(autorange="reversed"),
+        height=max(250, 45 * len(medias_grupos) + 120),
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+    return fig
+
+def estado_grupos(chave, grupos, habilidades):
+    """Grupos editáveis do bloco, guardados na sessão para que os ajustes do professor sobrevivam às interações."""
+    editados = st.session_state.setdefault("grupos_editados", {})
+    if chave not in editados:
+        editados[chave] = agrupamento.GruposEditaveis(grupos, habilidades)
+    return editados[chave]
+
+def ajustar_grupos(estado, chave, df, aluno_col, turma, homogeneo):
+    """Painel de ajustes pontuais (mover, retirar ou incluir um aluno); devolve os grupos alterados."""
+    alterados = set()
+    with st.expander("✏️ Ajustar grupos"):
+        st.caption("Os ajustes mantêm os demais alunos onde estão; apenas os grupos envolvidos são recalculados.")
+        numeros = list(range(1, estado.num_grupos + 1))
+        presentes = sorted(estado.alunos())
+        col_mover, col_retirar, col_incluir = st.columns(3)
+        with col_mover:
+            aluno = st.selectbox("Aluno:", presentes, key=f"mover_aluno_{turma}")
+            destino = st.selectbox("Para o grupo:", numeros, format_func=lambda n: f"Grupo {n}", key=f"mover_destino_{turma}")
+            if st.button("↔️ Mover", key=f"mover_{turma}", use_container_width=True) and aluno:
+                alterados |= estado.mover(aluno, destino - 1)
+        with col_retirar:
+            aluno = st.selectbox("Aluno transferido ou ausente:", presentes, key=f"retirar_aluno_{turma}")
+            if st.button("➖ Retirar", key=f"retirar_{turma}", use_container_width=True) and aluno:
+                alterados |= estado.remover(aluno)
+        with col_incluir:
+            fora = sorted(set(df[aluno_col]) - set(estado.alunos()))
+            aluno = st.selectbox("Aluno a incluir:", fora, key=f"incluir_aluno_{turma}")
+            destino = st.selectbox(
+                "No grupo:", [0, *numeros], format_func=lambda n: f"Grupo {n}" if n else "Automático",
+                key=f"incluir_destino_{turma}"
+            )
+            if st.button("➕ Incluir", key=f"incluir_{turma}", use_container_width=True) and aluno:
+                registro = df.loc[df[aluno_col] == aluno].iloc[0].to_dict()
+                alterados |= estado.adicionar(registro, destino - 1 if destino else None, homogeneo)
+        st.button(
+            "↩️ Desfazer ajustes", key=f"desfazer_{turma}", help="Volta à formação original deste sorteio.",
+            on_click=lambda: st.session_state["grupos_editados"].pop(chave, None)
+        )
+    return alterados
+
+@st.fragment
+def exibir_grupos(chave, grupos, df, turmas_bloco, habilidades_selecionadas, metodo, restricoes,
+                  dispersao_rodizio, visualizacao, nivel_maximo, aluno_col, turma_col):
+    """Resultado de um bloco de turmas.
+
+    Roda como fragmento: um ajuste nos grupos reexecuta só este trecho, sem recarregar
+    os dados nem refazer o agrupamento, e os cards alterados são destacados.
+    """
+    turma = ", ".join(turmas_bloco)
+    estado = estado_grupos(chave, grupos, habilidades_selecionadas)
+    alterados = ajustar_grupos(estado, chave, df, aluno_col, turma, metodo == "homogeneo")
+    grupos = estado.grupos
+
+    # Pares que não puderam ser atendidos (por exemplo, regras contraditórias)
+    separados_juntos, juntos_separados = agrupamento.pares_violados(grupos, restricoes)
+    for a, b in separados_juntos:
+        st.warning(f"Não foi possível separar {a} e {b}.")
+    for a, b in juntos_separados:
+        st.warning(f"Não foi possível juntar {a} e {b}.")
+
+    # Médias, pontos fortes e de atenção de todos os grupos, mantidos a cada ajuste
+    estatisticas = estado.estatisticas()
+
+    if metodo == "homogeneo":
+        # Nos grupos homogêneos importa a semelhança dentro de cada grupo
+        st.metric(
+            "Dispersão interna dos grupos",
+            f"{estatisticas.dispersao_interna():.3f}",
+            help="Desvio-padrão médio das habilidades dentro de cada grupo. Quanto menor, mais parecidos são os integrantes."
+        )
+    else:
+        # Qualidade da solução (no método otimizado, comparada com a heurística de rodízio)
+        dispersao = estatisticas.dispersao_grupos()
+        comparacao = None
+        if dispersao_rodizio is not None:
+            comparacao = f"{dispersao - dispersao_rodizio:+.3f} em relação ao rodízio"
+        st.metric(
+            "Dispersão entre grupos",
+            f"{dispersao:.3f}",
+            comparacao,
+            delta_color="inverse",
+            help="Desvio-padrão médio das médias dos grupos em cada habilidade. Quanto menor, mais equilibrados estão os grupos."
+        )
+
+    medias_grupos = estatisticas.tabela()
+    
+    if visualizacao == VISUALIZACOES[0]:
+        st.plotly_chart(
+            figura_mapa_grupos(medias_grupos, nivel_maximo),
+            use_container_width=True,
+            key=f"mapa_{turma}"
+        )
+
+    num_colunas = 2
+    colunas = st.columns(num_colunas)
+    
+    for i, grupo in enumerate(grupos, 1):
+        coluna_atual = colunas[(i - 1) % num_colunas]
+        pontuacoes = medias_grupos.loc[i]
+        marcador = " 🔄" if i - 1 in alterados else ""
+        with coluna_atual:
+            with st.expander(f"👥 Grupo {i} ({len(grupo)} alunos){marcador}", expanded=True):
+                if not grupo:
+                    st.info("Grupo sem integrantes.")
+                    continue
+                st.markdown("**🧑‍🎓 Integrantes:**")
+                for aluno in grupo:
+                    # Com várias turmas juntas, indica a turma de cada integrante
+                    sufixo = f" ({aluno[turma_col]})" if len(turmas_bloco) > 1 else ""
+                    st.write(f"- {aluno[aluno_col]}{sufixo}")
+                
+                st.markdown("---")
+                
+                if visualizacao == VISUALIZACOES[1]:
+                    fig = go.Figure()
+                    fig.add_trace(go.Bar(
+                        x=list(pontuacoes.index),
+                        y=list(pontuacoes.values),
+                        text=[f"{v:.2f}" for v in pontuacoes.values],
+                        textposition='auto',
+                        marker_color='#00796b'
+                    ))
+                    fig.update_layout(
+                        title_text='<b>Desempenho Médio do Grupo</b>',
+                        xaxis_title="Habilidades",
+                        yaxis_title="Pontuação Média",
+                        yaxis_range=[0, 2],
+                        height=300,
+                        margin=dict(l=20, r=20, t=40, b=20)
+                    )
+                    st.plotly_chart(fig, use_container_width=True, key=f"chart_{turma}_{i}")
+
+                pontos_fortes = estatisticas.pontos_fortes(i - 1)
+                pontos_atencao = estatisticas.pontos_atencao(i - 1)
+
+                if pontos_fortes:
+                    st.success(f"**Pontos Fortes:** {', '.join(pontos_fortes)}")
+                if pontos_atencao:
+                    st.warning(f"**Pontos de Atenção:** {', '.join(pontos_atencao)}")
+
 # --- Interface Principal ---
 def main():
     st.sidebar.header("📁 1. Seleção de Dados")
-    arquivos_csv = [
-        "CAED1_3_matematica.csv", "CAED1_3_portugues.csv",
-        "CAED2_3_matematica.csv", "CAED2_3_portugues.csv",
-        "CAED1_9_matematica.csv", "CAED1_9_portugues.csv",
-        "CAED2_9_matematica.csv", "CAED2_9_portugues.csv"
-    ]
+    arquivos_csv = [a.arquivo for a in sorted(avaliacoes.listar(), key=lambda a: (a.serie, a.edicao, a.disciplina))]
     arquivo_selecionado = st.sidebar.selectbox(
         "Selecione o arquivo CSV:",
         arquivos_csv
     )
     
+    avaliacao_info = avaliacoes.por_arquivo(arquivo_selecionado)
     df = carregar_dados(arquivo_selecionado)
     
     if df is not None:
         aluno_col, turma_col = encontrar_colunas_info(df)
-        habilidades_cols = sorted([col for col in df.columns if col.startswith('H') and col[1:].replace(' ', '').isdigit()])
+        habilidades_cols = list(avaliacao_info.habilidades)
         
         st.sidebar.success(f"✅ Arquivo carregado com {len(df)} alunos.")
         
@@ -302,7 +343,8 @@ def main():
             st.sidebar.warning("Coluna 'Turma' não encontrada.")
             turmas_selecionadas = []
 
-        opcoes_habilidades = {f"{h} - {get_descricao_habilidade(h, arquivo_selecionado)}": h for h in habilidades_cols}
+        # Rótulos "H01 - descrição" montados de uma só vez a partir do cadastro de habilidades
+        opcoes_habilidades = dict(zip(descricoes.rotulos(avaliacao_info, habilidades_cols), habilidades_cols))
         habilidades_formatadas_selecionadas = st.sidebar.multiselect(
             "Selecione as habilidades foco:",
             opcoes_habilidades.keys(),
@@ -315,69 +357,115 @@ def main():
             min_value=2, max_value=10, value=4
         )
         
+        num_grupos_fixo = 0
+        if st.sidebar.checkbox("Fixar o número de grupos", help="Forma exatamente esta quantidade de grupos, ignorando o tamanho máximo."):
+            num_grupos_fixo = int(st.sidebar.number_input("Número de grupos:", min_value=2, max_value=20, value=5, step=1))
+        
+        metodo = st.sidebar.radio(
+            "Método de formação:",
+            list(METODOS_FORMACAO.keys()),
+            help="O método equilibrado troca alunos entre os grupos até que as médias por habilidade fiquem o mais próximas possível. "
+                 "O homogêneo reúne alunos com dificuldades parecidas, para retomada dirigida."
+        )
+        
+        visualizacao = st.sidebar.radio(
+            "Gráficos de desempenho:",
+            VISUALIZACOES,
+            help="O mapa de calor resume todos os grupos da turma em uma única figura, mais leve para conexões lentas."
+        )
+        
+        juntar_turmas = False
+        if METODOS_FORMACAO[metodo] == "homogeneo":
+            juntar_turmas = st.sidebar.checkbox(
+                "Agrupar as turmas selecionadas juntas",
+                help="Forma os grupos com todos os alunos das turmas selecionadas (por exemplo, a série inteira)."
+            )
+        
+        # Semente do sorteio: os mesmos parâmetros geram sempre os mesmos grupos até um novo sorteio
+        if "semente_grupos" not in st.session_state:
+            st.session_state["semente_grupos"] = 0
+        
         if st.sidebar.button("🚀 Gerar Grupos", type="primary", use_container_width=True):
+            st.session_state["exibir_grupos"] = True
+        if st.sidebar.button("🔀 Reembaralhar", use_container_width=True, help="Sorteia uma nova formação de grupos."):
+            st.session_state["semente_grupos"] += 1
+            st.session_state["exibir_grupos"] = True
+        semente = st.session_state["semente_grupos"]
+        st.sidebar.caption(f"Sorteio nº {semente + 1}")
+        
+        # Restrições do professor (pares por nome e número fixo de grupos)
+        nomes_alunos = sorted(df.loc[df[turma_col].isin(turmas_selecionadas), aluno_col].unique()) if turma_col else []
+        separar, juntar = editar_restricoes(nomes_alunos)
+        restricoes = agrupamento.Restricoes(separar=separar, juntar=juntar, num_grupos=num_grupos_fixo)
+        
+        st.sidebar.header("🏫 3. Escola Inteira")
+        gerar_escola = st.sidebar.button(
+            "🏫 Gerar para toda a escola",
+            use_container_width=True,
+            help="Forma os grupos de todas as turmas de todos os arquivos em paralelo e gera uma planilha única."
+        )
+        
+        if gerar_escola:
+            tarefas = montar_tarefas_escola(
+                arquivos_csv, arquivo_selecionado, habilidades_selecionadas or habilidades_cols,
+                max_alunos_por_grupo, METODOS_FORMACAO[metodo], semente, restricoes
+            )
+            st.subheader("🏫 Grupos de toda a escola", divider="rainbow")
+            st.session_state["grupos_escola"] = gerar_grupos_escola(tarefas)
+        
+        # Exportação do último processamento em lote (mantida entre as interações)
+        if "grupos_escola" in st.session_state:
+            grupos_escola = st.session_state["grupos_escola"]
+            st.sidebar.download_button(
+                "📥 Baixar grupos da escola (CSV)",
+                grupos_escola.to_csv(sep=';', index=False).encode('utf-8-sig'),
+                file_name="grupos_escola.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+            if gerar_escola:
+                num_turmas = len(grupos_escola[["Arquivo", "Turma"]].drop_duplicates())
+                st.success(f"✅ {num_turmas} turmas e {len(grupos_escola)} alunos agrupados.")
+
+        if st.session_state.get("exibir_grupos"):
             if not turmas_selecionadas:
                 st.error("Por favor, selecione pelo menos uma turma.")
             elif not habilidades_selecionadas:
                 st.error("Por favor, selecione pelo menos uma habilidade.")
             else:
-                for turma in turmas_selecionadas:
-                    st.subheader(f"Turma: {turma}", divider="rainbow")
+                # Cada bloco é agrupado separadamente: uma turma, ou todas juntas no modo homogêneo
+                blocos = [tuple(turmas_selecionadas)] if juntar_turmas else [(turma,) for turma in turmas_selecionadas]
+                for turmas_bloco in blocos:
+                    turma = ", ".join(turmas_bloco)
+                    st.subheader(f"Turma{'s' if len(turmas_bloco) > 1 else ''}: {turma}", divider="rainbow")
                     
-                    df_turma = df[df[turma_col] == turma]
+                    df_turma = df[df[turma_col].isin(turmas_bloco)]
                     
                     if df_turma.empty:
                         st.warning("Nenhum aluno encontrado para esta turma.")
                         continue
                         
                     with st.spinner(f"Formando grupos para a turma {turma}..."):
-                        grupos = formar_grupos_por_niveis(df_turma, habilidades_selecionadas, max_alunos_por_grupo)
+                        assinatura = dados.assinatura_arquivo(arquivo_selecionado)
+                        parametros = (tuple(habilidades_selecionadas), max_alunos_por_grupo)
+                        chave = (arquivo_selecionado, assinatura, turmas_bloco, *parametros, METODOS_FORMACAO[metodo], semente, restricoes)
+                        grupos = gerar_grupos(*chave)
                         
-                        if not grupos:
-                            st.info("Não foi possível formar grupos para esta turma.")
-                            continue
-
-                        num_colunas = 2
-                        colunas = st.columns(num_colunas)
-                        
-                        for i, grupo in enumerate(grupos, 1):
-                            coluna_atual = colunas[(i - 1) % num_colunas]
-                            with coluna_atual:
-                                with st.expander(f"👥 Grupo {i} ({len(grupo)} alunos)", expanded=True):
-                                    st.markdown("**🧑‍🎓 Integrantes:**")
-                                    for aluno in grupo:
-                                        st.write(f"- {aluno[aluno_col]}")
-                                    
-                                    st.markdown("---")
-                                    
-                                    pontuacoes = calcular_pontuacao_grupo(grupo, habilidades_selecionadas)
-                                    
-                                    fig = go.Figure()
-                                    fig.add_trace(go.Bar(
-                                        x=list(pontuacoes.keys()),
-                                        y=list(pontuacoes.values()),
-                                        text=[f"{v:.2f}" for v in pontuacoes.values()],
-                                        textposition='auto',
-                                        marker_color='#00796b'
-                                    ))
-                                    fig.update_layout(
-                                        title_text='<b>Desempenho Médio do Grupo</b>',
-                                        xaxis_title="Habilidades",
-                                        yaxis_title="Pontuação Média",
-                                        yaxis_range=[0, 2],
-                                        height=300,
-                                        margin=dict(l=20, r=20, t=40, b=20)
-                                    )
-                                    # AQUI ESTÁ A CORREÇÃO!
-                                    st.plotly_chart(fig, use_container_width=True, key=f"chart_{turma}_{i}")
-
-                                    pontos_fortes = [h for h, m in pontuacoes.items() if m >= 1.5]
-                                    pontos_atencao = [h for h, m in pontuacoes.items() if m < 0.8]
-
-                                    if pontos_fortes:
-                                        st.success(f"**Pontos Fortes:** {', '.join(pontos_fortes)}")
-                                    if pontos_atencao:
-                                        st.warning(f"**Pontos de Atenção:** {', '.join(pontos_atencao)}")
+                        dispersao_rodizio = None
+                        if METODOS_FORMACAO[metodo] == "equilibrado":
+                            dispersao_rodizio = agrupamento.dispersao_grupos(
+                                gerar_grupos(arquivo_selecionado, assinatura, turmas_bloco, *parametros, "rodizio", semente, restricoes),
+                                habilidades_selecionadas
+                            )
+                    
+                    if not grupos:
+                        st.info("Não foi possível formar grupos para esta turma.")
+                        continue
+                    
+                    exibir_grupos(
+                        chave, grupos, df, turmas_bloco, habilidades_selecionadas, METODOS_FORMACAO[metodo], restricoes,
+                        dispersao_rodizio, visualizacao, avaliacao_info.nivel_maximo, aluno_col, turma_col
+                    )
 # Rodapé
 st.markdown("---")
 st.markdown("""
@@ -4,6 +4,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
+from cesb import avaliacoes, componentes, dados, longitudinal
+
 # ---------------------------------------------
 # CONFIGURAÇÃO DE PÁGINA E CSS (Mistura de estilos)
 # ---------------------------------------------
@@ -85,91 +87,54 @@ st.markdown("""
 st.markdown("---")
 
 
-# Lista dos arquivos CSV
-arquivos_csv = {
-    '9A_1ED': '9A_1ED.csv', '9A_2ED': '9A_2ED.csv',
-    '9B_1ED': '9B_1ED.csv', '9B_2ED': '9B_2ED.csv',
-    '3A_1ED': '3A_1ED.csv', '3A_2ED': '3A_2ED.csv',
-    '3B_1ED': '3B_1ED.csv', '3B_2ED': '3B_2ED.csv',
-    '3C_1ED': '3C_1ED.csv', '3C_2ED': '3C_2ED.csv',
-}
-
-# Nomes padronizados para as colunas
-COLUNA_ALUNO = 'nomeAluno'
-COLUNA_CGM = 'cgm'
-
-# Função para carregar e limpar os dados (Tratamento de NaN/Vazios com 0.0)
-@st.cache_data
-def carregar_e_limpar_dados(caminho_arquivo):
-    """Carrega o CSV, padroniza as colunas de percentual, trata NaN e converte vírgula para ponto."""
+# Função para carregar o detalhe de uma turma (alunos por CGM em todas as edições), sob demanda
+def carregar_turma(turma):
+    """Monta a base da turma selecionada; as turmas abertas recentemente ficam em cache (LRU)."""
     try:
-        df = pd.read_csv('pages/'+caminho_arquivo, sep=';', decimal=',')
-        
-        colunas_para_ignorar = {COLUNA_ALUNO, COLUNA_CGM, 'percAcertosAluno', 'percAcertosGeral', 'presenca'}
-        colunas_percentual = [col for col in df.columns if col not in colunas_para_ignorar]
-        
-        for col in colunas_percentual:
-            if df[col].dtype == 'object':
-                 df[col] = df[col].str.replace(',', '.', regex=False)
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # CORREÇÃO DE VAZIOS: Preenche NaN com 0.0
-        df[colunas_percentual] = df[colunas_percentual].fillna(0.0)
-        
-        return df, colunas_percentual
-    except FileNotFoundError:
-        st.error(f"Arquivo não encontrado: {caminho_arquivo}")
-        return None, None
-    except Exception as e:
-        st.error(f"Erro ao processar o arquivo {caminho_arquivo}: {e}")
-        return None, None
-
-# Função para preparar os dados para o gráfico de barras (comparação por turma)
-def preparar_dados_turma(df_1ed, df_2ed, turma):
-    """Calcula a média de acertos por disciplina comum e prepara o DataFrame para o gráfico de barras."""
-    if df_1ed is None or df_2ed is None:
+        base_turma, celulas_invalidas = dados.carregar_turma_prova_parana(turma)
+    except FileNotFoundError as e:
+        st.error(f"Arquivo não encontrado: {e.filename}")
         return None
-    
-    colunas_identificacao = {COLUNA_ALUNO, COLUNA_CGM, 'percAcertosAluno', 'percAcertosGeral', 'presenca'}
-    disciplinas_1ed = set(df_1ed.columns) - colunas_identificacao
-    disciplinas_2ed = set(df_2ed.columns) - colunas_identificacao
-    disciplinas_comuns = sorted(list(disciplinas_1ed.intersection(disciplinas_2ed)))
-    
-    if not disciplinas_comuns:
+    except Exception as e:
+        st.error(f"Erro ao processar os arquivos da turma {turma}: {e}")
         return None
-
-    medias_1ed = df_1ed[disciplinas_comuns].mean().reset_index()
-    medias_1ed.columns = ['Disciplina', 'Média de Acertos']
-    medias_1ed['Edição'] = '1ª Edição'
-    
-    medias_2ed = df_2ed[disciplinas_comuns].mean().reset_index()
-    medias_2ed.columns = ['Disciplina', 'Média de Acertos']
-    medias_2ed['Edição'] = '2ª Edição'
     
-    df_comparativo = pd.concat([medias_1ed, medias_2ed])
-    df_comparativo['Turma'] = turma
-    
-    return df_comparativo
+    # Valores que não são números são tratados como vazios; o professor vê onde estão para corrigir
+    for arquivo, celulas in celulas_invalidas.items():
+        for celula in celulas:
+            st.warning(f"{arquivo}, linha {celula.linha}, coluna '{celula.coluna}': valor '{celula.valor}' não é um número.")
+    return base_turma
+
+# Função para criar o gráfico de barras (comparação por turma)
+def criar_grafico_comparativo(df_comparativo, rotulos_edicoes):
+    """Barras da média de acertos por disciplina, uma cor por edição e um painel por turma."""
+    fig = px.bar(df_comparativo, x="Disciplina", y="Média de Acertos", color="Edição", facet_col="Turma", barmode="group",
+                 category_orders={"Edição": list(rotulos_edicoes.values())}, text_auto=".2f",
+                 hover_data={"Variação": ":+.2f", "Alunos": True},
+                 labels={"Média de Acertos": "Média de Acertos (%)"}, height=500)
+    fig.update_yaxes(range=[0, 100], title_text="Média de Acertos (%)")
+    fig.update_layout(template='plotly_dark')
+    return fig
 
 # Função para preparar os dados do aluno e da turma para o Radar
-def preparar_dados_aluno_e_turma(df_1ed, df_2ed, nome_aluno):
-    """Filtra os dados de um aluno e retorna os dados para os Radars (Aluno e Média da Turma)."""
+def preparar_dados_aluno_e_turma(base_turma, comparativo_turma, chave_aluno):
+    """Busca o aluno na base da turma (pela chave CGM) e retorna os dados para os Radars (Aluno e Média da Turma)."""
     
-    colunas_identificacao = {COLUNA_ALUNO, COLUNA_CGM, 'percAcertosAluno', 'percAcertosGeral', 'presenca'}
-    disciplinas_1ed = set(df_1ed.columns) - colunas_identificacao
-    disciplinas_2ed = set(df_2ed.columns) - colunas_identificacao
-    disciplinas_comuns = sorted(list(disciplinas_1ed.intersection(disciplinas_2ed)))
+    # Disciplinas comuns às edições e médias da turma já vêm do resumo
+    medias_turma = comparativo_turma.pivot(index='disciplina', columns='edicao', values='media')
+    disciplinas_comuns = sorted(medias_turma.index)
     
     if not disciplinas_comuns:
         return None, None, None, None, None
         
-    aluno_1ed = df_1ed[df_1ed[COLUNA_ALUNO] == nome_aluno].iloc[0]
-    aluno_2ed = df_2ed[df_2ed[COLUNA_ALUNO] == nome_aluno].iloc[0]
-    valores_aluno_1ed = aluno_1ed[disciplinas_comuns].tolist()
-    valores_aluno_2ed = aluno_2ed[disciplinas_comuns].tolist()
-
-    medias_turma_1ed = df_1ed[disciplinas_comuns].mean().tolist()
-    medias_turma_2ed = df_2ed[disciplinas_comuns].mean().tolist()
+    # Consulta direta no índice (chave, edição), sem filtrar a coluna de nomes
+    # Disciplina sem resultado aparece como 0% de acertos, como na média da turma
+    edicoes_aluno = base_turma.registro(chave_aluno).prova_parana[disciplinas_comuns].fillna(0.0)
+    valores_aluno_1ed = edicoes_aluno.loc[1, disciplinas_comuns].tolist()
+    valores_aluno_2ed = edicoes_aluno.loc[2, disciplinas_comuns].tolist()
+
+    medias_turma_1ed = medias_turma.loc[disciplinas_comuns, 1].tolist()
+    medias_turma_2ed = medias_turma.loc[disciplinas_comuns, 2].tolist()
     
     return (disciplinas_comuns, valores_aluno_1ed, valores_aluno_2ed, 
             medias_turma_1ed, medias_turma_2ed)
@@ -211,56 +176,28 @@ def criar_grafico_radar(disciplinas, valores_aluno, medias_turma, edicao, aluno,
     )
     return fig_radar
 
-# Processamento de dados de todas as turmas
-turmas_9 = ['9A', '9B']
-turmas_3 = ['3A', '3B', '3C']
-dados_turmas = {} 
-
-for turma in turmas_9 + turmas_3:
-    arquivo_1ed = arquivos_csv.get(f'{turma}_1ED')
-    arquivo_2ed = arquivos_csv.get(f'{turma}_2ED')
-    
-    df_1ed, _ = carregar_e_limpar_dados(arquivo_1ed)
-    df_2ed, _ = carregar_e_limpar_dados(arquivo_2ed)
-    
-    if df_1ed is not None and df_2ed is not None:
-        dados_turmas[turma] = (df_1ed, df_2ed)
+# Resumo de todas as turmas (médias por turma × edição × disciplina); o detalhe por aluno só é
+# carregado quando a turma é escolhida na análise individual
+resumo_turmas = dados.carregar_resumo_prova_parana()
 
 
 # --- SEÇÃO 1: COMPARATIVO POR TURMA (GRÁFICO DE BARRAS) ---
-st.markdown('<div class="section-header"><h3>1. Comparativo de Médias por Turma (1ª Edição vs 2ª Edição)</h3></div>', unsafe_allow_html=True)
-st.markdown("O gráfico de barras mostra a média de acertos de cada disciplina, comparando as duas edições da prova. A análise é feita apenas sobre as **disciplinas comuns** a ambas as edições.")
-
-# 9º Ano
-st.markdown("#### Turmas do 9º Ano (Ensino Fundamental)")
-df_turmas_9_list = [preparar_dados_turma(dados_turmas[t][0], dados_turmas[t][1], t) for t in turmas_9 if t in dados_turmas and dados_turmas[t] is not None]
-
-if df_turmas_9_list and all(df is not None for df in df_turmas_9_list):
-    df_comparativo_9 = pd.concat(df_turmas_9_list).sort_values(by=['Turma', 'Disciplina'])
-    
-    fig_9 = px.bar(df_comparativo_9, x="Disciplina", y="Média de Acertos", color="Edição", facet_col="Turma", barmode="group",
-                   category_orders={"Edição": ["1ª Edição", "2ª Edição"]}, text_auto=".2f", labels={"Média de Acertos": "Média de Acertos (%)"}, height=500)
-    fig_9.update_yaxes(range=[0, 100], title_text="Média de Acertos (%)")
-    fig_9.update_layout(template='plotly_dark')
-    st.plotly_chart(fig_9, use_container_width=True)
-else:
-    st.warning("Dados incompletos ou disciplinas não-comuns suficientes para a comparação das turmas do 9º ano.")
+rotulos_edicoes = {edicao: f"{edicao}ª Edição" for edicao in sorted(resumo_turmas["edicao"].unique())}
+comparativo = resumo_turmas.assign(Edição=lambda df: df["edicao"].map(rotulos_edicoes)).rename(columns={
+    "turma": "Turma", "disciplina": "Disciplina", "media": "Média de Acertos", "variacao": "Variação", "alunos": "Alunos"
+})
 
+st.markdown(f'<div class="section-header"><h3>1. Comparativo de Médias por Turma ({" vs ".join(rotulos_edicoes.values())})</h3></div>', unsafe_allow_html=True)
+st.markdown("O gráfico de barras mostra a média de acertos de cada disciplina, comparando as edições da prova. A análise é feita apenas sobre as **disciplinas comuns** a todas as edições.")
 
-# 3º Ano
-st.markdown("#### Turmas do 3º Ano (Ensino Médio)")
-df_turmas_3_list = [preparar_dados_turma(dados_turmas[t][0], dados_turmas[t][1], t) for t in turmas_3 if t in dados_turmas and dados_turmas[t] is not None]
-
-if df_turmas_3_list and all(df is not None for df in df_turmas_3_list):
-    df_comparativo_3 = pd.concat(df_turmas_3_list).sort_values(by=['Turma', 'Disciplina'])
+for serie, titulo in ((9, "Turmas do 9º Ano (Ensino Fundamental)"), (3, "Turmas do 3º Ano (Ensino Médio)")):
+    st.markdown(f"#### {titulo}")
+    df_comparativo = comparativo[comparativo["serie"] == serie].sort_values(by=['Turma', 'Disciplina'])
     
-    fig_3 = px.bar(df_comparativo_3, x="Disciplina", y="Média de Acertos", color="Edição", facet_col="Turma", barmode="group",
-                   category_orders={"Edição": ["1ª Edição", "2ª Edição"]}, text_auto=".2f", labels={"Média de Acertos": "Média de Acertos (%)"}, height=500)
-    fig_3.update_yaxes(range=[0, 100], title_text="Média de Acertos (%)")
-    fig_3.update_layout(template='plotly_dark')
-    st.plotly_chart(fig_3, use_container_width=True)
-else:
-    st.warning("Dados incompletos ou disciplinas não-comuns suficientes para a comparação das turmas do 3º ano.")
+    if not df_comparativo.empty:
+        st.plotly_chart(criar_grafico_comparativo(df_comparativo, rotulos_edicoes), use_container_width=True)
+    else:
+        st.warning(f"Dados incompletos ou disciplinas não-comuns suficientes para a comparação das turmas do {serie}º ano.")
 
 st.markdown("---")
 
@@ -270,20 +207,24 @@ st.markdown('<div class="section-header"><h3>2. Comparativo Aluno vs. Média da
 st.markdown("Os gráficos de radar mostram o percentual de acertos de um aluno selecionado em comparação com a média da turma, em cada edição separadamente.")
 
 # Seleção de Turma 
-todas_as_turmas = sorted(list(dados_turmas.keys()))
+todas_as_turmas = sorted(resumo_turmas["turma"].unique())
 turma_selecionada = st.selectbox("Selecione a Turma para Análise Individual", todas_as_turmas)
+base_turma = carregar_turma(turma_selecionada) if turma_selecionada else None
 
-if turma_selecionada:
-    df1, df2 = dados_turmas[turma_selecionada]
-    alunos_comuns = sorted(list(set(df1[COLUNA_ALUNO]).intersection(set(df2[COLUNA_ALUNO]))))
+if base_turma is not None:
+    # Alunos presentes nas duas edições, ligados pelo CGM (grafias diferentes do nome não atrapalham)
+    alunos_comuns = sorted(base_turma.alunos_em_comum(turma_selecionada, [1, 2]), key=base_turma.nome)
     
     if alunos_comuns:
         # Seleção do Aluno
-        aluno_selecionado = st.selectbox(f"Selecione o Aluno da Turma {turma_selecionada}", alunos_comuns)
+        chave_aluno = st.selectbox(
+            f"Selecione o Aluno da Turma {turma_selecionada}", alunos_comuns, format_func=base_turma.nome
+        )
+        aluno_selecionado = base_turma.nome(chave_aluno)
         
         # Prepara os dados do aluno e da turma
         disciplinas_radar, valores_aluno_1ed, valores_aluno_2ed, medias_turma_1ed, medias_turma_2ed = (
-            preparar_dados_aluno_e_turma(df1, df2, aluno_selecionado)
+            preparar_dados_aluno_e_turma(base_turma, resumo_turmas[resumo_turmas["turma"] == turma_selecionada], chave_aluno)
         )
         
         if disciplinas_radar:
@@ -313,9 +254,93 @@ if turma_selecionada:
 
         else:
             st.warning(f"Não foi possível gerar os gráficos de radar para o aluno {aluno_selecionado}. Verifique se há disciplinas comuns nas duas edições.")
+        
+        # Avaliações do CAED do mesmo aluno, ligadas ao CGM pelo nome na base longitudinal
+        caed_aluno = base_turma.registro(chave_aluno).caed
+        st.markdown(f"**Avaliações do CAED de {aluno_selecionado}**")
+        if caed_aluno.empty:
+            st.info("Nenhuma avaliação do CAED encontrada para este aluno.")
+        else:
+            st.dataframe(
+                pd.DataFrame({
+                    "Avaliação": [avaliacoes.por_arquivo(arquivo).rotulo for arquivo in caed_aluno.index],
+                    "Pontuação": caed_aluno["pontuacao"].to_numpy(),
+                    "Percentual do Máximo": caed_aluno["percentual"].to_numpy(),
+                }).sort_values("Avaliação"),
+                hide_index=True,
+                column_config={"Percentual do Máximo": st.column_config.NumberColumn(format="%.1f%%")},
+            )
     else:
         st.warning(f"Não há alunos em comum nas 1ª e 2ª edições da turma {turma_selecionada} para análise de evolução.")
 
+st.markdown("---")
+
+
+# --- SEÇÃO 3: EVOLUÇÃO DOS ALUNOS ENTRE EDIÇÕES (RANKING) ---
+st.markdown('<div class="section-header"><h3>3. Evolução dos Alunos entre Edições</h3></div>', unsafe_allow_html=True)
+st.markdown("Variação do percentual de acertos de cada aluno entre duas edições, no geral e por disciplina, com os maiores avanços e quedas da escola, de cada série ou de cada turma.")
+
+edicoes = list(rotulos_edicoes)
+if len(edicoes) < 2:
+    st.info("É preciso ter pelo menos duas edições para calcular a evolução dos alunos.")
+else:
+    col_inicial, col_final = st.columns(2)
+    edicao_inicial = col_inicial.selectbox("Edição inicial", edicoes[:-1], format_func=rotulos_edicoes.get)
+    edicoes_finais = [edicao for edicao in edicoes if edicao > edicao_inicial]
+    edicao_final = col_final.selectbox("Edição final", edicoes_finais, index=len(edicoes_finais) - 1, format_func=rotulos_edicoes.get)
+    
+    # Uma linha por aluno (ligado pelo CGM nas duas edições), calculada uma vez e mantida em cache
+    tabela_evolucao = dados.carregar_evolucao_prova_parana(edicao_inicial, edicao_final)
+    disciplinas_evolucao = [col for col in tabela_evolucao.columns if col not in ('nome', 'turma', 'serie', 'inicial', 'final', 'variacao')]
+    
+    col_sentido, col_recorte, col_medida, col_quantidade = st.columns(4)
+    sentido = col_sentido.radio("Mostrar", ["Maiores quedas", "Maiores avanços"], horizontal=True)
+    recortes = {"Escola toda": None, "Por série": "serie", "Por turma": "turma"}
+    recorte = col_recorte.selectbox("Recorte", list(recortes))
+    medida = col_medida.selectbox("Medida", ["Desempenho geral", *sorted(disciplinas_evolucao)])
+    quantidade = int(col_quantidade.number_input("Alunos por recorte", min_value=1, max_value=50, value=10, step=1))
+    
+    coluna = 'variacao' if medida == "Desempenho geral" else medida
+    ranking = longitudinal.maiores_variacoes(
+        tabela_evolucao, quantidade, coluna, quedas=sentido == "Maiores quedas", por=recortes[recorte]
+    )
+    
+    rotulo_inicial, rotulo_final = rotulos_edicoes[edicao_inicial], rotulos_edicoes[edicao_final]
+    formato_variacao = st.column_config.NumberColumn(format="%+.1f p.p.")
+    formato_percentual = st.column_config.NumberColumn(format="%.1f%%")
+    
+    def tabela_exibicao(tabela):
+        """Colunas com os nomes exibidos na página (geral nas duas edições e variação da medida escolhida)."""
+        exibicao = pd.DataFrame({
+            "Aluno": tabela["nome"],
+            "Turma": tabela["turma"],
+            f"Geral {rotulo_inicial}": tabela["inicial"],
+            f"Geral {rotulo_final}": tabela["final"],
+            "Variação geral": tabela["variacao"],
+        })
+        if coluna != 'variacao':
+            exibicao[f"Variação em {coluna}"] = tabela[coluna]
+        return exibicao
+    
+    configuracao_colunas = {
+        f"Geral {rotulo_inicial}": formato_percentual,
+        f"Geral {rotulo_final}": formato_percentual,
+        "Variação geral": formato_variacao,
+        f"Variação em {coluna}": formato_variacao,
+    }
+    
+    if ranking.empty:
+        st.info("Nenhum aluno com resultado nas duas edições para esta medida.")
+    else:
+        st.dataframe(tabela_exibicao(ranking), hide_index=True, use_container_width=True, column_config=configuracao_colunas)
+    
+    with st.expander(f"📋 Evolução de todos os alunos ({len(tabela_evolucao)})"):
+        componentes.tabela_paginada(
+            tabela_exibicao(tabela_evolucao.sort_values(coluna, ascending=sentido == "Maiores quedas")),
+            "evolucao",
+            column_config=configuracao_colunas
+        )
+
 # Fim da Aplicação
 st.markdown("---")
 st.success("Análise estatística comparativa concluída.")
@@ -2,9 +2,10 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import os
 from datetime import datetime
 
+from cesb import dados
+
 # Configuração da página
 st.set_page_config(
     page_title="🌟 Destaques Prova Paraná",
@@ -92,29 +93,16 @@ st.markdown("""
 st.markdown('<div class="main-header">🏆 Alunos em Destaque por Edição Prova Paraná</div>', unsafe_allow_html=True)
 
 # Função para carregar dados
-@st.cache_data
 def carregar_dados():
-    """Carrega todos os arquivos CSV da pasta"""
-    dados = {}
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    """Carrega todos os arquivos CSV da Prova Paraná (1ª e 2ª edição) da pasta de dados"""
+    dados_arquivos = {}
     
-    # Lista todos os arquivos CSV na pasta
-    arquivos_csv = [f for f in os.listdir(script_dir) if f.endswith('.csv')]
+    # Lista os arquivos da Prova Paraná (TURMA_1ED.csv, TURMA_2ED.csv)
+    arquivos_csv = dados.listar_arquivos('*_*ED.csv')
     
     for arquivo in arquivos_csv:
         try:
-            caminho_arquivo = os.path.join(script_dir, arquivo)
-            # Tentar diferentes encodings e separadores
-            try:
-                df = pd.read_csv(caminho_arquivo, sep=';', encoding='utf-8', decimal=',')
-            except:
-                try:
-                    df = pd.read_csv(caminho_arquivo, sep=';', encoding='latin-1', decimal=',')
-                except:
-                    df = pd.read_csv(caminho_arquivo, sep=',', encoding='utf-8')
-            
-            # Limpar nomes das colunas
-            df.columns = df.columns.str.strip()
+            df = dados.carregar_prova_parana(arquivo)
             
             # Adicionar coluna de turma baseada no nome do arquivo
             turma = arquivo.split('_')[0]
@@ -137,20 +125,16 @@ def carregar_dados():
             else:
                 df['Série'] = 'Outra'
             
-            # Converter coluna de porcentagem para numérico
-            if 'percAcertosAluno' in df.columns:
-                # Remover possíveis vírgulas e converter para float
-                df['percAcertosAluno'] = pd.to_numeric(
-                    df['percAcertosAluno'].astype(str).str.replace(',', '.'), 
-                    errors='coerce'
-                )
+            # As colunas numéricas já chegam convertidas (vírgula ou ponto decimal); avisa o que não pôde ser lido
+            for celula in dados.celulas_invalidas_prova_parana(arquivo):
+                st.warning(f"{arquivo}, linha {celula.linha}, coluna '{celula.coluna}': valor '{celula.valor}' não é um número.")
             
-            dados[arquivo] = df
+            dados_arquivos[arquivo] = df
             
         except Exception as e:
             st.warning(f"Erro ao carregar {arquivo}: {e}")
     
-    return dados
+    return dados_arquivos
 
 # Função para encontrar alunos destaque
 def encontrar_alunos_destaque(dados):
@@ -382,20 +366,20 @@ def criar_card_aluno(aluno, cor="#667eea", destaque_geral=False, destaque_global
 
 # Carregar dados
 with st.spinner('📊 Carregando dados...'):
-    dados = carregar_dados()
+    dados_carregados = carregar_dados()
 
-if not dados:
+if not dados_carregados:
     st.error("❌ Nenhum arquivo CSV encontrado na pasta do script.")
     st.info("💡 Certifique-se de que os arquivos CSV estão na mesma pasta que este script.")
 else:
     # Encontrar alunos destaque
-    alunos_destaque = encontrar_alunos_destaque(dados)
-    alunos_destaque_turmas_2ed = encontrar_destaque_por_turma_2ed(dados)
-    destaque_9ano, destaque_3ano = encontrar_destaque_global_por_serie(dados)
+    alunos_destaque = encontrar_alunos_destaque(dados_carregados)
+    alunos_destaque_turmas_2ed = encontrar_destaque_por_turma_2ed(dados_carregados)
+    destaque_9ano, destaque_3ano = encontrar_destaque_global_por_serie(dados_carregados)
     
     # DEBUG: Mostrar informações sobre os dados carregados
     st.sidebar.markdown("### 🔍 Informações dos Dados")
-    st.sidebar.write(f"Arquivos CSV carregados: {len(dados)}")
+    st.sidebar.write(f"Arquivos CSV carregados: {len(dados_carregados)}")
     if not alunos_destaque.empty:
         st.sidebar.write(f"Alunos destaque encontrados: {len(alunos_destaque)}")
     if destaque_9ano:
@@ -1,8 +1,7 @@
 import streamlit as st
 import pandas as pd
-import os
-import re
-import glob
+
+from cesb import avaliacoes, dados
 
 # ==============================================================================
 # Configuração da Página
@@ -84,28 +83,25 @@ st.markdown("""
 # Funções de Processamento de Dados
 # ==============================================================================
 
-@st.cache_data
-def processar_arquivo(caminho_arquivo):
+def processar_arquivo(nome_arquivo):
     """Lê um arquivo CSV, extrai metadados e calcula o desempenho dos alunos."""
     try:
-        nome_arquivo = os.path.basename(caminho_arquivo)
-        partes = re.match(r"CAED(\d+)_(\d+)_(\w+)\.csv", nome_arquivo, re.IGNORECASE)
-        if not partes: return None
+        avaliacao = avaliacoes.por_arquivo(nome_arquivo)
+        if avaliacao is None: return None
 
-        edicao = f"CAED {partes.group(1)}"
-        serie = f"{partes.group(2)}º Ano"
-        # Garante que 'matematica' e 'portugues' sejam padronizados
-        disciplina = partes.group(3).capitalize().replace("ú", "u").replace("á", "a")
+        edicao = f"CAED {avaliacao.edicao}"
+        serie = f"{avaliacao.serie}º Ano"
+        # Disciplina padronizada sem acento ('Matematica', 'Portugues')
+        disciplina = avaliacao.disciplina.capitalize()
 
-        df = pd.read_csv(caminho_arquivo, delimiter=';')
-        df.columns = [col.strip() for col in df.columns]
+        df = dados.carregar_caed(nome_arquivo)
         df = df.rename(columns={'Aluno': 'aluno', 'Turma': 'turma'})
 
         # Limpeza e padronização dos dados
         df['aluno'] = df['aluno'].str.strip().str.title()
         df['turma'] = df['turma'].str.strip()
 
-        colunas_habilidade = [col for col in df.columns if col.upper().startswith('H')]
+        colunas_habilidade = list(avaliacao.colunas.values())
         if not colunas_habilidade: return None
 
         df['desempenho'] = df[colunas_habilidade].apply(lambda x: (x > 0).sum(), axis=1) / len(colunas_habilidade) * 100
@@ -117,9 +113,12 @@ def processar_arquivo(caminho_arquivo):
         return None
 
 @st.cache_data
-def carregar_e_unir_dados():
-    """Carrega todos os arquivos CAED, processa e une os dados de Português e Matemática."""
-    arquivos_csv = glob.glob("CAED*.csv")
+def carregar_e_unir_dados(assinaturas_arquivos):
+    """Carrega todos os arquivos CAED, processa e une os dados de Português e Matemática.
+
+    `assinaturas_arquivos` vem de `dados.assinaturas` e renova o cache quando algum CSV muda.
+    """
+    arquivos_csv = [nome for nome, _, _ in assinaturas_arquivos]
     if not arquivos_csv: return pd.DataFrame()
 
     lista_dfs = [processar_arquivo(f) for f in arquivos_csv]
@@ -149,7 +148,7 @@ def carregar_e_unir_dados():
 st.markdown("<h1 class='main-header'>🌟 Destaques Combinados</h1>", unsafe_allow_html=True)
 st.markdown("<p style='text-align: center; font-size: 1.2rem;'>Análise dos alunos com melhor desempenho simultâneo em Português e Matemática.</p>", unsafe_allow_html=True)
 
-df_final = carregar_e_unir_dados()
+df_final = carregar_e_unir_dados(dados.assinaturas([a.arquivo for a in avaliacoes.listar()]))
 
 if df_final.empty:
     st.error("❌ Nenhum dado de aluno com desempenho em ambas as disciplinas foi encontrado. Verifique os arquivos CSV.")
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+from cesb import agrupamento
+from cesb.agrupamento import Restricoes
+
+HABILIDADES = ['H01', 'H02', 'H03', 'H04']
+
+
+def _turma(num_alunos=23, semente=7):
+    rng = np.random.default_rng(semente)
+    df = pd.DataFrame(rng.integers(0, 3, size=(num_alunos, len(HABILIDADES))), columns=HABILIDADES)
+    df.insert(0, 'Aluno', [f"ALUNO {i:02d}" for i in range(num_alunos)])
+    return df
+
+
+def _nomes(grupos):
+    return [[aluno['Aluno'] for aluno in grupo] for grupo in grupos]
+
+
+def test_equilibrado_distribui_cada_aluno_uma_vez():
+    turma = _turma()
+    grupos = agrupamento.formar_grupos_equilibrados(turma, HABILIDADES, 4, semente=1)
+
+    nomes = [nome for grupo in _nomes(grupos) for nome in grupo]
+    assert sorted(nomes) == sorted(turma['Aluno'])
+    assert len(grupos) == agrupamento.calcular_num_grupos(len(turma), 4)
+    tamanhos = [len(grupo) for grupo in grupos]
+    assert max(tamanhos) - min(tamanhos) <= 1
+
+
+def test_equilibrado_respeita_numero_fixo_de_grupos():
+    turma = _turma()
+    grupos = agrupamento.formar_grupos_equilibrados(turma, HABILIDADES, 4, semente=1, restricoes=Restricoes(num_grupos=3))
+
+    assert len(grupos) == 3
+    alvo = len(turma) / 3
+    assert all(abs(len(grupo) - alvo) <= 1 for grupo in grupos)
+
+
+def test_equilibrado_mesma_semente_mesmos_grupos():
+    turma = _turma()
+
+    primeira = agrupamento.formar_grupos_equilibrados(turma, HABILIDADES, 4, semente=5)
+    segunda = agrupamento.formar_grupos_equilibrados(turma, HABILIDADES, 4, semente=5)
+
+    assert _nomes(primeira) == _nomes(segunda)
+
+
+def test_equilibrado_cumpre_pares_separar_e_juntar():
+    turma = _turma()
+    restricoes = Restricoes(
+        separar=(("ALUNO 00", "ALUNO 02"), ("ALUNO 13", "ALUNO 15")),
+        juntar=(("ALUNO 04", "ALUNO 05"), ("ALUNO 06", "ALUNO 07")),
+    )
+
+    sem_restricoes = agrupamento.formar_grupos_equilibrados(turma, HABILIDADES, 4, semente=1)
+    grupos = agrupamento.formar_grupos_equilibrados(turma, HABILIDADES, 4, semente=1, restricoes=restricoes)
+
+    separar, juntar = agrupamento.pares_violados(sem_restricoes, restricoes)
+    assert separar and juntar
+    assert agrupamento.pares_violados(grupos, restricoes) == ([], [])
+    tamanhos = [len(grupo) for grupo in grupos]
+    assert max(tamanhos) - min(tamanhos) <= 1
+
+
+def _conferir_estatisticas(editaveis):
+    incremental = editaveis.estatisticas()
+    completa = agrupamento.estatisticas_grupos(editaveis.grupos, HABILIDADES)
+
+    np.testing.assert_array_equal(incremental.tamanhos, completa.tamanhos)
+    np.testing.assert_array_equal(incremental.faixas, completa.faixas)
+    np.testing.assert_allclose(incremental.medias, completa.medias, equal_nan=True)
+    np.testing.assert_allclose(incremental.desvios, completa.desvios, atol=1e-9, equal_nan=True)
+    assert np.isclose(editaveis.dispersao_grupos(), completa.dispersao_grupos())
+
+
+def test_grupos_editaveis_acompanham_recalculo_completo():
+    turma = _turma()
+    turma.loc[3, 'H02'] = np.nan
+    grupos = agrupamento.formar_grupos_equilibrados(turma, HABILIDADES, 4, semente=1)
+    editaveis = agrupamento.GruposEditaveis(grupos, HABILIDADES)
+    _conferir_estatisticas(editaveis)
+
+    primeiro, segundo = _nomes(editaveis.grupos)[:2]
+    assert editaveis.mover(primeiro[0], 1) == {0, 1}
+    _conferir_estatisticas(editaveis)
+
+    # Esvazia o primeiro grupo: um aluno vai para outro grupo e os demais saem da turma
+    editaveis.mover(primeiro[1], 2)
+    for nome in primeiro[2:]:
+        assert editaveis.remover(nome) == {0}
+    assert editaveis.grupos[0] == []
+    _conferir_estatisticas(editaveis)
+    assert np.isnan(editaveis.estatisticas().medias[0]).all()
+
+    novo = {'Aluno': 'NOVO', 'H01': 2, 'H02': 1, 'H03': np.nan, 'H04': 0}
+    assert editaveis.adicionar(novo) == {0}
+    editaveis.adicionar(dict(novo, Aluno='OUTRO'), destino=1)
+    editaveis.mover(segundo[0], 0)
+    _conferir_estatisticas(editaveis)
+    assert sorted(editaveis.alunos()) == sorted(
+        [nome for nome in turma['Aluno'] if nome not in primeiro[2:]] + ['NOVO', 'OUTRO'])
+
+
+def test_kmeans_respeita_capacidade():
+    valores = agrupamento.matriz_pontuacoes(_turma(), HABILIDADES)
+
+    rotulos = agrupamento.agrupar_kmeans(valores, 5, capacidade=5, rng=np.random.default_rng(3))
+
+    assert len(rotulos) == len(valores)
+    assert np.bincount(rotulos, minlength=5).max() <= 5
+
+
+def test_kmeans_mesma_semente_mesmos_rotulos():
+    valores = agrupamento.matriz_pontuacoes(_turma(), HABILIDADES)
+
+    primeira = agrupamento.agrupar_kmeans(valores, 4, capacidade=6, rng=np.random.default_rng(11))
+    segunda = agrupamento.agrupar_kmeans(valores, 4, capacidade=6, rng=np.random.default_rng(11))
+
+    np.testing.assert_array_equal(primeira, segunda)
+
+
+def test_homogeneos_nao_passam_do_tamanho_maximo():
+    turma = _turma()
+
+    grupos = agrupamento.formar_grupos_homogeneos(turma, HABILIDADES, 4, semente=2)
+
+    assert all(len(grupo) <= 4 for grupo in grupos)
+    assert sorted(nome for grupo in _nomes(grupos) for nome in grupo) == sorted(turma['Aluno'])
+    assert _nomes(grupos) == _nomes(agrupamento.formar_grupos_homogeneos(turma, HABILIDADES, 4, semente=2))
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from cesb.leitura import CelulaInvalida, converter_numeros
+
+
+def test_celula_que_nao_e_numero_e_informada():
+    df = pd.DataFrame({'cgm': ['10', '11'], 'MATEMÁTICA': ['37,5', 'abc']}, dtype=object)
+
+    convertido, invalidas = converter_numeros(df, {'cgm': 'Int64', 'MATEMÁTICA': 'float64'})
+
+    assert invalidas == [CelulaInvalida(linha=3, coluna='MATEMÁTICA', valor='abc')]
+    assert convertido['MATEMÁTICA'].iloc[0] == 37.5
+    assert np.isnan(convertido['MATEMÁTICA'].iloc[1])
+
+
+def test_valor_fracionario_em_coluna_inteira_e_informado():
+    df = pd.DataFrame({'cgm': ['10', '7.5'], 'presenca': [1.0, 0.5]}, dtype=object)
+    df['presenca'] = df['presenca'].astype(float)
+
+    convertido, invalidas = converter_numeros(df, {'cgm': 'Int64', 'presenca': 'Int64'})
+
+    assert invalidas == [
+        CelulaInvalida(linha=3, coluna='cgm', valor='7.5'),
+        CelulaInvalida(linha=3, coluna='presenca', valor='0.5'),
+    ]
+    assert str(convertido['cgm'].dtype) == 'Int64'
+    assert convertido['cgm'].iloc[0] == 10
+    assert pd.isna(convertido['cgm'].iloc[1])
+    assert pd.isna(convertido['presenca'].iloc[1])
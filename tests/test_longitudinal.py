@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from cesb import longitudinal
+from cesb.avaliacoes import Avaliacao
+from cesb.indice_alunos import indexar_alunos
+from cesb.matriz import montar_matriz
+
+
+def _prova(linhas):
+    colunas = ['nomeAluno', 'cgm', 'percAcertosAluno', 'percAcertosGeral', 'presenca', 'MATEMÁTICA', 'PROGRAMAÇÃO']
+    df = pd.DataFrame(linhas, columns=colunas)
+    return df.astype(longitudinal.tipos_numericos(df))
+
+
+def _prova_parana():
+    primeira = _prova([
+        ['ANA', 1, 50.0, 60.0, 1, 40.0, np.nan],
+        ['BRUNO', 2, 70.0, 60.0, 1, 70.0, 80.0],
+    ])
+    segunda = _prova([
+        ['ANA', 1, 60.0, 65.0, 1, 50.0, 100.0],
+        ['BRUNO', 2, 75.0, 65.0, 1, 80.0, 70.0],
+    ])
+    return longitudinal.tabela_prova_parana([('3C', 1, primeira), ('3C', 2, segunda)])
+
+
+def test_disciplina_em_branco_nao_gera_variacao():
+    tabela = longitudinal.evolucao(_prova_parana())
+
+    assert np.isnan(tabela.at['cgm:1', 'PROGRAMAÇÃO'])
+    assert tabela.at['cgm:1', 'MATEMÁTICA'] == 10.0
+    assert tabela.at['cgm:2', 'PROGRAMAÇÃO'] == -10.0
+
+
+def test_disciplina_em_branco_fica_fora_do_ranking():
+    tabela = longitudinal.evolucao(_prova_parana())
+
+    avancos = longitudinal.maiores_variacoes(tabela, coluna='PROGRAMAÇÃO', quedas=False)
+    assert list(avancos.index) == ['cgm:2']
+
+
+def test_disciplina_em_branco_conta_zero_na_media_da_turma():
+    primeira = _prova([
+        ['ANA', 1, 50.0, 60.0, 1, 40.0, np.nan],
+        ['BRUNO', 2, 70.0, 60.0, 1, 70.0, 80.0],
+    ])
+    resumo = longitudinal.resumir_arquivo('3C', 1, primeira).set_index('disciplina')
+
+    assert resumo.at['PROGRAMAÇÃO', 'soma'] / resumo.at['PROGRAMAÇÃO', 'alunos'] == 40.0
+
+
+def _caed(linhas):
+    avaliacao = Avaliacao(
+        edicao=1, serie=3, disciplina='matematica', nome_disciplina='Matemática', arquivo='CAED1_3_matematica.csv',
+        habilidades=('H01', 'H02'), nivel_maximo=2, padrao_coluna='H{numero:02d}',
+    )
+    df = pd.DataFrame(linhas, columns=['Aluno', 'Turma', 'H01', 'H02'])
+    return avaliacao, indexar_alunos(montar_matriz(df), avaliacao.habilidades, avaliacao.nivel_maximo)
+
+
+def _base_com_caed(turmas=None):
+    primeira = _prova([
+        ['Ana Souza', 1, 50.0, 60.0, 1, 40.0, 60.0],
+        ['BRUNO', pd.NA, 70.0, 60.0, 1, 70.0, 80.0],
+    ])
+    segunda = _prova([
+        ['ANA  SOUZA', 1, 60.0, 65.0, 1, 50.0, 100.0],
+        ['BRUNO', 2, 75.0, 65.0, 1, 80.0, 70.0],
+    ])
+    caed = _caed([
+        [' ÁNA SOUZA', '3C', 2, 1],
+        ['CARLOS', '3C', 0, 1],
+        ['DANI', '3A', 1, 1],
+    ])
+    return longitudinal.montar_base([('3C', 1, primeira), ('3C', 2, segunda)], [caed], turmas=turmas)
+
+
+def test_aluno_sem_cgm_e_ligado_pelo_nome():
+    base = _base_com_caed()
+
+    assert base.caed.loc[('cgm:1', 'CAED1_3_matematica.csv'), 'pontuacao'] == 3
+    assert ('cgm:2', 1) in base.prova_parana.index
+    assert ('nome:CARLOS', 'CAED1_3_matematica.csv') in base.caed.index
+
+
+def test_registro_junta_edicoes_e_avaliacoes_pelo_cgm():
+    registro = _base_com_caed().registro('cgm:1')
+
+    assert registro.nome == 'ANA  SOUZA'
+    assert list(registro.prova_parana.index) == [1, 2]
+    assert list(registro.caed.index) == ['CAED1_3_matematica.csv']
+    assert registro.caed['percentual'].iloc[0] == 75.0
+
+
+def test_caed_restrito_as_turmas_informadas():
+    base = _base_com_caed(turmas=['3C'])
+
+    assert 'nome:DANI' not in base.alunos.index
+    assert 'nome:CARLOS' in base.alunos.index
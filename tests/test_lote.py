@@ -0,0 +1,30 @@
+import pandas as pd
+
+from cesb import lote
+
+from test_agrupamento import HABILIDADES, _turma
+
+
+def _tarefa(turma, semente):
+    return lote.TarefaTurma(
+        arquivo='CAED1_3_matematica.csv', avaliacao='CAED1_Matemática', turma=turma,
+        alunos=_turma(9, semente).assign(Aluno=lambda df: turma + ' ' + df['Aluno']),
+        habilidades=tuple(HABILIDADES), max_por_grupo=4, metodo='equilibrado', semente=semente,
+    )
+
+
+def test_exportar_reune_as_turmas_resolvidas_em_paralelo():
+    tarefas = [_tarefa('3B', 2), _tarefa('3A', 1)]
+
+    resultados = list(lote.resolver_em_paralelo(tarefas, max_processos=1))
+    tabela = lote.exportar(resultados)
+
+    assert list(tabela.columns) == ["Arquivo", "Avaliação", "Turma", "Grupo", "Aluno"]
+    assert sorted(tabela['Aluno']) == sorted(pd.concat([t.alunos['Aluno'] for t in tarefas]))
+    assert list(tabela['Turma'].unique()) == ['3A', '3B']
+    assert tabela.groupby('Turma')['Grupo'].nunique().to_dict() == {'3A': 3, '3B': 3}
+    assert tabela.equals(tabela.sort_values(["Arquivo", "Turma", "Grupo", "Aluno"], ignore_index=True))
+
+
+def test_exportar_sem_resultados():
+    assert lote.exportar([]).empty
@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import os
 
+from cesb import preaquecimento
+
 # Configurações da página
 st.set_page_config(
     page_title="CESB Analytic - Recomposição da Aprendizagem",
@@ -10,6 +12,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Carrega e indexa os dados em segundo plano enquanto a página inicial é exibida
+preaquecimento.iniciar()
+
 # CSS personalizado
 custom_css = """
 <style>